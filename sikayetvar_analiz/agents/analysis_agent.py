@@ -1,36 +1,115 @@
+import copy
+import hashlib
 import json
-from typing import List, Dict, Optional
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, List, Dict, Optional
 from utils.llm_client import LLMClient
+from utils.classification_cache import ClassificationCache
+from utils.local_classifier import LocalClassifier
+from utils.near_duplicate import cluster_pairs
 from config import Config
 
 class AnalysisAgent:
     """
     Analiz Agentı
     - JSONL verilerini LLM ile analiz eder
-    - LLM'den JSONL çıktı alır
+    - Büyük girdileri token bütçesine göre parçalar, parçaları paralel gönderir
+    - Daha önce sınıflandırılmış içerik için LLM'e gitmez (kalıcı önbellek)
+    - Ürünü açıkça belli olan şikayetleri yerel sözlük/model ile sınıflandırır
+    - Yakın kopya kümelerinden sadece temsilciyi LLM'e gönderir, etiketi kümeye kopyalar
+    - LLM'den JSONL çıktı alır (akış modunda satır satır)
+    - Sağlayıcı kesintisinde (circuit breaker açık) yerel sınıflandırıcının en iyi tahminine düşer
+    - Her atamayı taxonomy/prompt/model versiyonuyla damgalar (eskiyen satırlar yeniden sınıflandırılabilir)
     - Sonuçları database'e kaydeder
     """
     
-    def __init__(self):
+    # Prompt ya da çıktı formatı değiştiğinde artırılmalı (önbellek anahtarına ve analiz damgasına girer)
+    PROMPT_VERSION = "v2"
+    # Yerel sınıflandırıcı atamalarının model damgası; yedek tahminler her zaman eskimiş sayılır
+    LOCAL_MODEL = "local"
+    FALLBACK_MODEL = "local-fallback"
+    
+    def __init__(self, db_manager=None):
         # LLM client'ı kendisi initialize etsin
         self.llm_client = LLMClient()
         self.categories = Config.CATEGORIES
         # Reason kategorileri sabit 10'lu liste
-        self.reasons = [
-            "Teknik Servis",
-            "Kargo & Teslimat", 
-            "Müşteri Hizmetleri",
-            "Fiyat & Fatura",
-            "Ürün Kalitesi",
-            "Website & Uygulama",
-            "İade & Değişim",
-            "Satış & Mağaza",
-            "Zaman & Süreç",
-            "Diğer"
-        ]
-    
-    def analyze_complaints(self, jsonl_data: str, complaint_ids: List[int] = None) -> Dict:
-        """JSONL formatındaki şikayetleri analiz et ve kategorile"""
+        self.reasons = Config.REASONS
+        # Kategori ya da sebep listesi değişince damga da değişir
+        self.taxonomy_version = self.compute_taxonomy_version(self.categories, self.reasons)
+        
+        if db_manager is None:
+            from database_manager import DatabaseManager
+            db_manager = DatabaseManager()
+        self.db_manager = db_manager
+        
+        # Yakın kopya sayaçları: kaç şikayet temsilcisinin etiketini aldı (= LLM'e gitmedi)
+        self._stats_lock = threading.Lock()
+        self.near_duplicate_stats = {"clusters": 0, "propagated": 0}
+        
+        self.cache = None
+        if Config.LLM_CACHE_MAX_ENTRIES > 0:
+            self.cache = ClassificationCache(
+                db_manager,
+                model_name=self.llm_client.model_name,
+                # Liste değişince eski önbellek kayıtları kullanılmaz (yeni listede olmayan etiket dönebilir)
+                prompt_version=f"{self.PROMPT_VERSION}/{self.taxonomy_version}",
+                max_entries=Config.LLM_CACHE_MAX_ENTRIES
+            )
+        
+        self.local_classifier = None
+        if Config.LOCAL_CLASSIFIER_ENABLED:
+            self.local_classifier = LocalClassifier(self.categories, self.reasons,
+                                                    threshold=Config.LOCAL_CLASSIFIER_THRESHOLD)
+            if Config.LOCAL_CLASSIFIER_MODEL:
+                self.local_classifier.fit(
+                    row for chunk in db_manager.iter_analyzed_complaints_since(0) for row in chunk
+                )
+        
+        # Sağlayıcı devre dışıyken (circuit breaker) en iyi yerel tahmin - güven eşiği yok
+        self.fallback_classifier = None
+        if Config.LLM_BREAKER_LOCAL_FALLBACK:
+            self.fallback_classifier = copy.copy(self.local_classifier) if self.local_classifier else \
+                LocalClassifier(self.categories, self.reasons)
+            self.fallback_classifier.threshold = 0.0
+    
+    @staticmethod
+    def compute_taxonomy_version(categories: List[str], reasons: List[str]) -> str:
+        """Kategori + sebep listesinin kısa hash'i"""
+        content = json.dumps([categories, reasons], ensure_ascii=False)
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()[:12]
+    
+    def current_versions(self) -> Dict:
+        """Yeni atamaların alacağı damga - bundan farklı damgalı satırlar eskimiştir"""
+        return {
+            "taxonomy_version": self.taxonomy_version,
+            "prompt_version": self.PROMPT_VERSION,
+            "model_name": self.llm_client.model_name,
+            "local_model": self.LOCAL_MODEL
+        }
+    
+    def _stamp(self, assignments: List[Dict], model_name: str) -> List[Dict]:
+        """Atamalara versiyon damgası ekle (yerel sınıflandırıcı prompt kullanmaz)"""
+        for assignment in assignments:
+            assignment["taxonomy_version"] = self.taxonomy_version
+            assignment["prompt_version"] = None if model_name in (self.LOCAL_MODEL, self.FALLBACK_MODEL) \
+                else self.PROMPT_VERSION
+            assignment["model_name"] = model_name
+        return assignments
+    
+    def analyze_complaints(self, jsonl_data: str, complaint_ids: List[int] = None,
+                           on_assignments: Optional[Callable[[List[Dict]], None]] = None,
+                           record_failures: bool = True, allow_fallback: bool = True) -> Dict:
+        """
+        JSONL formatındaki şikayetleri analiz et ve kategorile
+        on_assignments verilirse atamalar hazır oldukça (akış modunda LLM satırı geldikçe) bu
+        fonksiyona iletilir; yanıtın ortasında hata olsa da iletilenler kaybolmaz
+        record_failures=False: dönmeyenleri kuyrukta işaretleme (kiralama yapan çağıran kendisi bırakır)
+        allow_fallback=False: sağlayıcı kesintisinde yerel tahmin üretme (mevcut etiketi ezmemek için)
+        """
         try:
             if not jsonl_data or not jsonl_data.strip():
                 return {
@@ -56,19 +135,86 @@ class AnalysisAgent:
                     "error": "Geçerli şikayet verisi bulunamadı"
                 }
             
-            # LLM ile toplu analiz
-            analysis_assignments = self._analyze_with_llm_batch(jsonl_data)
+            emit = on_assignments or (lambda assignments: None)
+            
+            # Aynı içerik daha önce sınıflandırıldıysa önbellekten al
+            cached_assignments, pending = self.cache.lookup(complaints) if self.cache else ([], complaints)
+            if cached_assignments:
+                emit(self._stamp(cached_assignments, self.llm_client.model_name))
+            
+            # Ürünü ve nedeni yerelde yüksek güvenle belli olanlar LLM'e gitmez
+            local_assignments = []
+            if self.local_classifier and pending:
+                local_assignments, pending = self.local_classifier.split_confident(pending)
+                if local_assignments:
+                    emit(self._stamp(local_assignments, self.LOCAL_MODEL))
+            
+            llm_assignments = []
+            fallback_assignments = []
+            followers = []
+            failed_ids = []
+            if pending:
+                # Yakın kopya kümelerinden sadece temsilciler LLM'e gider
+                representatives, clusters = self._cluster_near_duplicates(pending)
+                
+                # Temsilcinin etiketi geldiği anda küme üyeleriyle birlikte iletilir
+                def emit_llm(assignments):
+                    emit(assignments + self._cluster_followers(assignments, clusters))
+                
+                # Token bütçesine göre parçala, parçaları sınırlı sayıda worker ile paralel analiz et
+                if self.llm_client.available():
+                    batches = self._build_batches(representatives)
+                    llm_assignments = self._dispatch_batches(batches, emit_llm if on_assignments else None)
+                    if self.cache:
+                        self.cache.store(representatives, llm_assignments)
+                
+                # Sağlayıcı devre dışı kaldıysa dönmeyenler yerel tahminle etiketlenir (önbelleğe yazılmaz)
+                returned = {assignment["Complaint_ID"] for assignment in llm_assignments}
+                degraded = not self.llm_client.available()
+                if degraded and allow_fallback and self.fallback_classifier:
+                    fallback_assignments, _ = self.fallback_classifier.split_confident(
+                        [complaint for complaint in representatives if complaint["Complaint_ID"] not in returned])
+                    if fallback_assignments:
+                        self._stamp(fallback_assignments, self.FALLBACK_MODEL)
+                        emit_llm(fallback_assignments)
+                        llm_assignments = llm_assignments + fallback_assignments
+                        returned.update(assignment["Complaint_ID"] for assignment in fallback_assignments)
+                
+                followers = self._cluster_followers(llm_assignments, clusters)
+                
+                # Tekrar denemelere rağmen dönmeyenler (ve küme üyeleri) kalıcı hata olarak işaretlenir;
+                # sağlayıcı kesintisi şikayetin deneme hakkını tüketmez
+                for complaint in representatives:
+                    if complaint["Complaint_ID"] not in returned:
+                        failed_ids.extend(clusters.get(complaint["Complaint_ID"], [complaint["Complaint_ID"]]))
+                if failed_ids and record_failures and not degraded:
+                    self.db_manager.record_analysis_failures(
+                        failed_ids, "LLM yanıtında eksik", max_attempts=Config.ANALYSIS_MAX_ATTEMPTS)
+                
+                if clusters:
+                    with self._stats_lock:
+                        self.near_duplicate_stats["clusters"] += len(clusters)
+                        self.near_duplicate_stats["propagated"] += len(followers)
+            
+            analysis_assignments = cached_assignments + local_assignments + llm_assignments + followers
             
             if analysis_assignments:
                 return {
                     "success": True,
                     "analysis_assignments": analysis_assignments,
-                    "processed_count": len(analysis_assignments)
+                    "processed_count": len(analysis_assignments),
+                    "cache_hits": len(cached_assignments),
+                    "local_hits": len(local_assignments),
+                    "near_duplicate_hits": len(followers),
+                    "fallback_hits": len(fallback_assignments),
+                    "failed_ids": failed_ids,
+                    "persisted": on_assignments is not None
                 }
             else:
                 return {
                     "success": False,
-                    "error": "Analiz başarısız - LLM yanıt vermedi"
+                    "error": "Analiz başarısız - LLM yanıt vermedi",
+                    "failed_ids": failed_ids
                 }
                 
         except Exception as e:
@@ -77,48 +223,208 @@ class AnalysisAgent:
                 "error": str(e)
             }
 
-    def _analyze_with_llm_batch(self, jsonl_input: str) -> List[Dict]:
-        """LLM ile batch analiz - JSONL input, JSONL output"""
-        try:
-            # Kategorileri string olarak hazırla
-            categories_str = "\n".join([f"- {cat}" for cat in self.categories])
-            
-            # Reason'ları string olarak hazırla  
-            reasons_str = "\n".join([f"{i+1}. {reason}" for i, reason in enumerate(self.reasons)])
+    def _cluster_near_duplicates(self, complaints: List[Dict]) -> tuple:
+        """(temsilci şikayetler, temsilci ID -> küme üyeleri)"""
+        if not Config.NEAR_DUPLICATE_ENABLED or len(complaints) < 2:
+            return complaints, {}
+        
+        ids = [complaint["Complaint_ID"] for complaint in complaints]
+        pairs = self.db_manager.find_near_duplicate_pairs(ids, Config.NEAR_DUPLICATE_THRESHOLD)
+        if not pairs:
+            return complaints, {}
+        
+        clusters = {rep: members for rep, members in cluster_pairs(ids, pairs).items() if len(members) > 1}
+        followers = {member for rep, members in clusters.items() for member in members if member != rep}
+        representatives = [complaint for complaint in complaints if complaint["Complaint_ID"] not in followers]
+        return representatives, clusters
+    
+    @staticmethod
+    def _cluster_followers(assignments: List[Dict], clusters: Dict[int, List[int]]) -> List[Dict]:
+        """Temsilcilerin etiketini (ve versiyon damgasını) küme üyelerine kopyala"""
+        followers = []
+        for assignment in assignments:
+            for member in clusters.get(assignment["Complaint_ID"], []):
+                if member != assignment["Complaint_ID"]:
+                    followers.append({
+                        "Complaint_ID": member,
+                        "category": assignment["category"],
+                        "reason": assignment["reason"],
+                        "taxonomy_version": assignment.get("taxonomy_version"),
+                        "prompt_version": assignment.get("prompt_version"),
+                        "model_name": assignment.get("model_name")
+                    })
+        return followers
+    
+    @staticmethod
+    def _estimate_tokens(text: str) -> int:
+        """Kaba token tahmini (Türkçe metinde ~3 karakter/token)"""
+        return len(text) // 3 + 1
+    
+    def _build_batches(self, complaints: List[Dict]) -> List[List[Dict]]:
+        """Şikayetleri girdi token bütçesini ve çıktı satır sınırını aşmayacak parçalara böl"""
+        batches = []
+        current = []
+        current_tokens = 0
+        
+        for complaint in complaints:
+            tokens = self._estimate_tokens(self._compact_line(len(current) + 1, complaint))
+            if current and (current_tokens + tokens > Config.LLM_BATCH_TOKEN_BUDGET
+                            or len(current) >= Config.LLM_BATCH_MAX_ITEMS):
+                batches.append(current)
+                current = []
+                current_tokens = 0
+            current.append(complaint)
+            current_tokens += tokens
+        
+        if current:
+            batches.append(current)
+        return batches
+    
+    def _dispatch_batches(self, batches: List[List[Dict]],
+                          on_assignments: Optional[Callable[[List[Dict]], None]] = None) -> List[Dict]:
+        """Parçaları paralel analiz et, sonuçları Complaint_ID'ye göre birleştir"""
+        analyze = partial(self._analyze_batch, on_assignments=on_assignments)
+        if len(batches) == 1:
+            results = [analyze(batches[0])]
+        else:
+            workers = min(Config.LLM_MAX_CONCURRENCY, len(batches))
+            # Sağlayıcı kotası LLMClient'taki ortak rate limiter ile korunur
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(analyze, batches))
+        
+        # Model aynı ID'yi iki kez döndürdüyse tek atama kalır
+        merged = {}
+        for assignments in results:
+            for assignment in assignments:
+                merged[assignment["Complaint_ID"]] = assignment
+        
+        return list(merged.values())
+    
+    @staticmethod
+    def _compact_line(index: int, complaint: Dict) -> str:
+        """Sınıflandırma için gereken en kısa satır: yerel sıra no, başlık, kısaltılmış metin"""
+        body = (complaint.get("full_comment") or "")[:Config.LLM_BODY_MAX_CHARS]
+        return json.dumps({"i": index, "t": complaint.get("title") or "", "b": body},
+                          ensure_ascii=False, separators=(',', ':'))
+    
+    def _encode_batch(self, batch: List[Dict]) -> tuple:
+        """Parçayı kompakt JSONL'e çevir; (girdi, yerel sıra no -> Complaint_ID)"""
+        index_map = {}
+        lines = []
+        for index, complaint in enumerate(batch, 1):
+            index_map[str(index)] = complaint["Complaint_ID"]
+            lines.append(self._compact_line(index, complaint))
+        return "\n".join(lines), index_map
+    
+    def _analyze_batch(self, batch: List[Dict],
+                       on_assignments: Optional[Callable[[List[Dict]], None]] = None) -> List[Dict]:
+        """Parçayı analiz et; yanıtta eksik kalanları küçük parçalarla, artan beklemeyle tekrar iste"""
+        assignments = self._request_batch(batch, on_assignments)
+        
+        for attempt in range(Config.LLM_GAP_RETRIES):
+            # Sadece dönmeyenler tekrar gönderilir - dönen şikayet ikinci kez ücretlendirilmez
+            returned = {assignment["Complaint_ID"] for assignment in assignments}
+            missing = [complaint for complaint in batch if complaint["Complaint_ID"] not in returned]
+            if not missing or not self.llm_client.available():
+                break
             
-            prompt = f"""Sen bir Vestel ürün şikayet kategorilendirme uzmanısın. 
+            time.sleep(Config.LLM_GAP_BACKOFF_SECONDS * (2 ** attempt))
+            for start in range(0, len(missing), Config.LLM_GAP_BATCH_SIZE):
+                assignments.extend(
+                    self._request_batch(missing[start:start + Config.LLM_GAP_BATCH_SIZE], on_assignments,
+                                        attempt=attempt + 1))
+        
+        return assignments
+    
+    def _request_batch(self, batch: List[Dict], on_assignments: Optional[Callable[[List[Dict]], None]] = None,
+                       attempt: int = 0) -> List[Dict]:
+        """Tek LLM isteği - yerel sıra numaralarını Complaint_ID'ye geri çevir"""
+        compact_input, index_map = self._encode_batch(batch)
+        
+        def remap(parsed: List[Dict]) -> List[Dict]:
+            mapped = []
+            for assignment in parsed:
+                index = str(assignment["Complaint_ID"])
+                if index in index_map:
+                    assignment["Complaint_ID"] = index_map.pop(index)
+                    mapped.append(assignment)
+            return self._stamp(mapped, self.llm_client.model_name)
+        
+        if on_assignments is not None and Config.LLM_STREAMING:
+            # Akış modu: tamamlanan her satır grubu hemen iletilir
+            assignments = []
+            for parsed in self._stream_llm_batch(compact_input, attempt):
+                mapped = remap(parsed)
+                if mapped:
+                    assignments.extend(mapped)
+                    on_assignments(mapped)
+            return assignments
+        
+        assignments = remap(self._analyze_with_llm_batch(compact_input, attempt))
+        if on_assignments is not None and assignments:
+            on_assignments(assignments)
+        return assignments
+    
+    def measure_encoding(self, complaints: List[Dict]) -> Dict:
+        """Eski (tam JSONL) ve kompakt kodlamanın şikayet başına token maliyetini karşılaştır"""
+        if not complaints:
+            return {}
+        
+        legacy = "\n".join(json.dumps({
+            "Complaint_ID": c.get("Complaint_ID"),
+            "full_comment": c.get("full_comment"),
+            "ref_url": c.get("ref_url"),
+            "title": c.get("title"),
+            "date": c.get("date")
+        }, ensure_ascii=False) for c in complaints)
+        compact, _ = self._encode_batch(complaints)
+        
+        legacy_tokens = self.llm_client.count_tokens(legacy)
+        compact_tokens = self.llm_client.count_tokens(compact)
+        return {
+            "complaints": len(complaints),
+            "legacy_tokens_per_complaint": round(legacy_tokens / len(complaints), 1),
+            "compact_tokens_per_complaint": round(compact_tokens / len(complaints), 1),
+            "reduction_ratio": round(legacy_tokens / compact_tokens, 2) if compact_tokens else 0.0
+        }
+    
+    @staticmethod
+    def _call_site(attempt: int) -> str:
+        """LLM ölçümlerinde çağrı yeri: ilk istek ya da eksik tamamlama"""
+        return "analysis_gap_retry" if attempt else "analysis_batch"
+    
+    def _build_prompt(self, jsonl_input: str) -> str:
+        """Kompakt girdi için sınıflandırma prompt'u"""
+        # Kategoriler ve nedenler virgülle - satır başına liste gereksiz token harcıyor
+        categories_str = ", ".join(self.categories)
+        reasons_str = ", ".join(self.reasons)
+        
+        return f"""Sen bir Vestel ürün şikayet kategorilendirme uzmanısın.
 
-Aşağıdaki JSONL formatındaki şikayetleri analiz ederek her birini doğru kategoriye ata ve şikayet nedenini belirle.
+Her satır bir şikayet: i = sıra no, t = başlık, b = şikayet metni (kısaltılmış olabilir).
 
-GİRİŞ VERİSİ:
+GİRİŞ:
 {jsonl_input}
 
-MEVCUT KATEGORİLER (Vestel Ürünleri):
-{categories_str}
+KATEGORİLER: {categories_str}
 
-ŞİKAYET NEDENLERİ:
-{reasons_str}
+NEDENLER: {reasons_str}
 
-GÖREV:
-1. Her şikayetin başlık ve içeriğini analiz et
-2. Şikayetin hangi Vestel ürününe ait olduğunu belirle (category)
-3. Şikayetin nedenini belirle (reason) - yukarıdaki 10 nedeninden birini seç
-4. SADECE aşağıdaki JSONL formatında çıktı ver:
+GÖREV: Her şikayet için ürün kategorisini (c) ve şikayet nedenini (r) belirle.
+Her giriş satırı için tek satır JSON yaz, başka hiçbir şey yazma:
+{{"i":1,"c":"Televizyon","r":"Teknik Servis"}}
 
-ÇIKTI FORMATI (Her satır ayrı JSON objesi olacak):
-{{"Complaint_ID": 1, "category": "Televizyon", "reason": "Teknik Servis"}}
-{{"Complaint_ID": 2, "category": "Buzdolabı", "reason": "İade & Değişim"}}
-
-ÖNEMLİ:
-- Sadece yukarıdaki kategorilerden birini kullan (category)
-- Sadece yukarıdaki 10 nedenden birini kullan (reason)  
-- Her şikayet için kesinlikle category ve reason ata
-- Başka hiçbir açıklama yapma
-- Sadece JSONL formatında yanıt ver
+KURALLAR:
+- c sadece KATEGORİLER listesinden, r sadece NEDENLER listesinden
+- Her i için mutlaka bir satır
 
 CEVAP:"""
-
-            response = self.llm_client.generate_content(prompt)
+    
+    def _analyze_with_llm_batch(self, jsonl_input: str, attempt: int = 0) -> List[Dict]:
+        """LLM ile batch analiz - kompakt JSONL input, kompakt JSONL output"""
+        try:
+            response = self.llm_client.generate_content(
+                self._build_prompt(jsonl_input), call_site=self._call_site(attempt), attempt=attempt)
             
             # LLM çıktısını parse et
             analysis_assignments = self._parse_llm_response(response)
@@ -127,54 +433,77 @@ CEVAP:"""
             
         except Exception as e:
             return []
+    
+    def _stream_llm_batch(self, jsonl_input: str, attempt: int = 0):
+        """LLM yanıtını akış halinde oku, tamamlanan satırları parse edip parça parça üret"""
+        buffer = ""
+        try:
+            for text in self.llm_client.generate_content_stream(
+                    self._build_prompt(jsonl_input), call_site=self._call_site(attempt), attempt=attempt):
+                buffer += text
+                *lines, buffer = buffer.split('\n')
+                parsed = [a for a in (self._parse_llm_line(line) for line in lines) if a]
+                if parsed:
+                    yield parsed
+            
+            last = self._parse_llm_line(buffer)
+            if last:
+                yield [last]
+                
+        except Exception as e:
+            # Yanıt yarıda kesildi - o ana kadar üretilen satırlar çağıranda kalır
+            return
 
     def _parse_llm_response(self, response: str) -> List[Dict]:
         """LLM'den gelen JSONL yanıtını parse et"""
         try:
             analysis_assignments = []
-            lines = response.strip().split('\n')
-            
-            for line_num, line in enumerate(lines, 1):
-                line = line.strip()
-                if not line or line.startswith('```'):
-                    continue
-                
-                try:
-                    # JSON parse et
-                    data = json.loads(line)
-                    
-                    # Gerekli alanları kontrol et
-                    if 'Complaint_ID' in data and 'category' in data and 'reason' in data:
-                        complaint_id = data['Complaint_ID']
-                        category = data['category']
-                        reason = data['reason']
-                        
-                        # Category validasyonu
-                        if category not in self.categories:
-                            category = self._find_closest_category(category)
-                        
-                        # Reason validasyonu
-                        if reason not in self.reasons:
-                            reason = self._find_closest_reason(reason)
-                        
-                        analysis_assignments.append({
-                            "Complaint_ID": complaint_id,
-                            "category": category,
-                            "reason": reason
-                        })
-                    else:
-                        pass
-                        
-                except json.JSONDecodeError as e:
-                    continue
-                except Exception as e:
-                    continue
+            for line in response.strip().split('\n'):
+                assignment = self._parse_llm_line(line)
+                if assignment:
+                    analysis_assignments.append(assignment)
             
             return analysis_assignments
             
         except Exception as e:
             return []
     
+    def _parse_llm_line(self, line: str) -> Optional[Dict]:
+        """Tek JSONL satırını doğrula ve atamaya çevir (geçersizse None)"""
+        line = line.strip()
+        if not line or line.startswith('```'):
+            return None
+        
+        try:
+            # JSON parse et
+            data = json.loads(line)
+            
+            # Gerekli alanları kontrol et (i = parçadaki sıra no, çağıran Complaint_ID'ye çevirir)
+            if not isinstance(data, dict) or not ('i' in data and 'c' in data and 'r' in data):
+                return None
+            
+            category = data['c']
+            reason = data['r']
+            
+            # Category validasyonu
+            if category not in self.categories:
+                category = self._find_closest_category(category)
+            
+            # Reason validasyonu
+            if reason not in self.reasons:
+                reason = self._find_closest_reason(reason)
+            
+            return {
+                "Complaint_ID": data['i'],
+                "category": category,
+                "reason": reason
+            }
+            
+        except json.JSONDecodeError as e:
+            return None
+        except Exception as e:
+            return None
+    
     def _find_closest_reason(self, response_reason: str) -> str:
         """Yanıtta geçen reason ile en yakın gerçek reason'u bul"""
         response_lower = response_reason.lower()
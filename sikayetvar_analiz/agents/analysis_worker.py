@@ -0,0 +1,181 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Dict, List
+
+from config import Config
+from utils.rate_limiter import RateLimiter
+
+
+class AnalysisWorker:
+    """
+    Arka Plan Analiz Worker'ı
+    - analysis_queue'dan en yeni şikayetleri kiralar (claim_analysis_batch) ve AnalysisAgent ile sınıflandırır
+    - Sonuçlar geldikçe insert_analysis ile yazılır; sonuçsuz kalanlar kuyruğa geri bırakılır
+    - Bütçe: dakikada en fazla batches_per_minute parça, saatte en fazla tokens_per_hour tahmini girdi token'ı
+    - Yeni şikayet eklenince notify() ile hemen uyanır, yoksa poll_seconds aralıkla kuyruğu yoklar
+    - Sağlayıcı devre dışıyken (circuit breaker) parça almaz - arka plan işi yerel tahminle doldurulmaz
+    """
+
+    def __init__(self, db_manager, analysis_agent, batch_size: int = None, poll_seconds: float = None,
+                 batches_per_minute: int = None, tokens_per_hour: int = None, lease_seconds: int = 600):
+        self.db_manager = db_manager
+        self.analysis_agent = analysis_agent
+        self.batch_size = batch_size or Config.ANALYSIS_WORKER_BATCH_SIZE
+        self.poll_seconds = poll_seconds if poll_seconds is not None else Config.ANALYSIS_WORKER_POLL_SECONDS
+        self.tokens_per_hour = tokens_per_hour if tokens_per_hour is not None else Config.ANALYSIS_WORKER_TOKENS_PER_HOUR
+        self.lease_seconds = lease_seconds
+        self.worker_id = f"worker-{os.getpid()}-{id(self):x}"
+        self.rate_limiter = RateLimiter(batches_per_minute or Config.ANALYSIS_WORKER_BATCHES_PER_MINUTE, burst=1)
+
+        self._wake_event = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        # (zaman, tahmini token) - son bir saatlik harcama
+        self._spent = deque()
+        # (zaman, sınıflandırılan adet) - son beş dakikalık verim
+        self._completed = deque()
+        self.metrics = {
+            "state": "stopped",
+            "batches": 0,
+            "classified": 0,
+            "released": 0,
+            "errors": 0,
+            "estimated_tokens": 0,
+            "last_batch_at": None,
+            "last_error": None
+        }
+
+    def start(self):
+        """Worker thread'ini başlat"""
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Worker'ı durdur (elindeki parçayı bitirir)"""
+        self._stop_event.set()
+        self._wake_event.set()
+        if self._thread:
+            self._thread.join(timeout=30)
+        self.metrics["state"] = "stopped"
+
+    def notify(self):
+        """Yeni şikayet eklendi - beklemeyi kes"""
+        self._wake_event.set()
+
+    def _run_loop(self):
+        while not self._stop_event.is_set():
+            try:
+                processed = self.run_once()
+            except Exception as e:
+                processed = 0
+                with self._lock:
+                    self.metrics["errors"] += 1
+                    self.metrics["last_error"] = str(e)
+
+            # Kuyruk boşaldıysa (ya da bütçe dolduysa) bildirim veya poll süresi kadar bekle
+            if not processed:
+                self._wake_event.wait(self._idle_seconds())
+                self._wake_event.clear()
+
+    def _idle_seconds(self) -> float:
+        """Bütçe doluysa en eski harcamanın saatlik pencereden çıkmasına kadar, değilse poll süresi kadar"""
+        if self.metrics["state"] != "budget_exhausted" or not self._spent:
+            return self.poll_seconds
+        return max(self.poll_seconds, self._spent[0][0] + 3600 - time.time())
+
+    def _spent_last_hour(self) -> int:
+        cutoff = time.time() - 3600
+        with self._lock:
+            while self._spent and self._spent[0][0] < cutoff:
+                self._spent.popleft()
+            return sum(tokens for _, tokens in self._spent)
+
+    def run_once(self) -> int:
+        """Tek parça kirala, sınıflandır, yaz - sınıflandırılan şikayet sayısını döndür"""
+        if self.tokens_per_hour and self._spent_last_hour() >= self.tokens_per_hour:
+            self.metrics["state"] = "budget_exhausted"
+            return 0
+        if not self.analysis_agent.llm_client.available():
+            self.metrics["state"] = "provider_unavailable"
+            return 0
+
+        complaints = self.db_manager.claim_analysis_batch(
+            self.batch_size, self.worker_id, lease_seconds=self.lease_seconds,
+            max_attempts=Config.ANALYSIS_MAX_ATTEMPTS
+        )
+        if not complaints:
+            self.metrics["state"] = "idle"
+            return 0
+
+        # Parça hızı bütçesi - bekleme kira süresinden çok kısa
+        self.rate_limiter.acquire()
+        self.metrics["state"] = "running"
+        complaint_ids = [complaint["Complaint_ID"] for complaint in complaints]
+        jsonl_data = "\n".join(json.dumps(complaint, ensure_ascii=False) for complaint in complaints)
+        estimated_tokens = sum(
+            self.analysis_agent._estimate_tokens(self.analysis_agent._compact_line(index + 1, complaint))
+            for index, complaint in enumerate(complaints)
+        )
+
+        saved_ids = set()
+
+        def persist(assignments: List[Dict]):
+            self.db_manager.insert_analysis(assignments)
+            with self._lock:
+                saved_ids.update(assignment["Complaint_ID"] for assignment in assignments)
+
+        try:
+            result = self.analysis_agent.analyze_complaints(
+                jsonl_data, complaint_ids, on_assignments=persist, record_failures=False)
+            error = None if result.get("success") else result.get("error")
+            # Önbellek / yerel sınıflandırıcı / yakın kopya ile çözülenler LLM maliyeti oluşturmaz
+            free = sum(result.get(key, 0) for key in ("cache_hits", "local_hits", "near_duplicate_hits", "fallback_hits"))
+            estimated_tokens = estimated_tokens * max(len(complaints) - free, 0) // len(complaints)
+        except Exception as e:
+            error = str(e)
+
+        # Kiralanıp sonuç alınamayanlar kuyruğa geri (deneme hakkı bitenler 'failed');
+        # sağlayıcı kesintisi deneme hakkını tüketmez
+        unsaved = [complaint_id for complaint_id in complaint_ids if complaint_id not in saved_ids]
+        released = self.db_manager.release_analysis_claims(
+            unsaved, error or "LLM yanıtında eksik", max_attempts=Config.ANALYSIS_MAX_ATTEMPTS,
+            count_attempt=not self.analysis_agent.llm_client.provider_failing())
+
+        now = time.time()
+        with self._lock:
+            self._spent.append((now, estimated_tokens))
+            self._completed.append((now, len(saved_ids)))
+            self.metrics["batches"] += 1
+            self.metrics["classified"] += len(saved_ids)
+            self.metrics["released"] += released
+            self.metrics["estimated_tokens"] += estimated_tokens
+            self.metrics["last_batch_at"] = datetime.now().isoformat()
+            if error:
+                self.metrics["errors"] += 1
+                self.metrics["last_error"] = error
+
+        return len(saved_ids)
+
+    def get_metrics(self) -> Dict:
+        """Durum, gecikme (kuyruk yaşı), verim ve bütçe kullanımı"""
+        cutoff = time.time() - 300
+        with self._lock:
+            while self._completed and self._completed[0][0] < cutoff:
+                self._completed.popleft()
+            recent = sum(count for _, count in self._completed)
+            metrics = dict(self.metrics)
+
+        metrics["complaints_per_minute"] = round(recent / 5, 1)
+        metrics["tokens_last_hour"] = self._spent_last_hour()
+        metrics["tokens_per_hour_budget"] = self.tokens_per_hour
+        metrics["queue"] = self.db_manager.get_analysis_queue_lag()
+        return metrics
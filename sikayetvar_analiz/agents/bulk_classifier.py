@@ -0,0 +1,321 @@
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+
+# SQLite'ın IN (...) parametre sınırının altında kalmak için
+ID_CHUNK_SIZE = 900
+# Toplu işe tek seferde kiralanan şikayet sayısı
+CLAIM_CHUNK_SIZE = 5000
+# Toplu işlerin kuyruktaki kira sahibi öneki (istek yolu bu şikayetlerin sonucunu beklemez)
+BULK_OWNER_PREFIX = "bulk-"
+
+
+class BulkClassifier:
+    """
+    Toplu (Offline) Sınıflandırma - geçmiş verilerin yeniden doldurulması
+    - Kuyruktaki şikayetleri uzun süreli kiralar, önbellek / yerel sınıflandırıcı ile çözülemeyenleri
+      AnalysisAgent'ın parçalarıyla aynı prompt'larla Batch API işlerine böler
+    - İş ve parça durumları bulk_jobs / bulk_job_batches tablolarında tutulur; yeniden başlatmada
+      gönderilmemiş parçalar gönderilir, gönderilmişler sorgulanmaya devam eder
+    - Tamamlanan işin sonuçları insert_analysis ile yazılır, sonuçsuz kalanlar kuyruğa geri bırakılır
+    """
+
+    def __init__(self, db_manager, analysis_agent, requests_per_job: int = None, poll_seconds: float = None):
+        self.db_manager = db_manager
+        self.analysis_agent = analysis_agent
+        self.llm_client = analysis_agent.llm_client
+        self.requests_per_job = requests_per_job or Config.BULK_REQUESTS_PER_JOB
+        self.poll_seconds = poll_seconds if poll_seconds is not None else Config.BULK_POLL_SECONDS
+        self.lease_seconds = int(Config.BULK_LEASE_HOURS * 3600)
+
+        self._stop_event = threading.Event()
+        self._wake_event = threading.Event()
+        self._thread = None
+        # Aynı parçanın iki kez gönderilmesini / işlenmesini önler
+        self._lock = threading.Lock()
+        self.metrics = {
+            "state": "stopped",
+            "runs": 0,
+            "errors": 0,
+            "last_run_at": None,
+            "last_error": None
+        }
+
+    @property
+    def supported(self) -> bool:
+        return hasattr(self.llm_client.backend, 'submit_batch')
+
+    def create_job(self, start_date: str = None, end_date: str = None, limit: int = None) -> int:
+        """Yeni iş kaydı oluştur (hazırlık prepare_job ile yapılır)"""
+        if not self.supported:
+            raise ValueError(f"{Config.LLM_BACKEND} backend toplu sınıflandırmayı desteklemiyor")
+        return self.db_manager.create_bulk_job(start_date, end_date, limit)
+
+    def prepare_job(self, job_id: int) -> Dict:
+        """Şikayetleri kirala, LLM'e gerekmeyenleri hemen yaz, kalanları parça parça kaydedip gönder"""
+        job = self.db_manager.get_bulk_jobs(job_id)[0]
+        worker_id = f"{BULK_OWNER_PREFIX}{job_id}"
+        classified = 0
+
+        try:
+            candidate_ids = self.db_manager.get_pending_analysis_ids(
+                job['start_date'], job['end_date'], job['max_complaints'])
+
+            for start in range(0, len(candidate_ids), CLAIM_CHUNK_SIZE):
+                chunk = candidate_ids[start:start + CLAIM_CHUNK_SIZE]
+                complaints = []
+                for id_start in range(0, len(chunk), ID_CHUNK_SIZE):
+                    ids = chunk[id_start:id_start + ID_CHUNK_SIZE]
+                    complaints.extend(self.db_manager.claim_analysis_batch(
+                        len(ids), worker_id, lease_seconds=self.lease_seconds,
+                        max_attempts=Config.ANALYSIS_MAX_ATTEMPTS, complaint_ids=ids))
+                if not complaints:
+                    continue
+
+                # Önbellek ve yerel sınıflandırıcı Batch API'den de ucuz - bunlar hemen yazılır
+                resolved, pending = self._resolve_locally(complaints)
+                if resolved:
+                    self.db_manager.insert_analysis(resolved)
+                    classified += len(resolved)
+
+                batches = self.analysis_agent._build_batches(pending)
+                for group_start in range(0, len(batches), self.requests_per_job):
+                    group = batches[group_start:group_start + self.requests_per_job]
+                    self.db_manager.add_bulk_job_batch(
+                        job_id, [[complaint["Complaint_ID"] for complaint in batch] for batch in group])
+
+            self.db_manager.update_bulk_job(job_id, status='running', classified=classified, total=classified)
+            self.submit_pending(job_id)
+            self.db_manager.finish_bulk_jobs()
+            return {"success": True, "job_id": job_id, "classified_locally": classified}
+
+        except Exception as e:
+            # Kiralanıp parçaya yazılamayanlar kira süresi dolunca kuyruğa döner
+            self.db_manager.update_bulk_job(job_id, status='failed', classified=classified, error=str(e))
+            return {"success": False, "job_id": job_id, "error": str(e)}
+
+    def _resolve_locally(self, complaints: List[Dict]) -> tuple:
+        """(önbellek + yerel sınıflandırıcı atamaları, LLM'e kalan şikayetler)"""
+        agent = self.analysis_agent
+        resolved, pending = agent.cache.lookup(complaints) if agent.cache else ([], complaints)
+        agent._stamp(resolved, self.llm_client.model_name)
+        if agent.local_classifier and pending:
+            local_assignments, pending = agent.local_classifier.split_confident(pending)
+            resolved = resolved + agent._stamp(local_assignments, agent.LOCAL_MODEL)
+        return resolved, pending
+
+    def _load_complaints(self, complaint_ids: List[int]) -> Dict[int, Dict]:
+        """Kuyrukta hâlâ analiz bekleyen şikayetler (ID -> şikayet)"""
+        complaints = {}
+        for start in range(0, len(complaint_ids), ID_CHUNK_SIZE):
+            for complaint in self.db_manager.get_uncategorized_complaints(complaint_ids[start:start + ID_CHUNK_SIZE]):
+                complaints[complaint["Complaint_ID"]] = complaint
+        return complaints
+
+    def submit_pending(self, job_id: int = None) -> int:
+        """Gönderilmemiş parçaları Batch API'ye gönder - gönderilen parça sayısı"""
+        submitted = 0
+        for batch in self.db_manager.get_bulk_job_batches(['pending'], job_id):
+            with self._lock:
+                complaints = self._load_complaints([cid for ids in batch['requests'] for cid in ids])
+                # Bu arada başka yoldan analiz edilenler çıkarılır; saklanan sıra sonuçların eşleştirmesidir
+                requests = [[cid for cid in ids if cid in complaints] for ids in batch['requests']]
+                requests = [ids for ids in requests if ids]
+                if not requests:
+                    self.db_manager.update_bulk_job_batch(batch['Batch_ID'], 'ingested', requests=[])
+                    continue
+
+                prompts = []
+                for ids in requests:
+                    compact_input, _ = self.analysis_agent._encode_batch([complaints[cid] for cid in ids])
+                    prompts.append(self.analysis_agent._build_prompt(compact_input))
+
+                try:
+                    self.llm_client.rate_limiter.acquire()
+                    provider_job = self.llm_client.backend.submit_batch(
+                        prompts, f"sikayetvar-bulk-{batch['Job_ID']}-{batch['Batch_ID']}")
+                except Exception as e:
+                    # Parça 'pending' kalır, sonraki turda tekrar denenir
+                    self.db_manager.update_bulk_job_batch(batch['Batch_ID'], 'pending', error=str(e))
+                    continue
+
+                self.db_manager.update_bulk_job_batch(batch['Batch_ID'], 'submitted', provider_job=provider_job,
+                                                      requests=requests)
+                submitted += 1
+        return submitted
+
+    def poll(self, job_id: int = None) -> Dict:
+        """Gönderilmiş parçaların durumunu sor, tamamlananları yaz"""
+        summary = {"running": 0, "ingested": 0, "failed": 0, "classified": 0, "released": 0}
+        for batch in self.db_manager.get_bulk_job_batches(['submitted'], job_id):
+            with self._lock:
+                try:
+                    status = self.llm_client.backend.get_batch(batch['provider_job'])
+                except Exception as e:
+                    # Geçici sorgu hatası - iş sağlayıcıda sürüyor olabilir
+                    summary["running"] += 1
+                    continue
+
+                if status["state"] == "running":
+                    summary["running"] += 1
+                    continue
+
+                ids = [cid for request in batch['requests'] for cid in request]
+                if status["state"] == "failed":
+                    released = self.db_manager.release_analysis_claims(
+                        ids, status.get("error"), max_attempts=Config.ANALYSIS_MAX_ATTEMPTS,
+                        lease_owner=f"{BULK_OWNER_PREFIX}{batch['Job_ID']}")
+                    self.db_manager.update_bulk_job_batch(batch['Batch_ID'], 'failed', error=status.get("error"))
+                    self.db_manager.update_bulk_job(batch['Job_ID'], released=released)
+                    summary["failed"] += 1
+                    summary["released"] += released
+                    continue
+
+                classified, released = self._ingest(batch, status)
+                summary["ingested"] += 1
+                summary["classified"] += classified
+                summary["released"] += released
+
+        self.db_manager.finish_bulk_jobs()
+        return summary
+
+    def _ingest(self, batch: Dict, status: Dict) -> tuple:
+        """Sonuçları yerel sıra numarasından Complaint_ID'ye çevirip yaz - (yazılan, geri bırakılan)"""
+        assignments = []
+        for ids, text in zip(batch['requests'], status["results"]):
+            if not text:
+                continue
+            index_map = {str(index): cid for index, cid in enumerate(ids, 1)}
+            for assignment in self.analysis_agent._parse_llm_response(text):
+                index = str(assignment["Complaint_ID"])
+                if index in index_map:
+                    assignment["Complaint_ID"] = index_map.pop(index)
+                    assignments.append(assignment)
+
+        complaint_ids = [cid for ids in batch['requests'] for cid in ids]
+        self.analysis_agent._stamp(assignments, self.llm_client.model_name)
+        if assignments:
+            if self.analysis_agent.cache:
+                complaints = self._load_complaints([assignment["Complaint_ID"] for assignment in assignments])
+                self.analysis_agent.cache.store(list(complaints.values()), assignments)
+            self.db_manager.insert_analysis(assignments)
+
+        returned = {assignment["Complaint_ID"] for assignment in assignments}
+        missing = [cid for cid in complaint_ids if cid not in returned]
+        # Kira süresi dolup başka bir sahibe geçen şikayetler bırakılmaz
+        released = self.db_manager.release_analysis_claims(
+            missing, "Toplu iş yanıtında eksik", max_attempts=Config.ANALYSIS_MAX_ATTEMPTS,
+            lease_owner=f"{BULK_OWNER_PREFIX}{batch['Job_ID']}")
+
+        self._record_usage(batch, status)
+        self.db_manager.update_bulk_job_batch(batch['Batch_ID'], 'ingested')
+        self.db_manager.update_bulk_job(batch['Job_ID'], classified=len(assignments), released=released)
+        return len(assignments), released
+
+    def _record_usage(self, batch: Dict, status: Dict):
+        """Maliyet raporu için: gecikme = gönderimden tamamlanmaya kadar geçen süre"""
+        usage = status.get("usage", {})
+        latency_ms = 0.0
+        if batch.get('submitted_at'):
+            submitted_at = datetime.strptime(batch['submitted_at'], '%Y-%m-%d %H:%M:%S')
+            latency_ms = (datetime.utcnow() - submitted_at).total_seconds() * 1000
+        self.llm_client.metrics.record(
+            'bulk_batch', self.llm_client.model_name, latency_ms,
+            prompt_tokens=usage.get("prompt_tokens", 0), response_tokens=usage.get("response_tokens", 0))
+
+    def resume(self) -> Dict:
+        """Yeniden başlatma sonrası: bekleyen parçaları gönder, gönderilmişleri sorgula"""
+        submitted = self.submit_pending()
+        return dict(self.poll(), submitted=submitted)
+
+    def start(self):
+        """Sorgulama thread'ini başlat (önce yarım kalan işlere devam eder)"""
+        if not self.supported or (self._thread and self._thread.is_alive()):
+            return
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        self._wake_event.set()
+        if self._thread:
+            self._thread.join(timeout=30)
+        self.metrics["state"] = "stopped"
+
+    def notify(self):
+        """Yeni iş gönderildi - beklemeden sorgula"""
+        self._wake_event.set()
+
+    def _run_loop(self):
+        while not self._stop_event.is_set():
+            self.metrics["state"] = "running"
+            try:
+                self.resume()
+            except Exception as e:
+                # Sorgulama döngüsü durmaz; hata /api/bulk/jobs yanıtındaki metriklerde görünür
+                self.metrics["errors"] += 1
+                self.metrics["last_error"] = str(e)
+            self.metrics["runs"] += 1
+            self.metrics["last_run_at"] = datetime.now().isoformat()
+            self.metrics["state"] = "idle"
+            self._wake_event.wait(self.poll_seconds)
+            self._wake_event.clear()
+
+    def get_metrics(self) -> Dict:
+        """Sorgulama döngüsünün durumu ve son hatası"""
+        return dict(self.metrics)
+
+    def wait(self, job_id: int, timeout: float = None) -> Dict:
+        """İş tamamlanana kadar sorgula (CLI)"""
+        deadline = time.time() + timeout if timeout else None
+        while True:
+            self.submit_pending(job_id)
+            self.poll(job_id)
+            job = self.db_manager.get_bulk_jobs(job_id)[0]
+            if job['status'] in ('completed', 'failed') or (deadline and time.time() > deadline):
+                return job
+            time.sleep(min(self.poll_seconds, 10))
+
+
+if __name__ == '__main__':
+    import argparse
+    import json
+
+    from agents.analysis_agent import AnalysisAgent
+    from database_manager import DatabaseManager
+
+    parser = argparse.ArgumentParser(description="Geçmiş şikayetler için toplu (Batch API) sınıflandırma")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    submit_parser = subparsers.add_parser('submit', help="Yeni iş oluştur ve gönder")
+    submit_parser.add_argument('--start-date', help="YYYY-MM-DD")
+    submit_parser.add_argument('--end-date', help="YYYY-MM-DD")
+    submit_parser.add_argument('--limit', type=int)
+    submit_parser.add_argument('--wait', action='store_true', help="Tamamlanana kadar bekle")
+    subparsers.add_parser('status', help="İşleri listele")
+    poll_parser = subparsers.add_parser('poll', help="Yarım kalan işlere devam et")
+    poll_parser.add_argument('--job-id', type=int)
+    poll_parser.add_argument('--wait', action='store_true')
+    args = parser.parse_args()
+
+    db_manager = DatabaseManager()
+    classifier = BulkClassifier(db_manager, AnalysisAgent(db_manager))
+
+    if args.command == 'submit':
+        job_id = classifier.create_job(args.start_date, args.end_date, args.limit)
+        result = classifier.prepare_job(job_id)
+        if args.wait and result["success"]:
+            result = classifier.wait(job_id)
+    elif args.command == 'poll':
+        result = classifier.wait(args.job_id) if args.wait and args.job_id else classifier.resume()
+    else:
+        result = db_manager.get_bulk_jobs()
+    print(json.dumps(result, ensure_ascii=False, indent=2, default=str))
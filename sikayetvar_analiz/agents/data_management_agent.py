@@ -1,9 +1,11 @@
 import subprocess
 import json
 import os
+import uuid
 from typing import List, Dict, Optional, Tuple
 from datetime import datetime, timedelta
 from config import Config
+from agents.bulk_classifier import BULK_OWNER_PREFIX
 
 class DataManagementAgent:
     """
@@ -11,11 +13,14 @@ class DataManagementAgent:
     - Scrapy komutlarını çalıştırır
     - Veritabanını günceller  
     - Root Agent için veri hazırlar
+    - Analiz edilecek şikayetleri istek adına kiralar (eşzamanlı istekler aynı şikayeti iki kez göndermez)
     """
     
-    def __init__(self, db_manager):
+    def __init__(self, db_manager, on_new_complaints=None):
         self.db_manager = db_manager
         self.scrapy_project_path = Config.SCRAPY_PROJECT_PATH
+        # Yeni şikayet eklenince çağrılır (ör. arka plan analiz worker'ını uyandırmak için)
+        self.on_new_complaints = on_new_complaints
     
     def ensure_database_updated(self, command_info: Optional[Dict] = None) -> Dict:
         """Veritabanını incremental update ile güncelle"""
@@ -81,7 +86,7 @@ class DataManagementAgent:
         """Son N şikayeti getir ve kategorisiz olanları filtrele"""
         try:
             # Son N şikayeti al (tarih olarak en yakın)
-            complaints, complaint_ids = self.db_manager.get_complaints_by_count(count)
+            complaints, complaint_ids = self.db_manager.get_complaints_by_count(count, include_body=False)
             
             if not complaints:
                 return {
@@ -94,11 +99,12 @@ class DataManagementAgent:
                 }
             
             
-            # Bu specific ID'ler arasında kategorisiz olanları bul
-            uncategorized = self.db_manager.get_uncategorized_complaints(complaint_ids)
+            # Bu specific ID'ler arasında kategorisiz olanları bu istek adına kirala
+            claim_owner = self.new_claim_owner()
+            uncategorized, in_flight_ids, bulk_queued_ids = self.claim_uncategorized(complaint_ids, claim_owner)
             
             
-            if uncategorized:
+            if uncategorized or in_flight_ids or bulk_queued_ids:
                 # JSONL formatında hazırla
                 jsonl_data = self._prepare_jsonl_data(uncategorized)
                 
@@ -107,9 +113,12 @@ class DataManagementAgent:
                     "data_type": "last_count",
                     "total_requested": count,
                     "total_found": len(complaints),
-                    "uncategorized_count": len(uncategorized),
+                    "uncategorized_count": len(uncategorized) + len(in_flight_ids) + len(bulk_queued_ids),
                     "jsonl_data": jsonl_data,
                     "complaint_ids": [c["Complaint_ID"] for c in uncategorized],
+                    "in_flight_ids": in_flight_ids,
+                    "bulk_queued_ids": bulk_queued_ids,
+                    "claim_owner": claim_owner,
                     "all_complaint_ids": complaint_ids  # Tüm son 5'in ID'si
                 }
             else:
@@ -129,7 +138,7 @@ class DataManagementAgent:
     def _get_complaints_by_date_range(self, start_date: str, end_date: str) -> Dict:
         """Tarih aralığındaki şikayetleri getir"""
         try:
-            complaints, complaint_ids = self.db_manager.get_complaints_by_date_range(start_date, end_date)
+            complaints, complaint_ids = self.db_manager.get_complaints_by_date_range(start_date, end_date, include_body=False)
             
             if not complaints:
                 return {
@@ -141,9 +150,10 @@ class DataManagementAgent:
                     "message": "Bu tarih aralığında şikayet bulunamadı"
                 }
             
-            uncategorized = self.db_manager.get_uncategorized_complaints(complaint_ids)
+            claim_owner = self.new_claim_owner()
+            uncategorized, in_flight_ids, bulk_queued_ids = self.claim_uncategorized(complaint_ids, claim_owner)
             
-            if uncategorized:
+            if uncategorized or in_flight_ids or bulk_queued_ids:
                 jsonl_data = self._prepare_jsonl_data(uncategorized)
                 
                 return {
@@ -151,10 +161,15 @@ class DataManagementAgent:
                     "data_type": "date_range",
                     "date_range": f"{start_date} - {end_date}",
                     "total_found": len(complaints),
-                    "uncategorized_count": len(uncategorized),
+                    "uncategorized_count": len(uncategorized) + len(in_flight_ids) + len(bulk_queued_ids),
                     "jsonl_data": jsonl_data,
                     "complaint_ids": [c["Complaint_ID"] for c in uncategorized],
-                    "all_complaint_ids": complaint_ids
+                    "in_flight_ids": in_flight_ids,
+                    "bulk_queued_ids": bulk_queued_ids,
+                    "claim_owner": claim_owner,
+                    "all_complaint_ids": complaint_ids,
+                    "start_date": start_date,
+                    "end_date": end_date
                 }
             else:
                 return {
@@ -164,7 +179,9 @@ class DataManagementAgent:
                     "total_found": len(complaints),
                     "uncategorized_count": 0,
                     "message": "Tüm şikayetler zaten kategorize edilmiş",
-                    "all_complaint_ids": complaint_ids
+                    "all_complaint_ids": complaint_ids,
+                    "start_date": start_date,
+                    "end_date": end_date
                 }
                 
         except Exception as e:
@@ -194,6 +211,43 @@ class DataManagementAgent:
         except Exception as e:
             return {"success": False, "error": str(e)}
     
+    @staticmethod
+    def new_claim_owner() -> str:
+        """İsteğe özel kira sahibi (süreçler arası da tekil)"""
+        return f"request-{os.getpid()}-{uuid.uuid4().hex[:12]}"
+    
+    def claim_uncategorized(self, complaint_ids: List[int], claim_owner: str) -> Tuple[List[Dict], List[int], List[int]]:
+        """
+        Kategorisiz şikayetleri claim_owner adına kirala (ANALYSIS_REQUEST_LEASE_SECONDS; istek çökerse kira düşer)
+        Dönüş: (kiralanan şikayetler, başka istek/worker'ın analiz ettiği ID'ler, toplu işteki ID'ler)
+        """
+        if not complaint_ids:
+            return [], [], []
+        
+        claimed = self.db_manager.claim_analysis_batch(
+            len(complaint_ids), claim_owner, lease_seconds=Config.ANALYSIS_REQUEST_LEASE_SECONDS,
+            max_attempts=Config.ANALYSIS_MAX_ATTEMPTS, complaint_ids=complaint_ids
+        )
+        claimed_ids = {complaint["Complaint_ID"] for complaint in claimed}
+        owners = self.db_manager.get_analysis_claim_owners(
+            [complaint_id for complaint_id in complaint_ids if complaint_id not in claimed_ids])
+        
+        # Toplu iş sonuçları saatler sonra gelir - istek onları beklemez
+        bulk_queued_ids = [cid for cid, owner in owners.items() if (owner or '').startswith(BULK_OWNER_PREFIX)]
+        in_flight_ids = [cid for cid, owner in owners.items() if not (owner or '').startswith(BULK_OWNER_PREFIX)]
+        return claimed, in_flight_ids, bulk_queued_ids
+    
+    def release_claims(self, complaint_ids: List[int], claim_owner: str, error: str = None,
+                       count_attempt: bool = True) -> int:
+        """
+        Sonuç alınamayan kiraları kuyruğa geri bırak (deneme hakkı bitenler 'failed')
+        count_attempt=False: sağlayıcı kesintisi şikayetin deneme hakkını tüketmez
+        """
+        return self.db_manager.release_analysis_claims(
+            complaint_ids, error or "LLM yanıtında eksik", max_attempts=Config.ANALYSIS_MAX_ATTEMPTS,
+            lease_owner=claim_owner, count_attempt=count_attempt
+        )
+    
     def _prepare_jsonl_data(self, complaints: List[Dict]) -> str:
         """Şikayetleri JSONL formatında hazırla"""
         jsonl_lines = []
@@ -234,6 +288,11 @@ class DataManagementAgent:
             
             if result.get('success'):
                 new_count = result.get('new_count', 0)
+                
+                # Sıkıştırma ve arşivleme istek yolunda değil, bakım işinde (agents/maintenance_worker.py)
+                if new_count and self.on_new_complaints:
+                    self.on_new_complaints()
+                
                 return {
                     'success': True,
                     'new_count': new_count,
@@ -0,0 +1,93 @@
+import json
+import os
+import sys
+import threading
+from datetime import datetime
+from typing import Dict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+
+
+class MaintenanceWorker:
+    """
+    Arka Plan Bakım İşleri
+    - Kullanıcı isteği yolunda çalışmaması gereken ağır veritabanı işleri: metin sıkıştırma (sözlük eğitimi dahil)
+      ve soğuk arşive taşıma (archive_enabled, varsayılan kapalı - ARCHIVE_ENABLED)
+    - interval_seconds aralıkla çalışır; crawler'ın eklediği yeni kayıtlar bir sonraki tura kadar düz metin kalır
+    - Tek seferlik çalıştırma: python agents/maintenance_worker.py [--archive]
+    """
+
+    def __init__(self, db_manager, interval_seconds: float = None, archive_enabled: bool = None):
+        self.db_manager = db_manager
+        self.interval_seconds = Config.MAINTENANCE_INTERVAL_SECONDS if interval_seconds is None else interval_seconds
+        self.archive_enabled = Config.ARCHIVE_ENABLED if archive_enabled is None else archive_enabled
+
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        self.metrics = {
+            "state": "stopped",
+            "runs": 0,
+            "errors": 0,
+            "last_run_at": None,
+            "last_result": None,
+            "last_error": None
+        }
+
+    def start(self):
+        """Bakım thread'ini başlat (interval_seconds 0 ise kapalı - sadece elle çalıştırılır)"""
+        if self.interval_seconds <= 0 or (self._thread and self._thread.is_alive()):
+            return
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Bakım thread'ini durdur (elindeki işi bitirir)"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=30)
+        self.metrics["state"] = "stopped"
+
+    def _run_loop(self):
+        while not self._stop_event.is_set():
+            self.run_once()
+            self.metrics["state"] = "idle"
+            self._stop_event.wait(self.interval_seconds)
+
+    def run_once(self) -> Dict:
+        """Bakım işlerini sırayla çalıştır - iş bazında sonuçlar"""
+        self.metrics["state"] = "running"
+        result = {}
+        try:
+            # Crawler düz metin yazar; yeni gelenler paylaşılan sözlükle sıkıştırılır
+            result["compression"] = self.db_manager.compress_complaint_bodies()
+            # Ufuktan eski, analizi tamamlanmış aylar soğuk arşive (açıkça etkinleştirilirse)
+            if self.archive_enabled:
+                result["archive"] = self.db_manager.archive_old_partitions()
+            error = next((step.get("error") for step in result.values() if not step.get("success")), None)
+        except Exception as e:
+            error = str(e)
+
+        with self._lock:
+            self.metrics["runs"] += 1
+            self.metrics["last_run_at"] = datetime.now().isoformat()
+            self.metrics["last_result"] = result
+            if error:
+                self.metrics["errors"] += 1
+                self.metrics["last_error"] = error
+        return result
+
+    def get_metrics(self) -> Dict:
+        with self._lock:
+            return dict(self.metrics)
+
+
+if __name__ == '__main__':
+    from database_manager import DatabaseManager
+
+    worker = MaintenanceWorker(DatabaseManager(), archive_enabled=True if '--archive' in sys.argv[1:] else None)
+    print(json.dumps(worker.run_once(), ensure_ascii=False, indent=2, default=str))
@@ -0,0 +1,186 @@
+import json
+import os
+import sys
+import threading
+from datetime import datetime
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from utils.rate_limiter import RateLimiter
+
+
+class Reclassifier:
+    """
+    Artımlı Yeniden Sınıflandırma
+    - Analiz satırları taxonomy/prompt/model damgası taşır; damgası güncel versiyondan farklı olanları seçer
+    - Kapsam: taxonomy | prompt | model | all, istenirse sadece belirli kategoriler (ör. bölünen kategori)
+    - En yeni şikayetten geriye doğru batch_size'lık parçalarla, dakikada batches_per_minute hızında çalışır
+    - Eski etiket yenisi yazılana kadar yerinde kalır - raporlar iş boyunca eksiksiz okunur
+    - İlerleme ayrıca saklanmaz: yazılan satır güncel damgayı aldığı için yarıda kalan iş baştan başlatılınca
+      sadece kalanları işler
+    - Sağlayıcı devre dışıyken (circuit breaker) durur; yerel yedek tahmin mevcut etiketin üstüne yazılmaz
+    """
+
+    def __init__(self, db_manager, analysis_agent, batch_size: int = None, batches_per_minute: int = None):
+        self.db_manager = db_manager
+        self.analysis_agent = analysis_agent
+        self.batch_size = batch_size or Config.RECLASSIFY_BATCH_SIZE
+        self.rate_limiter = RateLimiter(batches_per_minute or Config.RECLASSIFY_BATCHES_PER_MINUTE, burst=1)
+
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        self.metrics = self._empty_metrics()
+
+    @staticmethod
+    def _empty_metrics() -> Dict:
+        return {
+            "state": "idle",
+            "scope": None,
+            "categories": None,
+            "batches": 0,
+            "reclassified": 0,
+            "changed": 0,
+            "skipped": 0,
+            "errors": 0,
+            "last_error": None,
+            "started_at": None,
+            "finished_at": None
+        }
+
+    def plan(self, scope: str = 'all', categories: List[str] = None, include_legacy: bool = False) -> Dict:
+        """Güncel versiyon ve kapsam bazında eskimiş satır sayıları"""
+        versions = self.analysis_agent.current_versions()
+        return {
+            "current": versions,
+            "scope": scope,
+            "categories": categories,
+            "stale": self.db_manager.count_stale_analyses(versions, scope, categories, include_legacy),
+            "by_scope": {
+                name: self.db_manager.count_stale_analyses(versions, name, categories)
+                for name in ('taxonomy', 'prompt', 'model')
+            },
+            "legacy": self.db_manager.count_stale_analyses(
+                versions, 'taxonomy', categories, include_legacy=True
+            ) - self.db_manager.count_stale_analyses(versions, 'taxonomy', categories)
+        }
+
+    def start(self, scope: str = 'all', categories: List[str] = None, include_legacy: bool = False,
+              limit: int = None) -> bool:
+        """İşi arka planda başlat (zaten çalışıyorsa False)"""
+        if self._thread and self._thread.is_alive():
+            return False
+        # Geçersiz kapsam thread açılmadan çağırana dönsün
+        self.db_manager.count_stale_analyses(self.analysis_agent.current_versions(), scope, categories)
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self.run, args=(scope, categories, include_legacy, limit),
+                                        daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self):
+        """İşi durdur (elindeki parçayı bitirir)"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=30)
+
+    def run(self, scope: str = 'all', categories: List[str] = None, include_legacy: bool = False,
+            limit: int = None) -> Dict:
+        """Eskimiş satırları parça parça yeniden sınıflandır - iş sonu metrikleri"""
+        versions = self.analysis_agent.current_versions()
+        with self._lock:
+            self.metrics = self._empty_metrics()
+            self.metrics.update(state="running", scope=scope, categories=categories,
+                                started_at=datetime.now().isoformat())
+
+        # Sonuç alınamayan satırlar bu turda tekrar seçilmesin diye (date, ID) keyset ile ilerlenir
+        before = None
+        processed = 0
+        while not self._stop_event.is_set() and (not limit or processed < limit):
+            if not self.analysis_agent.llm_client.available():
+                self.metrics["state"] = "provider_unavailable"
+                self._stop_event.wait(Config.LLM_BREAKER_RESET_SECONDS)
+                continue
+
+            size = min(self.batch_size, limit - processed) if limit else self.batch_size
+            rows = self.db_manager.get_stale_analyses(versions, scope, categories, include_legacy,
+                                                      limit=size, before=before)
+            if not rows:
+                break
+            before = (rows[-1]["date"], rows[-1]["Complaint_ID"])
+            processed += len(rows)
+
+            self.rate_limiter.acquire()
+            self.metrics["state"] = "running"
+            self._reclassify(rows)
+
+        with self._lock:
+            self.metrics["state"] = "stopped" if self._stop_event.is_set() else "completed"
+            self.metrics["finished_at"] = datetime.now().isoformat()
+            return dict(self.metrics)
+
+    def _reclassify(self, rows: List[Dict]):
+        """Tek parça: yeni etiketler geldikçe yazılır, dönmeyenler eski etiketiyle kalır"""
+        previous = {row["Complaint_ID"]: (row["Category"], row["Reason"]) for row in rows}
+        jsonl_data = "\n".join(json.dumps({key: row[key] for key in
+                                           ('Complaint_ID', 'full_comment', 'ref_url', 'title', 'date')},
+                                          ensure_ascii=False) for row in rows)
+        saved_ids = set()
+        changed = 0
+
+        def persist(assignments: List[Dict]):
+            nonlocal changed
+            self.db_manager.insert_analysis(assignments)
+            with self._lock:
+                for assignment in assignments:
+                    saved_ids.add(assignment["Complaint_ID"])
+                    if previous.get(assignment["Complaint_ID"]) != (assignment["category"], assignment["reason"]):
+                        changed += 1
+
+        try:
+            result = self.analysis_agent.analyze_complaints(
+                jsonl_data, list(previous), on_assignments=persist, record_failures=False, allow_fallback=False)
+            error = None if result.get("success") else result.get("error")
+        except Exception as e:
+            error = str(e)
+
+        with self._lock:
+            self.metrics["batches"] += 1
+            self.metrics["reclassified"] += len(saved_ids)
+            self.metrics["changed"] += changed
+            self.metrics["skipped"] += len(rows) - len(saved_ids)
+            if error:
+                self.metrics["errors"] += 1
+                self.metrics["last_error"] = error
+
+    def get_status(self) -> Dict:
+        with self._lock:
+            return dict(self.metrics)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    from agents.analysis_agent import AnalysisAgent
+    from database_manager import DatabaseManager, STALE_SCOPES
+
+    parser = argparse.ArgumentParser(description="Versiyonu eskimiş analizleri yeniden sınıflandır")
+    parser.add_argument('--scope', choices=STALE_SCOPES, default='all')
+    parser.add_argument('--category', action='append', dest='categories',
+                        help="Sadece bu kategorideki satırlar (birden fazla verilebilir)")
+    parser.add_argument('--include-legacy', action='store_true', help="Damgasız (eski) satırları da al")
+    parser.add_argument('--limit', type=int)
+    parser.add_argument('--dry-run', action='store_true', help="Sadece sayıları göster")
+    args = parser.parse_args()
+
+    db_manager = DatabaseManager()
+    reclassifier = Reclassifier(db_manager, AnalysisAgent(db_manager))
+
+    if args.dry_run:
+        result = reclassifier.plan(args.scope, args.categories, args.include_legacy)
+    else:
+        result = reclassifier.run(args.scope, args.categories, args.include_legacy, args.limit)
+    print(json.dumps(result, ensure_ascii=False, indent=2, default=str))
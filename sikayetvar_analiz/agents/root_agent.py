@@ -1,6 +1,9 @@
 import re
+import threading
+import time
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional, Tuple
+from config import Config
 from utils.chart_generator import ChartGenerator
 
 class RootAgent:
@@ -18,8 +21,10 @@ CHAT YANIT ÖRNEKLERİ:
     - Sonuçları birleştirir
     """
     
-    def __init__(self):
+    def __init__(self, read_snapshots=None):
         self.chart_generator = ChartGenerator()
+        # İstatistik/rapor sorguları verilirse okuma snapshot'ından yapılır (utils/read_snapshot.py)
+        self.read_snapshots = read_snapshots
         
         # LLM client'ı import et
         from utils.llm_client import LLMClient
@@ -29,15 +34,28 @@ CHAT YANIT ÖRNEKLERİ:
         from database_manager import DatabaseManager
         self.db_manager = DatabaseManager()
     
-    def process_request(self, user_prompt: str, data_agent, analysis_agent) -> Dict:
+    def process_request(self, user_prompt: str, data_agent, analysis_agent,
+                        progress_callback: Optional[Callable[[Dict], None]] = None) -> Dict:
         """
         Ana işlem fonksiyonu - Hem chat hem analiz isteklerini karşılar
         1. Komutu LLM ile analiz et (chat mi, analiz mi?)
         2. Chat ise -> Direkt yanıt döndür
         3. Analiz ise -> Veritabanını güncelle, analiz yap, sonuç üret
+        progress_callback: sınıflandırılan şikayet sayısı ilerledikçe {stage, classified, total} ile çağrılır
+        Analiz yanıtındaki timings: aşama bazında süre (ms) - yavaşlığın kaynağını ayırmak için
         """
+        timings = {}
+        stage_started = time.perf_counter()
+        
+        def mark(stage: str):
+            nonlocal stage_started
+            now = time.perf_counter()
+            timings[stage] = round((now - stage_started) * 1000, 1)
+            stage_started = now
+        
         try:
             command_info = self._parse_command_with_llm(user_prompt)
+            mark("command_parse")
             if not command_info["success"]:
                 return command_info
             
@@ -49,6 +67,7 @@ CHAT YANIT ÖRNEKLERİ:
                 }
             
             update_result = data_agent.ensure_database_updated(command_info)
+            mark("crawl")
             if not update_result["success"]:
                 return {
                     "success": False,
@@ -60,6 +79,9 @@ CHAT YANIT ÖRNEKLERİ:
                 command_info["command_type"], 
                 command_info["parameters"]
             )
+            mark("data_prep")
+            # İstatistikler en az bu anki veriyi görmeli (istekte çekilen şikayetler dahil)
+            data_ready_at = datetime.now().isoformat()
             
             if not data_result["success"]:
                 return {
@@ -68,12 +90,52 @@ CHAT YANIT ÖRNEKLERİ:
                 }
             
             if data_result.get("uncategorized_count", 0) == 0:
-                return self._generate_statistics_only(data_agent, command_info, data_result)
+                result = self._generate_statistics_only(data_agent, command_info, data_result, data_ready_at)
+                mark("statistics")
+                result["timings"] = timings
+                return result
             
-            analysis_result = analysis_agent.analyze_complaints(
-                data_result["jsonl_data"],
-                data_result.get("complaint_ids", [])
-            )
+            # Atamalar geldikçe kaydedilir - yanıt yarıda kesilse de gelen kısım kaybolmaz
+            total = data_result.get("uncategorized_count", 0)
+            progress = {"stage": "analysis", "classified": 0, "total": total}
+            save_lock = threading.Lock()
+            save_errors = []
+            saved_ids = set()
+            
+            def advance(count: int):
+                progress["classified"] += count
+                if progress_callback:
+                    progress_callback(dict(progress))
+            
+            def persist(assignments: List[Dict]):
+                with save_lock:
+                    save_result = data_agent.save_analysis(assignments)
+                    if not save_result["success"]:
+                        save_errors.append(save_result["error"])
+                        return
+                    saved_ids.update(assignment["Complaint_ID"] for assignment in assignments)
+                    advance(len(assignments))
+            
+            claim_owner = data_result.get("claim_owner")
+            
+            def analyze(jsonl_data: str, complaint_ids: List[int]) -> Dict:
+                # Şikayetler bu istek adına kiralı - sonuç alınamayanların kirası hemen bırakılır
+                try:
+                    return analysis_agent.analyze_complaints(
+                        jsonl_data, complaint_ids, on_assignments=persist, record_failures=not claim_owner)
+                finally:
+                    if claim_owner:
+                        # Sağlayıcı kesintisi (breaker açık / geçici hata) deneme hakkını tüketmez
+                        provider_failing = analysis_agent.llm_client.provider_failing()
+                        data_agent.release_claims(
+                            [cid for cid in complaint_ids if cid not in saved_ids], claim_owner,
+                            error="LLM sağlayıcısı hata verdi" if provider_failing else None,
+                            count_attempt=not provider_failing)
+            
+            analysis_result = {"success": True, "analysis_assignments": [], "persisted": True}
+            if data_result.get("complaint_ids"):
+                analysis_result = analyze(data_result["jsonl_data"], data_result["complaint_ids"])
+            mark("analysis")
             
             if not analysis_result["success"]:
                 return {
@@ -81,7 +143,28 @@ CHAT YANIT ÖRNEKLERİ:
                     "error": f"Analiz hatası: {analysis_result['error']}"
                 }
             
-            if analysis_result.get("analysis_assignments"):
+            # Başka istek / worker'ın analiz etmekte olduğu şikayetler tekrar gönderilmez, sonucu beklenir
+            if data_result.get("in_flight_ids"):
+                def on_resolved(count: int):
+                    with save_lock:
+                        advance(count)
+                
+                in_flight = self._wait_for_in_flight(
+                    data_agent, data_result["in_flight_ids"], claim_owner, analyze, on_resolved)
+                analysis_result["analysis_assignments"] = \
+                    analysis_result.get("analysis_assignments", []) + in_flight.pop("analysis_assignments")
+                analysis_result["in_flight"] = in_flight
+                mark("in_flight_wait")
+            if data_result.get("bulk_queued_ids"):
+                analysis_result["bulk_queued"] = len(data_result["bulk_queued_ids"])
+            
+            if save_errors:
+                return {
+                    "success": False,
+                    "error": f"Analiz kaydetme hatası: {save_errors[0]}"
+                }
+            
+            if analysis_result.get("analysis_assignments") and not analysis_result.get("persisted"):
                 save_result = data_agent.save_analysis(analysis_result["analysis_assignments"])
                 if not save_result["success"]:
                     return {
@@ -89,7 +172,10 @@ CHAT YANIT ÖRNEKLERİ:
                         "error": f"Analiz kaydetme hatası: {save_result['error']}"
                     }
             
-            stats_result = self._generate_final_statistics(data_agent, analysis_result, data_result)
+            # Bu isteğin yazdığı analizler istatistikte görünmeli - snapshot kayıttan önceyse canlı okunur
+            stats_result = self._generate_final_statistics(
+                data_agent, analysis_result, data_result, datetime.now().isoformat())
+            mark("statistics")
             
             response = {
                 "success": True,
@@ -98,6 +184,7 @@ CHAT YANIT ÖRNEKLERİ:
                 "data_result": data_result,
                 "analysis_result": analysis_result,
                 "statistics": stats_result,
+                "timings": timings,
                 "request_type": "analysis"
             }
             
@@ -106,6 +193,7 @@ CHAT YANIT ÖRNEKLERİ:
                 response["reason_chart_path"] = stats_result.get("reason_chart_path")
                 response["category_stats"] = stats_result.get("category_stats", {})
                 response["reason_stats"] = stats_result.get("reason_stats", {})
+                response["snapshot"] = stats_result.get("snapshot")
             
             return response
             
@@ -116,8 +204,48 @@ CHAT YANIT ÖRNEKLERİ:
                 "error": str(e)
             }
     
+    def _wait_for_in_flight(self, data_agent, complaint_ids: List[int], claim_owner: str,
+                            analyze: Callable[[str, List[int]], Dict], on_resolved: Callable[[int], None]) -> Dict:
+        """
+        Başka istek / worker'ın kiraladığı şikayetlerin sonucunu bekle (en fazla ANALYSIS_CLAIM_WAIT_SECONDS)
+        Kirası düşen (sahibi çöken ya da sonuç alamayıp bırakan) şikayetler bu istek adına devralınıp analiz edilir
+        """
+        deadline = time.monotonic() + Config.ANALYSIS_CLAIM_WAIT_SECONDS
+        remaining = list(complaint_ids)
+        assignments = []
+        resolved = 0
+        taken_over = 0
+        
+        while remaining and time.monotonic() < deadline:
+            time.sleep(Config.ANALYSIS_CLAIM_POLL_SECONDS)
+            claimed, in_flight_ids, bulk_queued_ids = data_agent.claim_uncategorized(remaining, claim_owner)
+            if claimed:
+                taken_over += len(claimed)
+                result = analyze(data_agent._prepare_jsonl_data(claimed), [c["Complaint_ID"] for c in claimed])
+                assignments.extend(result.get("analysis_assignments", []) if result.get("success") else [])
+            
+            # Kuyruktan çıkanlar diğer sahip tarafından yazıldı (ya da deneme hakkı bitti)
+            pending = set(in_flight_ids) | set(bulk_queued_ids) | {c["Complaint_ID"] for c in claimed}
+            finished = len([cid for cid in remaining if cid not in pending])
+            if finished:
+                resolved += finished
+                on_resolved(finished)
+            remaining = in_flight_ids
+        
+        return {
+            "waited": len(complaint_ids),
+            "resolved_elsewhere": resolved,
+            "taken_over": taken_over,
+            "unfinished": len(remaining),
+            "analysis_assignments": assignments
+        }
+    
     def _parse_command_with_llm(self, prompt: str) -> Dict:
         """LLM ile kullanıcı komutunu analiz et"""
+        # Sağlayıcı devre dışıysa (circuit breaker) beklemeden pattern matching
+        if not self.llm_client.available():
+            return self._parse_command_fallback(prompt)
+        
         try:
             # Bugünün tarihini al
             today = datetime.now()
@@ -216,7 +344,8 @@ Kullanıcı komutunu analiz ederek SADECE JSON formatında yanıt ver. Başka hi
 
 {{"success": true, "command_type": "hours_back", "parameters": {{"hours": 24}}, "description": "Son 24 saat analizi"}}"""
 
-            response = self.llm_client.generate_content(llm_prompt)
+            response = self.llm_client.generate_content(llm_prompt, call_site="root_command",
+                                                        timeout=Config.LLM_COMMAND_TIMEOUT_SECONDS)
             
             if not response or not response.strip():
                 return self._parse_command_fallback(prompt)
@@ -394,19 +523,44 @@ Kullanıcı komutunu analiz ederek SADECE JSON formatında yanıt ver. Başka hi
                 "error": f"Fallback analiz hatası: {e}"
             }
     
-    def _generate_statistics_only(self, data_agent, command_info, data_result) -> Dict:
+    def _stats_source(self, data_agent, min_as_of: str = None) -> Tuple:
+        """
+        İstatistiklerin okunacağı veritabanı ve hangi ana ait olduğu
+        Hazır snapshot isteğin verisini kapsıyorsa (as_of >= min_as_of) ondan okunur; kapsamıyorsa kopya
+        beklenmez, canlı veritabanı tek okuma transaction'ı içinde (WAL, yazmaları bloklamaz) okunur
+        """
+        if self.read_snapshots is not None:
+            snapshot = self.read_snapshots.current()
+            if snapshot["version"] and (not min_as_of or snapshot["as_of"] >= min_as_of):
+                return snapshot["db_manager"], self.read_snapshots.describe(snapshot)
+        return data_agent.db_manager, {"version": None, "taken_at": None, "as_of": datetime.now().isoformat()}
+    
+    def _get_analysis_stats(self, data_agent, data_result, min_as_of: str = None) -> Dict:
+        """İstek kapsamının Category/Reason dağılımını getir (snapshot bilgisi 'snapshot' anahtarında)"""
+        db_manager, snapshot = self._stats_source(data_agent, min_as_of)
+        
+        # Tarih aralığı isteklerinde günlük özet tablodan oku (ID listesi taraması yok)
+        if data_result.get('start_date') and data_result.get('end_date'):
+            stats = db_manager.get_analysis_stats_for_date_range(
+                data_result['start_date'],
+                data_result['end_date']
+            )
+        # Spesifik complaint ID'ler varsa onların istatistiklerini al
+        elif 'all_complaint_ids' in data_result:
+            stats = db_manager.get_final_analysis_stats_for_complaints(data_result['all_complaint_ids'])
+        # Fallback - bu duruma düşmemeli artık
+        else:
+            stats = {"categories": {}, "reasons": {}}
+        
+        stats["snapshot"] = snapshot
+        return stats
+    
+    def _generate_statistics_only(self, data_agent, command_info, data_result, min_as_of: str = None) -> Dict:
         """Sadece mevcut istatistikleri göster (yeni kategorileme yok)"""
         try:
-            # Spesifik complaint ID'ler varsa onların istatistiklerini al
-            if 'all_complaint_ids' in data_result:
-                complaint_ids = data_result['all_complaint_ids']
-                analysis_stats = data_agent.db_manager.get_final_analysis_stats_for_complaints(complaint_ids)
-                category_stats = analysis_stats.get("categories", {})
-                reason_stats = analysis_stats.get("reasons", {})
-            else:
-                # Fallback - bu duruma düşmemeli artık
-                category_stats = {}
-                reason_stats = {}
+            analysis_stats = self._get_analysis_stats(data_agent, data_result, min_as_of)
+            category_stats = analysis_stats.get("categories", {})
+            reason_stats = analysis_stats.get("reasons", {})
             
             # Grafikleri oluştur
             category_chart_path = None
@@ -428,7 +582,8 @@ Kullanıcı komutunu analiz ederek SADECE JSON formatında yanıt ver. Başka hi
                 "reason_stats": reason_stats,
                 "category_chart_path": category_chart_path,
                 "reason_chart_path": reason_chart_path,
-                "new_categorizations": 0
+                "new_categorizations": 0,
+                "snapshot": analysis_stats["snapshot"]
             }
             
         except Exception as e:
@@ -437,16 +592,10 @@ Kullanıcı komutunu analiz ederek SADECE JSON formatında yanıt ver. Başka hi
                 "error": str(e)
             }
     
-    def _generate_final_statistics(self, data_agent, analysis_result, data_result) -> Dict:
+    def _generate_final_statistics(self, data_agent, analysis_result, data_result, min_as_of: str = None) -> Dict:
         """Final istatistikleri ve grafik oluştur"""
         try:
-            # Spesifik complaint IDs varsa, sadece onların istatistiklerini al
-            if 'all_complaint_ids' in data_result:
-                complaint_ids = data_result['all_complaint_ids']
-                analysis_stats = data_agent.db_manager.get_final_analysis_stats_for_complaints(complaint_ids)
-            else:
-                # Bu duruma düşmemeli artık
-                analysis_stats = {"categories": {}, "reasons": {}}
+            analysis_stats = self._get_analysis_stats(data_agent, data_result, min_as_of)
             
             # Grafikleri oluştur
             category_chart_path = None
@@ -469,7 +618,8 @@ Kullanıcı komutunu analiz ederek SADECE JSON formatında yanıt ver. Başka hi
                 "reason_stats": reason_stats,
                 "category_chart_path": category_chart_path,
                 "reason_chart_path": reason_chart_path,
-                "new_analysis": len(analysis_result.get("analysis_assignments", []))
+                "new_analysis": len(analysis_result.get("analysis_assignments", [])),
+                "snapshot": analysis_stats["snapshot"]
             }
             
         except Exception as e:
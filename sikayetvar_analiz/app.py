@@ -1,4 +1,4 @@
-from flask import Flask, render_template, request, jsonify, send_file
+from flask import Flask, render_template, request, jsonify, send_file, Response, stream_with_context
 import os
 import base64
 from datetime import datetime
@@ -6,10 +6,18 @@ import threading
 import time
 
 from config import Config
-from database_manager import DatabaseManager
+from database_manager import DatabaseManager, EXPORT_COLUMNS
 from agents.root_agent import RootAgent
 from agents.data_management_agent import DataManagementAgent
 from agents.analysis_agent import AnalysisAgent
+from agents.analysis_worker import AnalysisWorker
+from agents.maintenance_worker import MaintenanceWorker
+from agents.bulk_classifier import BulkClassifier
+from agents.reclassifier import Reclassifier
+from utils.llm_client import LLMClient
+from utils.llm_metrics import estimate_cost
+from utils.read_snapshot import ReadSnapshotManager
+from utils.stream_export import StreamExporter
 
 app = Flask(__name__)
 
@@ -17,19 +25,49 @@ db_manager = None
 root_agent = None
 data_agent = None
 analysis_agent = None
+analysis_worker = None
+maintenance_worker = None
+bulk_classifier = None
+reclassifier = None
+read_snapshots = None
 current_task = None
 task_results = {}
 
 def initialize_system():
     """Sistem bileşenlerini başlat"""
-    global db_manager, root_agent, data_agent, analysis_agent
+    global db_manager, root_agent, data_agent, analysis_agent, analysis_worker, bulk_classifier, reclassifier
+    global read_snapshots, maintenance_worker
     
     try:
         Config.validate()
         db_manager = DatabaseManager()
-        root_agent = RootAgent()
-        data_agent = DataManagementAgent(db_manager)
-        analysis_agent = AnalysisAgent()
+        # Salt okunur analitik endpoint'ler ve chat istatistikleri okuma snapshot'ından okur
+        read_snapshots = ReadSnapshotManager()
+        read_snapshots.start()
+        root_agent = RootAgent(read_snapshots)
+        analysis_agent = AnalysisAgent(db_manager)
+        
+        # Yeni şikayetler kullanıcı isteği beklemeden arka planda sınıflandırılır
+        if Config.ANALYSIS_WORKER_ENABLED:
+            analysis_worker = AnalysisWorker(db_manager, analysis_agent)
+            analysis_worker.start()
+        
+        # Sıkıştırma gibi ağır bakım işleri kullanıcı isteği yerine arka planda
+        maintenance_worker = MaintenanceWorker(db_manager)
+        maintenance_worker.start()
+        
+        # Yarım kalan toplu sınıflandırma işleri sorgulanmaya devam eder
+        bulk_classifier = BulkClassifier(db_manager, analysis_agent)
+        bulk_classifier.start()
+        
+        # Eskimiş analizlerin yeniden sınıflandırılması istek üzerine başlar
+        reclassifier = Reclassifier(db_manager, analysis_agent)
+        
+        data_agent = DataManagementAgent(
+            db_manager,
+            on_new_complaints=analysis_worker.notify if analysis_worker else None
+        )
+
         return True
     except Exception as e:
         return False
@@ -51,7 +89,10 @@ def process_request_async(prompt, task_id):
     global task_results
     
     try:
-        result = root_agent.process_request(prompt, data_agent, analysis_agent)
+        def report_progress(progress):
+            task_results[task_id]['progress'] = progress
+        
+        result = root_agent.process_request(prompt, data_agent, analysis_agent, report_progress)
         request_type = result.get('request_type', 'analysis')
         
         if request_type == 'chat':
@@ -157,6 +198,9 @@ def get_status(task_id):
         'timestamp': result['timestamp']
     }
     
+    if result['status'] == 'processing' and 'progress' in result:
+        response['progress'] = result['progress']
+    
     if result['status'] == 'completed':
         if result['success']:
             if result.get('type') == 'chat':
@@ -215,6 +259,259 @@ def get_status(task_id):
     
     return jsonify(response)
 
+@app.route('/api/search')
+def search_complaints():
+    """Şikayetlerde tam metin arama"""
+    try:
+        query = request.args.get('q', '').strip()
+        if not query:
+            return jsonify({'success': False, 'error': 'Arama ifadesi (q) gerekli'})
+        
+        page = max(request.args.get('page', 1, type=int), 1)
+        page_size = min(max(request.args.get('page_size', 20, type=int), 1), 100)
+        
+        snapshot = read_snapshots.current()
+        result = snapshot['db_manager'].search(
+            query,
+            start_date=request.args.get('start_date'),
+            end_date=request.args.get('end_date'),
+            page=page,
+            page_size=page_size
+        )
+        result['success'] = True
+        result['snapshot'] = read_snapshots.describe(snapshot)
+        return jsonify(result)
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/api/complaints')
+def list_complaints():
+    """Şikayet listesi (cursor ile sayfalı, tarih/kategori/sebep filtreli)"""
+    try:
+        page_size = min(max(request.args.get('page_size', 50, type=int), 1), 200)
+        fields = request.args.get('fields')
+        columns = [f.strip() for f in fields.split(',') if f.strip()] if fields else None
+
+        snapshot = read_snapshots.current()
+        result = snapshot['db_manager'].list_complaints(
+            start_date=request.args.get('start_date'),
+            end_date=request.args.get('end_date'),
+            category=request.args.get('category'),
+            reason=request.args.get('reason'),
+            columns=columns,
+            cursor=request.args.get('cursor'),
+            page_size=page_size
+        )
+        if 'error' in result:
+            return jsonify({'success': False, 'error': result['error']})
+
+        result['success'] = True
+        result['snapshot'] = read_snapshots.describe(snapshot)
+        return jsonify(result)
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/api/export')
+def export_complaints():
+    """Tarih aralığındaki analizli şikayetleri CSV/JSONL olarak akış halinde indir"""
+    try:
+        start_date = request.args.get('start_date', '')
+        end_date = request.args.get('end_date', '')
+        # Akış başladıktan sonra JSON hata dönülemez, parametreler önceden doğrulanır
+        datetime.strptime(start_date, '%Y-%m-%d')
+        datetime.strptime(end_date, '%Y-%m-%d')
+        
+        include_body = request.args.get('include_body', '1') != '0'
+        columns = EXPORT_COLUMNS if include_body else EXPORT_COLUMNS[:-1]
+        exporter = StreamExporter(
+            columns,
+            export_format=request.args.get('format', 'csv'),
+            compress=request.args.get('gzip', '0') == '1'
+        )
+        
+        db = read_snapshots.current()['db_manager']
+        chunks = db.iter_analyzed_complaints(start_date, end_date, include_body=include_body)
+        if not include_body:
+            chunks = ([row[:-1] for row in rows] for rows in chunks)
+        
+        filename = exporter.filename(f"sikayetler_{start_date}_{end_date}")
+        return Response(
+            stream_with_context(exporter.stream(chunks)),
+            mimetype=exporter.mimetype,
+            headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+        )
+    except ValueError as e:
+        return jsonify({'success': False, 'error': f'Geçersiz parametre: {e}'})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/api/cache/stats')
+def get_cache_stats():
+    """LLM sınıflandırma önbelleği ve yakın kopya tasarruf metrikleri"""
+    try:
+        if not analysis_agent or not analysis_agent.cache:
+            return jsonify({'success': False, 'error': 'Önbellek kapalı'})
+        
+        stats = analysis_agent.cache.get_stats()
+        stats['near_duplicates'] = dict(analysis_agent.near_duplicate_stats)
+        stats['success'] = True
+        return jsonify(stats)
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/api/llm/metrics')
+def get_llm_metrics():
+    """Süreç başlangıcından beri çağrı yeri bazında LLM gecikme histogramları, token ve hata sayıları"""
+    try:
+        return jsonify({
+            'success': True,
+            'call_sites': LLMClient.metrics.snapshot(),
+            'circuit_breaker': LLMClient.breaker.snapshot()
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/api/llm/costs')
+def get_llm_costs():
+    """llm_calls tablosundan gün / çağrı yeri bazında token ve maliyet raporu"""
+    try:
+        today = datetime.now().strftime('%Y-%m-%d')
+        start_date = request.args.get('start_date', today)
+        end_date = request.args.get('end_date', today)
+        
+        # Bellekte biriken ölçümler rapordan önce yazılır
+        LLMClient.metrics.flush()
+        rows = db_manager.get_llm_cost_report(start_date, end_date)
+        for row in rows:
+            row['cost_usd'] = round(estimate_cost(row['prompt_tokens'], row['response_tokens'], row['call_site']), 6)
+        
+        return jsonify({
+            'success': True,
+            'rows': rows,
+            'total_cost_usd': round(sum(row['cost_usd'] for row in rows), 6)
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/api/worker/stats')
+def get_worker_stats():
+    """Arka plan analiz worker'ı: durum, kuyruk gecikmesi, verim ve bütçe kullanımı"""
+    try:
+        if not analysis_worker:
+            return jsonify({'success': False, 'error': 'Analiz worker kapalı'})
+        
+        metrics = analysis_worker.get_metrics()
+        metrics['success'] = True
+        return jsonify(metrics)
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/api/maintenance/stats')
+def get_maintenance_stats():
+    """Arka plan bakım işleri: son çalıştırma ve iş bazında sonuçlar"""
+    try:
+        metrics = maintenance_worker.get_metrics()
+        metrics['success'] = True
+        return jsonify(metrics)
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/api/analysis/failures')
+def get_analysis_failures():
+    """Deneme hakkı biten (kalıcı hata) şikayetler ve kuyruk durumu"""
+    try:
+        limit = min(max(request.args.get('limit', 100, type=int), 1), 1000)
+        return jsonify({
+            'success': True,
+            'queue': db_manager.get_analysis_queue_stats(),
+            'failures': db_manager.get_failed_analyses(limit)
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/api/analysis/failures/retry', methods=['POST'])
+def retry_analysis_failures():
+    """Kalıcı hatalı şikayetleri tekrar analiz kuyruğuna al"""
+    try:
+        data = request.get_json(silent=True) or {}
+        requeued = db_manager.retry_failed_analyses(data.get('complaint_ids'))
+        return jsonify({'success': True, 'requeued': requeued})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/api/bulk/jobs', methods=['POST'])
+def create_bulk_job():
+    """Geçmiş şikayetler için toplu (Batch API) sınıflandırma işi başlat"""
+    try:
+        data = request.get_json(silent=True) or {}
+        job_id = bulk_classifier.create_job(data.get('start_date'), data.get('end_date'), data.get('limit'))
+        
+        def prepare():
+            bulk_classifier.prepare_job(job_id)
+            bulk_classifier.notify()
+        
+        thread = threading.Thread(target=prepare)
+        thread.daemon = True
+        thread.start()
+        
+        return jsonify({'success': True, 'job_id': job_id})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/api/bulk/jobs')
+def list_bulk_jobs():
+    """Toplu sınıflandırma işleri ve parça durumları"""
+    try:
+        return jsonify({'success': True, 'jobs': db_manager.get_bulk_jobs(), 'poller': bulk_classifier.get_metrics()})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/api/bulk/jobs/<int:job_id>')
+def get_bulk_job(job_id):
+    """Tek toplu iş"""
+    try:
+        jobs = db_manager.get_bulk_jobs(job_id)
+        if not jobs:
+            return jsonify({'success': False, 'error': 'İş bulunamadı'})
+        return jsonify({'success': True, 'job': jobs[0]})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/api/analysis/versions')
+def get_analysis_versions():
+    """Analiz satırlarının taxonomy/prompt/model damgası dağılımı ve eskimiş satır sayıları"""
+    try:
+        categories = request.args.getlist('category') or None
+        return jsonify({
+            'success': True,
+            'versions': db_manager.get_analysis_versions(),
+            'plan': reclassifier.plan(request.args.get('scope', 'all'), categories,
+                                      request.args.get('include_legacy', 'false').lower() == 'true')
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/api/analysis/reclassify', methods=['POST'])
+def start_reclassify():
+    """Eskimiş analizleri arka planda yeniden sınıflandır (eski etiketler iş bitene kadar okunur)"""
+    try:
+        data = request.get_json(silent=True) or {}
+        started = reclassifier.start(data.get('scope', 'all'), data.get('categories'),
+                                     bool(data.get('include_legacy')), data.get('limit'))
+        if not started:
+            return jsonify({'success': False, 'error': 'Yeniden sınıflandırma zaten çalışıyor'})
+        return jsonify({'success': True, 'status': reclassifier.get_status()})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/api/analysis/reclassify')
+def get_reclassify_status():
+    """Yeniden sınıflandırma işinin durumu"""
+    try:
+        return jsonify({'success': True, 'status': reclassifier.get_status()})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
 @app.route('/api/charts')
 def get_charts():
     """Mevcut chart'ları al"""
@@ -11,6 +11,114 @@ class Config:
     # Database - Ana dizindeki tek veritabanı
     DATABASE_PATH = os.path.join(os.path.dirname(__file__), 'sikayetvar.db')
     
+    # Arşiv - ufuktan eski aylar ayrı (soğuk) veritabanlarına taşınır
+    ARCHIVE_DIR = os.getenv('ARCHIVE_DIR')
+    ARCHIVE_HORIZON_MONTHS = int(os.getenv('ARCHIVE_HORIZON_MONTHS', '12'))
+    # Soğuk arşive taşıma bakım işinde, sadece açıkça etkinleştirilirse çalışır
+    ARCHIVE_ENABLED = os.getenv('ARCHIVE_ENABLED', 'false').lower() == 'true'
+    
+    # Bakım işleri (metin sıkıştırma, arşivleme) istek yolunda değil, arka planda bu aralıkla çalışır (0 = kapalı)
+    MAINTENANCE_INTERVAL_SECONDS = float(os.getenv('MAINTENANCE_INTERVAL_SECONDS', '900'))
+    
+    # DuckDB analitik motoru - verilirse SQLite yerine Parquet snapshot dizininden okur
+    ANALYTICS_PARQUET_DIR = os.getenv('ANALYTICS_PARQUET_DIR')
+    
+    # Okuma snapshot'ları - dashboard sorguları crawler yazmalarından izole
+    SNAPSHOT_DIR = os.path.join(os.path.dirname(__file__), 'snapshots')
+    # Arka plan yenileme aralığı - canlı dosya değişmediyse kopya alınmaz (0 = kapalı, sadece canlı okuma)
+    SNAPSHOT_REFRESH_SECONDS = int(os.getenv('SNAPSHOT_REFRESH_SECONDS', '60'))
+    
+    # LLM backend: gemini (varsayılan) | fake (deterministik yerel, ağsız) | http (yerel sunucu: python utils/llm_backends.py)
+    LLM_BACKEND = os.getenv('LLM_BACKEND', 'gemini').lower()
+    LLM_BACKEND_URL = os.getenv('LLM_BACKEND_URL', 'http://127.0.0.1:8765')
+    FAKE_LLM_LATENCY_MS = float(os.getenv('FAKE_LLM_LATENCY_MS', '200'))
+    FAKE_LLM_TOKENS_PER_SECOND = float(os.getenv('FAKE_LLM_TOKENS_PER_SECOND', '200'))
+    FAKE_LLM_ERROR_RATE = float(os.getenv('FAKE_LLM_ERROR_RATE', '0'))
+    FAKE_LLM_MAX_CONCURRENCY = int(os.getenv('FAKE_LLM_MAX_CONCURRENCY', '8'))
+    FAKE_LLM_SEED = int(os.getenv('FAKE_LLM_SEED', '0'))
+    # Yerel backend kuyruk gecikmesi: isteklerin bu oranı ek gecikmeyle döner
+    FAKE_LLM_SLOW_RATE = float(os.getenv('FAKE_LLM_SLOW_RATE', '0'))
+    FAKE_LLM_SLOW_LATENCY_MS = float(os.getenv('FAKE_LLM_SLOW_LATENCY_MS', '5000'))
+    # Yerel backend'in toplu iş dosyaları ve işlerin tamamlanma süresi
+    FAKE_LLM_BATCH_DIR = os.getenv('FAKE_LLM_BATCH_DIR', os.path.join(os.path.dirname(__file__), 'fake_llm_batches'))
+    FAKE_LLM_BATCH_TURNAROUND_SECONDS = float(os.getenv('FAKE_LLM_BATCH_TURNAROUND_SECONDS', '5'))
+    
+    # LLM çağrı ölçümleri - llm_calls tablosuna yazılır; maliyet milyon token başına USD
+    LLM_METRICS_PERSIST = os.getenv('LLM_METRICS_PERSIST', 'true').lower() == 'true'
+    # Ölçümler bellekte biriktirilir; arka planda bu aralıkla ya da bu kadar satır birikince toplu yazılır
+    LLM_METRICS_FLUSH_SECONDS = float(os.getenv('LLM_METRICS_FLUSH_SECONDS', '5'))
+    LLM_METRICS_FLUSH_SIZE = int(os.getenv('LLM_METRICS_FLUSH_SIZE', '200'))
+    LLM_PRICE_INPUT_PER_MTOK = float(os.getenv('LLM_PRICE_INPUT_PER_MTOK', '0.30'))
+    LLM_PRICE_OUTPUT_PER_MTOK = float(os.getenv('LLM_PRICE_OUTPUT_PER_MTOK', '2.50'))
+    # Batch API fiyat çarpanı (Gemini toplu işleri etkileşimli fiyatın yarısı)
+    LLM_BATCH_PRICE_FACTOR = float(os.getenv('LLM_BATCH_PRICE_FACTOR', '0.5'))
+    
+    # LLM toplu analiz - girdi token bütçesine göre parçalara bölünür, parçalar paralel gönderilir
+    LLM_BATCH_TOKEN_BUDGET = int(os.getenv('LLM_BATCH_TOKEN_BUDGET', '8000'))
+    LLM_BATCH_MAX_ITEMS = int(os.getenv('LLM_BATCH_MAX_ITEMS', '150'))
+    # Sınıflandırma için metnin ilk N karakteri yeterli
+    LLM_BODY_MAX_CHARS = int(os.getenv('LLM_BODY_MAX_CHARS', '1200'))
+    LLM_MAX_CONCURRENCY = int(os.getenv('LLM_MAX_CONCURRENCY', '4'))
+    LLM_REQUESTS_PER_MINUTE = int(os.getenv('LLM_REQUESTS_PER_MINUTE', '60'))
+    # Çağrı süresi (tekrar denemeler dahil); komut ayrıştırmanın yerel yedeği olduğu için süresi kısa
+    LLM_TIMEOUT_SECONDS = float(os.getenv('LLM_TIMEOUT_SECONDS', '60'))
+    LLM_COMMAND_TIMEOUT_SECONDS = float(os.getenv('LLM_COMMAND_TIMEOUT_SECONDS', '10'))
+    # Geçici hatalarda (zaman aşımı, 429, 5xx) tekrar deneme - jitter'lı üstel bekleme
+    LLM_RETRIES = int(os.getenv('LLM_RETRIES', '2'))
+    LLM_RETRY_BACKOFF_SECONDS = float(os.getenv('LLM_RETRY_BACKOFF_SECONDS', '0.5'))
+    # Hedge: yanıt çağrı yerinin p95 gecikmesini aşınca aynı istek bir kez daha gönderilir, ilk gelen kullanılır
+    LLM_HEDGE_ENABLED = os.getenv('LLM_HEDGE_ENABLED', 'false').lower() == 'true'
+    LLM_HEDGE_MIN_SAMPLES = int(os.getenv('LLM_HEDGE_MIN_SAMPLES', '20'))
+    # Circuit breaker: art arda N geçici hatada sağlayıcı RESET saniye devre dışı (yerel yedek kullanılır)
+    LLM_BREAKER_FAILURES = int(os.getenv('LLM_BREAKER_FAILURES', '5'))
+    LLM_BREAKER_RESET_SECONDS = float(os.getenv('LLM_BREAKER_RESET_SECONDS', '30'))
+    LLM_BREAKER_LOCAL_FALLBACK = os.getenv('LLM_BREAKER_LOCAL_FALLBACK', 'true').lower() == 'true'
+    # Süreli çağrıların çalıştığı thread havuzu (süresi dolan çağrılar arka planda biter)
+    LLM_CALL_THREADS = int(os.getenv('LLM_CALL_THREADS', '32'))
+    # Yanıtta eksik kalan şikayetler küçük parçalarla tekrar istenir (bekleme her denemede ikiye katlanır)
+    LLM_GAP_RETRIES = int(os.getenv('LLM_GAP_RETRIES', '2'))
+    LLM_GAP_BATCH_SIZE = int(os.getenv('LLM_GAP_BATCH_SIZE', '20'))
+    LLM_GAP_BACKOFF_SECONDS = float(os.getenv('LLM_GAP_BACKOFF_SECONDS', '1.0'))
+    # Bu kadar analiz denemesinde sonuç alınamayan şikayet kuyrukta 'failed' olur, tekrar gönderilmez
+    ANALYSIS_MAX_ATTEMPTS = int(os.getenv('ANALYSIS_MAX_ATTEMPTS', '3'))
+    # İstek yolunda kategorisiz şikayetler istek adına kiralanır; başkasının analiz ettiği şikayetler tekrar
+    # gönderilmez, sonucu en fazla WAIT saniye beklenir (kira süresi dolan - çöken istek - devralınır)
+    ANALYSIS_REQUEST_LEASE_SECONDS = int(os.getenv('ANALYSIS_REQUEST_LEASE_SECONDS', '300'))
+    ANALYSIS_CLAIM_WAIT_SECONDS = float(os.getenv('ANALYSIS_CLAIM_WAIT_SECONDS', '120'))
+    ANALYSIS_CLAIM_POLL_SECONDS = float(os.getenv('ANALYSIS_CLAIM_POLL_SECONDS', '1.0'))
+    # Arka plan analiz worker'ı - yeni şikayetleri istek beklemeden sınıflandırır.
+    # Açıldığında kuyruktaki tüm geçmiş analizsiz şikayetleri de LLM'e gönderir (maliyet) - varsayılan kapalı
+    ANALYSIS_WORKER_ENABLED = os.getenv('ANALYSIS_WORKER_ENABLED', 'false').lower() == 'true'
+    ANALYSIS_WORKER_BATCH_SIZE = int(os.getenv('ANALYSIS_WORKER_BATCH_SIZE', '100'))
+    ANALYSIS_WORKER_POLL_SECONDS = float(os.getenv('ANALYSIS_WORKER_POLL_SECONDS', '10'))
+    # Bütçe: dakikada en fazla N parça, saatte en fazla N tahmini girdi token'ı (0 = sınırsız)
+    ANALYSIS_WORKER_BATCHES_PER_MINUTE = int(os.getenv('ANALYSIS_WORKER_BATCHES_PER_MINUTE', '6'))
+    ANALYSIS_WORKER_TOKENS_PER_HOUR = int(os.getenv('ANALYSIS_WORKER_TOKENS_PER_HOUR', '500000'))
+    # Sınıflandırma yanıtını akış halinde oku, gelen satırları hemen kaydet
+    LLM_STREAMING = os.getenv('LLM_STREAMING', 'true').lower() == 'true'
+    # Toplu (offline) sınıflandırma - geçmiş veriler için Batch API işleri
+    BULK_REQUESTS_PER_JOB = int(os.getenv('BULK_REQUESTS_PER_JOB', '200'))
+    BULK_POLL_SECONDS = float(os.getenv('BULK_POLL_SECONDS', '60'))
+    # Toplu işe alınan şikayetlerin kira süresi (Batch API 24 saat içinde tamamlanır)
+    BULK_LEASE_HOURS = float(os.getenv('BULK_LEASE_HOURS', '48'))
+    # Versiyonu eskimiş analizlerin yeniden sınıflandırılması (yeni şikayetlerin önüne geçmesin diye yavaş)
+    RECLASSIFY_BATCH_SIZE = int(os.getenv('RECLASSIFY_BATCH_SIZE', '100'))
+    RECLASSIFY_BATCHES_PER_MINUTE = int(os.getenv('RECLASSIFY_BATCHES_PER_MINUTE', '4'))
+    
+    # LLM sınıflandırma önbelleği - 0 verilirse kapalı
+    LLM_CACHE_MAX_ENTRIES = int(os.getenv('LLM_CACHE_MAX_ENTRIES', '200000'))
+    
+    # Yerel ön sınıflandırıcı - güveni eşiğin üstündeki şikayetler LLM'e gitmez.
+    # Etiketleme davranışını değiştirir; açmadan önce `python utils/local_classifier.py` ile doğruluğu ölçün
+    LOCAL_CLASSIFIER_ENABLED = os.getenv('LOCAL_CLASSIFIER_ENABLED', 'false').lower() == 'true'
+    LOCAL_CLASSIFIER_THRESHOLD = float(os.getenv('LOCAL_CLASSIFIER_THRESHOLD', '0.8'))
+    # TF-IDF modelini etiketli Analysis satırlarıyla eğit (scikit-learn gerekir)
+    LOCAL_CLASSIFIER_MODEL = os.getenv('LOCAL_CLASSIFIER_MODEL', 'false').lower() == 'true'
+    
+    # Yakın kopya kümeleme - küme başına tek temsilci LLM'e gider, etiketi diğer üyelere kopyalanır
+    NEAR_DUPLICATE_ENABLED = os.getenv('NEAR_DUPLICATE_ENABLED', 'true').lower() == 'true'
+    NEAR_DUPLICATE_THRESHOLD = float(os.getenv('NEAR_DUPLICATE_THRESHOLD', '0.7'))
+    
     # Scrapy ayarları
     SCRAPY_PROJECT_PATH = os.path.join(os.path.dirname(__file__), 'sv_vestel')
     
@@ -29,12 +137,26 @@ class Config:
         "Türk Kahve Makinesi", "Uydu Alıcısı", "Ütü", "Vakum Makinesi", "Vantilatör"
     ]
     
+    # Şikayet sebepleri (sabit 10'lu liste)
+    REASONS = [
+        "Teknik Servis",
+        "Kargo & Teslimat",
+        "Müşteri Hizmetleri",
+        "Fiyat & Fatura",
+        "Ürün Kalitesi",
+        "Website & Uygulama",
+        "İade & Değişim",
+        "Satış & Mağaza",
+        "Zaman & Süreç",
+        "Diğer"
+    ]
+    
     # Logging
     LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
     
     @classmethod
     def validate(cls):
         """Ayarları doğrula"""
-        if not cls.GOOGLE_API_KEY:
+        if cls.LLM_BACKEND == 'gemini' and not cls.GOOGLE_API_KEY:
             raise ValueError("GOOGLE_API_KEY .env dosyasında tanımlanmalı!")
         return True
\ No newline at end of file
@@ -1,18 +1,93 @@
+import base64
+import json
+import os
 import sqlite3
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
 from typing import List, Dict, Optional, Tuple
 from config import Config
+from utils.text_normalizer import build_fts_query
+from utils.body_codec import BodyCodec
+from utils.near_duplicate import MinHasher
+
+# Şikayet metni: düz metin ya da sözlükle sıkıştırılmış blob (comment_body SQL fonksiyonu açar)
+BODY_SQL = 'comment_body(full_comment, full_comment_z, body_dict_id)'
+
+# Listeleme API'sinde seçilebilen kolonlar -> SQL ifadesi
+LIST_COLUMNS = {
+    'Complaint_ID': 'c.Complaint_ID',
+    'ref_url': 'c.ref_url',
+    'title': 'c.title',
+    'date': 'c.date',
+    'full_comment': 'comment_body(c.full_comment, c.full_comment_z, c.body_dict_id)',
+    'Category': 'cd.Name',
+    'Reason': 'rd.Name',
+}
+
+# Yeniden sınıflandırma kapsamları: hangi versiyon farkı satırı eskimiş sayar
+STALE_SCOPES = ('all', 'taxonomy', 'prompt', 'model')
+
+# Arşiv dosyası şeması: 2 = analiz versiyon damgaları ve partition içi FTS indeksi
+ARCHIVE_SCHEMA_VERSION = 2
+
+# Export akışında satır kolonları (sırası SELECT ile aynı)
+EXPORT_COLUMNS = ['Complaint_ID', 'ref_url', 'title', 'date', 'Category', 'Reason', 'full_comment']
 
 class DatabaseManager:
-    def __init__(self, db_path: str = None):
+    def __init__(self, db_path: str = None, read_only: bool = False):
         self.db_path = db_path or Config.DATABASE_PATH
-        self.init_database()  # Veritabanını başlangıçta oluştur
+        self.read_only = read_only
+        self.body_codec = BodyCodec()
+        self.minhasher = MinHasher()
+        self._analytics = None
+        self.archive_dir = Config.ARCHIVE_DIR or os.path.join(os.path.dirname(os.path.abspath(self.db_path)), 'archive')
+        
+        if read_only:
+            # Snapshot kopyası gibi salt okunur veritabanı - şema zaten hazır
+            with self._connect() as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'complaints_fts'")
+                self.fts_enabled = cursor.fetchone() is not None
+        else:
+            self.init_database()  # Veritabanını başlangıçta oluştur
+    
+    def _connect(self, **kwargs) -> sqlite3.Connection:
+        """Veritabanı bağlantısı aç (salt okunur modda dosya yoksa oluşturmaz)"""
+        if self.read_only:
+            conn = sqlite3.connect(f'file:{self.db_path}?mode=ro', uri=True, **kwargs)
+        else:
+            conn = sqlite3.connect(self.db_path, **kwargs)
+        conn.create_function('comment_body', 3, self._comment_body, deterministic=True)
+        return conn
+    
+    def _comment_body(self, full_comment, compressed, dict_id):
+        """SQL: şikayet metnini döndür, sıkıştırılmışsa sadece bu satır için aç"""
+        if full_comment is not None or compressed is None:
+            return full_comment
+        
+        if not self.body_codec.has_dictionary(dict_id):
+            self._load_compression_dictionaries()
+        return self.body_codec.decompress(compressed, dict_id)
+    
+    def _load_compression_dictionaries(self):
+        """Kayıtlı sıkıştırma sözlüklerini codec'e yükle"""
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT Dict_ID, codec, data FROM compression_dicts')
+            for dict_id, codec, data in cursor.fetchall():
+                if not self.body_codec.has_dictionary(dict_id):
+                    self.body_codec.register_dictionary(dict_id, codec, data)
     
     def init_database(self):
         """Veritabanını ve tabloları oluştur"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
                 
+                # WAL: crawler yazarken okuyucular (ve snapshot kopyalama) bloklanmaz
+                cursor.execute('PRAGMA journal_mode=WAL')
+                
                 # Tablo 1: Complaints (Şikayetler)
                 cursor.execute('''
                     CREATE TABLE IF NOT EXISTS complaints (
@@ -25,42 +100,472 @@ class DatabaseManager:
                     )
                 ''')
                 
-                # Tablo 2: Analysis (Analiz) - Complaint_ID UNIQUE olacak
+                # Sıkıştırılmış metin kolonları: full_comment_z doluysa full_comment NULL'dır
+                cursor.execute('PRAGMA table_info(complaints)')
+                complaint_columns = {row[1] for row in cursor.fetchall()}
+                if 'full_comment_z' not in complaint_columns:
+                    cursor.execute('ALTER TABLE complaints ADD COLUMN full_comment_z BLOB')
+                if 'body_dict_id' not in complaint_columns:
+                    cursor.execute('ALTER TABLE complaints ADD COLUMN body_dict_id INTEGER')
+                
+                # Paylaşılan sıkıştırma sözlükleri
                 cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS Analysis (
-                        ID INTEGER PRIMARY KEY AUTOINCREMENT,
-                        Complaint_ID INTEGER UNIQUE NOT NULL,
-                        Category TEXT,
-                        Reason TEXT,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        FOREIGN KEY (Complaint_ID) REFERENCES complaints (Complaint_ID) ON DELETE CASCADE
+                    CREATE TABLE IF NOT EXISTS compression_dicts (
+                        Dict_ID INTEGER PRIMARY KEY AUTOINCREMENT,
+                        codec TEXT NOT NULL,
+                        data BLOB NOT NULL,
+                        sample_count INTEGER,
+                        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
                     )
                 ''')
                 
+                # Tablo 2: Analysis (Analiz) - kategori/sebep tamsayı kodlu, Analysis bir view
+                self._init_analysis_tables(cursor)
+                
                 # Indexler
                 cursor.execute('CREATE INDEX IF NOT EXISTS idx_complaints_date ON complaints (date)')
-                cursor.execute('CREATE INDEX IF NOT EXISTS idx_analysis_complaint_id ON Analysis (Complaint_ID)')
+                
+                # Tablo 3: Günlük özet (gün, kategori, sebep) -> adet
+                # insert_analysis içinde aynı transaction'da güncellenir
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS analysis_daily_rollup (
+                        day TEXT NOT NULL,
+                        Category TEXT NOT NULL DEFAULT '',
+                        Reason TEXT NOT NULL DEFAULT '',
+                        count INTEGER NOT NULL DEFAULT 0,
+                        PRIMARY KEY (day, Category, Reason)
+                    ) WITHOUT ROWID
+                ''')
+                
+                # Özet tablo boşsa mevcut analizlerden bir kez doldur
+                cursor.execute('SELECT 1 FROM analysis_daily_rollup LIMIT 1')
+                if not cursor.fetchone():
+                    self._rebuild_rollup(cursor)
+                
+                # Tablo 4: Analiz iş kuyruğu - analiz bekleyen şikayetler
+                # Analizi tamamlanan satır kuyruktan silinir, tablo sadece bekleyen işi tutar
+                cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'analysis_queue'")
+                queue_is_new = cursor.fetchone() is None
+                
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS analysis_queue (
+                        Complaint_ID INTEGER PRIMARY KEY,
+                        date TEXT,
+                        status TEXT NOT NULL DEFAULT 'pending',
+                        attempts INTEGER NOT NULL DEFAULT 0,
+                        lease_owner TEXT,
+                        lease_expires_at DATETIME,
+                        last_error TEXT,
+                        enqueued_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                        FOREIGN KEY (Complaint_ID) REFERENCES complaints (Complaint_ID) ON DELETE CASCADE
+                    )
+                ''')
+                cursor.execute('CREATE INDEX IF NOT EXISTS idx_analysis_queue_status_date ON analysis_queue (status, date)')
+                
+                # Crawler dahil her insert'te kuyruğa ekle
+                cursor.execute('''
+                    CREATE TRIGGER IF NOT EXISTS complaints_queue_ai AFTER INSERT ON complaints BEGIN
+                        INSERT OR IGNORE INTO analysis_queue (Complaint_ID, date) VALUES (new.Complaint_ID, new.date);
+                    END
+                ''')
+                cursor.execute('''
+                    CREATE TRIGGER IF NOT EXISTS complaints_queue_ad AFTER DELETE ON complaints BEGIN
+                        DELETE FROM analysis_queue WHERE Complaint_ID = old.Complaint_ID;
+                    END
+                ''')
+                
+                # İlk kurulumda mevcut analizsiz şikayetleri kuyruğa al
+                if queue_is_new:
+                    cursor.execute('''
+                        INSERT INTO analysis_queue (Complaint_ID, date)
+                        SELECT c.Complaint_ID, c.date
+                        FROM complaints c
+                        LEFT JOIN Analysis a ON c.Complaint_ID = a.Complaint_ID
+                        WHERE (a.Category IS NULL OR TRIM(a.Category) = '' OR a.Category = 'NULL')
+                    ''')
+                
+                # Tablo 6: Arşiv partition kataloğu - ay bazlı soğuk veritabanları
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS archive_partitions (
+                        month TEXT PRIMARY KEY,
+                        path TEXT NOT NULL,
+                        row_count INTEGER NOT NULL DEFAULT 0,
+                        min_date TEXT,
+                        max_date TEXT,
+                        min_complaint_id INTEGER,
+                        max_complaint_id INTEGER,
+                        archived_at DATETIME DEFAULT CURRENT_TIMESTAMP
+                    )
+                ''')
+                # Arşiv dosyasının şema sürümü (ARCHIVE_SCHEMA_VERSION'dan eskiyse açılışta taşınır)
+                cursor.execute('PRAGMA table_info(archive_partitions)')
+                if 'schema_version' not in {row[1] for row in cursor.fetchall()}:
+                    cursor.execute('ALTER TABLE archive_partitions ADD COLUMN schema_version INTEGER NOT NULL DEFAULT 1')
+                
+                # Tablo 5: Export watermark'ları (incremental snapshot için son aktarılan analiz ID'si)
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS export_watermarks (
+                        name TEXT PRIMARY KEY,
+                        last_id INTEGER NOT NULL DEFAULT 0,
+                        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+                    )
+                ''')
+                
+                # Tablo 7: LLM sınıflandırma önbelleği - anahtar: hash(normalize metin, prompt versiyonu, model)
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS llm_cache (
+                        cache_key TEXT PRIMARY KEY,
+                        Category TEXT NOT NULL,
+                        Reason TEXT NOT NULL,
+                        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                        last_used_at DATETIME DEFAULT CURRENT_TIMESTAMP
+                    )
+                ''')
+                cursor.execute('CREATE INDEX IF NOT EXISTS idx_llm_cache_last_used ON llm_cache (last_used_at)')
+                
+                # Tablo 8: Yakın kopya indeksi - MinHash imzaları ve LSH bant kovaları
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS minhash_signatures (
+                        Complaint_ID INTEGER PRIMARY KEY,
+                        signature BLOB NOT NULL
+                    )
+                ''')
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS minhash_bands (
+                        band INTEGER NOT NULL,
+                        bucket INTEGER NOT NULL,
+                        Complaint_ID INTEGER NOT NULL,
+                        PRIMARY KEY (band, bucket, Complaint_ID)
+                    ) WITHOUT ROWID
+                ''')
+                cursor.execute('CREATE INDEX IF NOT EXISTS idx_minhash_bands_complaint ON minhash_bands (Complaint_ID)')
+                cursor.execute('''
+                    CREATE TRIGGER IF NOT EXISTS complaints_minhash_ad AFTER DELETE ON complaints BEGIN
+                        DELETE FROM minhash_signatures WHERE Complaint_ID = old.Complaint_ID;
+                        DELETE FROM minhash_bands WHERE Complaint_ID = old.Complaint_ID;
+                    END
+                ''')
+                
+                # Tablo 9: LLM çağrı ölçümleri (gecikme, token, hata) - maliyet raporları için
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS llm_calls (
+                        ID INTEGER PRIMARY KEY AUTOINCREMENT,
+                        call_site TEXT NOT NULL,
+                        model_name TEXT,
+                        started_at DATETIME NOT NULL,
+                        latency_ms REAL NOT NULL,
+                        first_chunk_ms REAL,
+                        prompt_tokens INTEGER NOT NULL DEFAULT 0,
+                        response_tokens INTEGER NOT NULL DEFAULT 0,
+                        attempt INTEGER NOT NULL DEFAULT 0,
+                        error TEXT
+                    )
+                ''')
+                cursor.execute('CREATE INDEX IF NOT EXISTS idx_llm_calls_started_at ON llm_calls (started_at)')
+                
+                # Tablo 10: Toplu (offline) sınıflandırma işleri ve sağlayıcıya gönderilen parçaları
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS bulk_jobs (
+                        Job_ID INTEGER PRIMARY KEY AUTOINCREMENT,
+                        status TEXT NOT NULL DEFAULT 'preparing',
+                        start_date TEXT,
+                        end_date TEXT,
+                        max_complaints INTEGER,
+                        total INTEGER NOT NULL DEFAULT 0,
+                        classified INTEGER NOT NULL DEFAULT 0,
+                        released INTEGER NOT NULL DEFAULT 0,
+                        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                        completed_at DATETIME,
+                        error TEXT
+                    )
+                ''')
+                # requests: sağlayıcı işindeki her prompt için sıralı Complaint_ID listesi (JSON)
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS bulk_job_batches (
+                        Batch_ID INTEGER PRIMARY KEY AUTOINCREMENT,
+                        Job_ID INTEGER NOT NULL REFERENCES bulk_jobs (Job_ID),
+                        status TEXT NOT NULL DEFAULT 'pending',
+                        provider_job TEXT,
+                        requests TEXT NOT NULL,
+                        submitted_at DATETIME,
+                        completed_at DATETIME,
+                        error TEXT
+                    )
+                ''')
+                cursor.execute('CREATE INDEX IF NOT EXISTS idx_bulk_job_batches_status ON bulk_job_batches (status, Job_ID)')
+                
+                # Tam metin arama indeksi (FTS5 yoksa arama devre dışı kalır)
+                self.fts_enabled = self._init_fts(cursor)
                 
                 conn.commit()
                 
+                self._migrate_archive_partitions(conn)
+                
         except Exception as e:
             raise
     
     
-    def get_complaints_by_count(self, count: int) -> Tuple[List[Dict], List[int]]:
-        """Son N şikayeti getir"""
+    def _init_fts(self, cursor) -> bool:
+        """complaints için FTS5 indeksini ve senkron trigger'larını oluştur"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
+            # Eski şema: external content indeks silmede trigger'dan metni (comment_body ile) istiyordu
+            cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'complaints_fts'")
+            row = cursor.fetchone()
+            if row and 'content=' in row[0].replace(' ', ''):
+                cursor.execute('DROP TABLE complaints_fts')
+                row = None
+            is_new = row is None
+            
+            # Katlanmış metni kendisi saklar: silme/güncelleme rowid ile yapılır, trigger'lar
+            # metin açmaz (Python fonksiyonu gerekmez). unicode61 + remove_diacritics ç/ğ/ö/ş/ü/İ'yi
+            # katlar; 'ı' katlanmadığı için 'i'ye çevrilir (sorgu tarafı normalize_turkish ile aynı)
+            cursor.execute('''
+                CREATE VIRTUAL TABLE IF NOT EXISTS complaints_fts USING fts5(
+                    title,
+                    full_comment,
+                    tokenize='unicode61 remove_diacritics 2',
+                    prefix='2 3'
+                )
+            ''')
+            
+            for trigger in ('complaints_fts_ai', 'complaints_fts_ad', 'complaints_fts_au',
+                            'complaints_fts_au_title', 'complaints_fts_au_body'):
+                cursor.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+            cursor.execute('''
+                CREATE TRIGGER complaints_fts_ai AFTER INSERT ON complaints BEGIN
+                    INSERT INTO complaints_fts (rowid, title, full_comment)
+                    VALUES (new.Complaint_ID, replace(new.title, 'ı', 'i'), replace(new.full_comment, 'ı', 'i'));
+                END
+            ''')
+            cursor.execute('''
+                CREATE TRIGGER complaints_fts_ad AFTER DELETE ON complaints BEGIN
+                    DELETE FROM complaints_fts WHERE rowid = old.Complaint_ID;
+                END
+            ''')
+            cursor.execute('''
+                CREATE TRIGGER complaints_fts_au_title AFTER UPDATE OF title ON complaints
+                WHEN new.title IS NOT old.title
+                BEGIN
+                    UPDATE complaints_fts SET title = replace(new.title, 'ı', 'i') WHERE rowid = new.Complaint_ID;
+                END
+            ''')
+            # Metnin sıkıştırılmış kolona taşınması (full_comment -> NULL) indeksi değiştirmez
+            cursor.execute('''
+                CREATE TRIGGER complaints_fts_au_body AFTER UPDATE OF full_comment ON complaints
+                WHEN new.full_comment IS NOT old.full_comment
+                     AND NOT (new.full_comment IS NULL AND new.full_comment_z IS NOT NULL)
+                BEGIN
+                    UPDATE complaints_fts SET full_comment = replace(new.full_comment, 'ı', 'i')
+                    WHERE rowid = new.Complaint_ID;
+                END
+            ''')
+            
+            # İlk kurulumda (ya da eski şemadan geçişte) mevcut şikayetleri indeksle
+            if is_new:
                 cursor.execute('''
-                    SELECT Complaint_ID, full_comment, ref_url, title, date
+                    INSERT INTO complaints_fts (rowid, title, full_comment)
+                    SELECT Complaint_ID, replace(title, 'ı', 'i'), replace(comment_body(full_comment, full_comment_z, body_dict_id), 'ı', 'i')
                     FROM complaints
+                ''')
+            
+            return True
+            
+        except sqlite3.OperationalError as e:
+            # SQLite FTS5 desteği olmadan derlenmiş
+            return False
+    
+    def search(self, query: str, start_date: str = None, end_date: str = None,
+               page: int = 1, page_size: int = 20) -> Dict:
+        """Başlık ve şikayet metninde tam metin arama (bm25 sıralı, sayfalı, arşiv partition'ları dahil)"""
+        empty = {"query": query, "page": page, "page_size": page_size, "total": 0, "results": []}
+        
+        fts_query = build_fts_query(query)
+        if not self.fts_enabled or not fts_query:
+            return empty
+        
+        try:
+            with self._connect() as conn:
+                cursor = conn.cursor()
+                
+                conditions = ['complaints_fts MATCH ?']
+                params = [fts_query]
+                if start_date:
+                    conditions.append('c.date >= ?')
+                    params.append(start_date)
+                if end_date:
+                    conditions.append("c.date < date(?, '+1 day')")
+                    params.append(end_date)
+                where_clause = ' AND '.join(conditions)
+                
+                count_query = f'''
+                    SELECT COUNT(*)
+                    FROM {{schema}}.complaints_fts
+                    JOIN {{schema}}.complaints c ON c.Complaint_ID = complaints_fts.rowid
+                    WHERE {where_clause}
+                '''
+                # Başlık eşleşmeleri gövde eşleşmelerinden daha ağır
+                page_query = f'''
+                    SELECT c.Complaint_ID, c.ref_url, c.title, c.date, bm25(complaints_fts, 2.0, 1.0) AS score
+                    FROM {{schema}}.complaints_fts
+                    JOIN {{schema}}.complaints c ON c.Complaint_ID = complaints_fts.rowid
+                    WHERE {where_clause}
+                    ORDER BY score
+                    LIMIT ?
+                '''
+                # Her partition'dan sayfanın sonuna kadar olan en iyi satırlar alınıp skorla birleştirilir
+                top_n = page * page_size
+                
+                cursor.execute(count_query.format(schema='main'), params)
+                total = cursor.fetchone()[0]
+                cursor.execute(page_query.format(schema='main'), params + [top_n])
+                rows = cursor.fetchall()
+                
+                for partition in self._archive_partitions(cursor, start_date=start_date, end_date=end_date):
+                    with self._attached(conn, partition):
+                        cursor.execute("SELECT 1 FROM cold.sqlite_master WHERE name = 'complaints_fts'")
+                        if not cursor.fetchone():
+                            continue
+                        cursor.execute(count_query.format(schema='cold'), params)
+                        total += cursor.fetchone()[0]
+                        cursor.execute(page_query.format(schema='cold'), params + [top_n])
+                        rows.extend(cursor.fetchall())
+                
+                rows.sort(key=lambda r: r[4])
+                columns = ['Complaint_ID', 'ref_url', 'title', 'date', 'score']
+                results = [dict(zip(columns, row)) for row in rows[(page - 1) * page_size:top_n]]
+                
+                return {
+                    "query": query,
+                    "page": page,
+                    "page_size": page_size,
+                    "total": total,
+                    "results": results
+                }
+                
+        except Exception as e:
+            return empty
+    
+    def list_complaints(self, start_date: str = None, end_date: str = None, category: str = None,
+                        reason: str = None, columns: List[str] = None, cursor: str = None,
+                        page_size: int = 50) -> Dict:
+        """Şikayetleri (date, Complaint_ID) üzerinde keyset sayfalama ile yeniden eskiye listele"""
+        empty = {"page_size": page_size, "items": [], "next_cursor": None}
+        
+        try:
+            columns = columns or ['Complaint_ID', 'ref_url', 'title', 'date']
+            unknown = [column for column in columns if column not in LIST_COLUMNS]
+            if unknown:
+                raise ValueError(f"Bilinmeyen kolon: {', '.join(unknown)}")
+            
+            conditions = ['1 = 1']
+            params = []
+            if cursor:
+                # OFFSET yerine son görülen (date, ID) anahtarından devam - derin sayfalar da index'ten okunur
+                after_date, after_id = self._decode_list_cursor(cursor)
+                conditions.append('(c.date, c.Complaint_ID) < (?, ?)')
+                params.extend([after_date, after_id])
+            if start_date:
+                conditions.append('c.date >= ?')
+                params.append(start_date)
+            if end_date:
+                conditions.append("c.date < date(?, '+1 day')")
+                params.append(end_date)
+            if category:
+                conditions.append('a.Category_Code = (SELECT Category_Code FROM main.category_dim WHERE Name = ?)')
+                params.append(category)
+            if reason:
+                conditions.append('a.Reason_Code = (SELECT Reason_Code FROM main.reason_dim WHERE Name = ?)')
+                params.append(reason)
+            
+            joins = ''
+            if category or reason or 'Category' in columns or 'Reason' in columns:
+                joins = '''
+                    LEFT JOIN {schema}.analysis_codes a ON a.Complaint_ID = c.Complaint_ID
+                    LEFT JOIN main.category_dim cd ON cd.Category_Code = a.Category_Code
+                    LEFT JOIN main.reason_dim rd ON rd.Reason_Code = a.Reason_Code
+                '''
+            
+            # İlk iki kolon sayfa anahtarı, geri kalanı istenen projeksiyon
+            select_list = ', '.join(['c.date', 'c.Complaint_ID'] + [LIST_COLUMNS[column] for column in columns])
+            query = f'''
+                SELECT {select_list}
+                FROM {{schema}}.complaints c
+                {joins}
+                WHERE {' AND '.join(conditions)}
+                ORDER BY c.date DESC, c.Complaint_ID DESC
+                LIMIT ?
+            '''
+            params.append(page_size + 1)
+            
+            with self._connect() as conn:
+                db_cursor = conn.cursor()
+                db_cursor.execute(query.format(schema='main'), params)
+                rows = db_cursor.fetchall()
+                
+                # Sayfa sıcak veritabanında dolmadıysa arşiv partition'larından tamamla
+                for partition in self._archive_partitions(db_cursor, start_date=start_date, end_date=end_date):
+                    if len(rows) > page_size and (partition['max_date'] or '') < (rows[page_size][0] or ''):
+                        break
+                    with self._attached(conn, partition):
+                        db_cursor.execute(query.format(schema='cold'), params)
+                        rows.extend(db_cursor.fetchall())
+                    rows.sort(key=lambda r: (r[0] or '', r[1]), reverse=True)
+                    rows = rows[:page_size + 1]
+            
+            has_more = len(rows) > page_size
+            rows = rows[:page_size]
+            
+            return {
+                "page_size": page_size,
+                "items": [dict(zip(columns, row[2:])) for row in rows],
+                "next_cursor": self._encode_list_cursor(rows[-1][0], rows[-1][1]) if has_more else None
+            }
+            
+        except Exception as e:
+            empty["error"] = str(e)
+            return empty
+    
+    @staticmethod
+    def _encode_list_cursor(date: str, complaint_id: int) -> str:
+        """Sayfa anahtarını istemciye verilecek opak bir token'a çevir"""
+        return base64.urlsafe_b64encode(json.dumps([date, complaint_id]).encode('utf-8')).decode('ascii')
+    
+    @staticmethod
+    def _decode_list_cursor(token: str) -> Tuple[str, int]:
+        try:
+            date, complaint_id = json.loads(base64.urlsafe_b64decode(token.encode('ascii')))
+            return date, int(complaint_id)
+        except Exception as e:
+            raise ValueError("Geçersiz sayfa cursor'ı")
+    
+    def get_complaints_by_count(self, count: int, include_body: bool = True) -> Tuple[List[Dict], List[int]]:
+        """Son N şikayeti getir (gerekirse arşiv partition'larına da bakar)"""
+        try:
+            with self._connect() as conn:
+                cursor = conn.cursor()
+                # Sadece ID/metadata isteyen çağıranlar için metin açılmaz
+                body_column = BODY_SQL if include_body else 'NULL'
+                query = f'''
+                    SELECT Complaint_ID, {body_column}, ref_url, title, date
+                    FROM {{schema}}.complaints
                     ORDER BY date DESC, Complaint_ID DESC
                     LIMIT ?
-                ''', (count,))
+                '''
+                cursor.execute(query.format(schema='main'), (count,))
+                rows = cursor.fetchall()
+                
+                # Arşivler yeniden eskiye; N'inci satırdan eski partition'a inmeye gerek yok
+                for partition in self._archive_partitions(cursor):
+                    if len(rows) >= count and (partition['max_date'] or '') < (rows[count - 1][4] or ''):
+                        break
+                    with self._attached(conn, partition):
+                        cursor.execute(query.format(schema='cold'), (count,))
+                        rows.extend(cursor.fetchall())
+                    rows.sort(key=lambda r: (r[4] or '', r[0]), reverse=True)
+                    rows = rows[:count]
                 
                 columns = ['Complaint_ID', 'full_comment', 'ref_url', 'title', 'date']
-                complaints = [dict(zip(columns, row)) for row in cursor.fetchall()]
+                complaints = [dict(zip(columns, row)) for row in rows]
                 complaint_ids = [c['Complaint_ID'] for c in complaints]
                 
                 return complaints, complaint_ids
@@ -68,20 +573,31 @@ class DatabaseManager:
         except Exception as e:
             return [], []
     
-    def get_complaints_by_date_range(self, start_date: str, end_date: str) -> Tuple[List[Dict], List[int]]:
-        """Tarih aralığındaki şikayetleri getir"""
+    def get_complaints_by_date_range(self, start_date: str, end_date: str, include_body: bool = True) -> Tuple[List[Dict], List[int]]:
+        """Tarih aralığındaki şikayetleri getir (aralığa düşen arşiv partition'ları dahil)"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
-                cursor.execute('''
-                    SELECT Complaint_ID, full_comment, ref_url, title, date
-                    FROM complaints
+                body_column = BODY_SQL if include_body else 'NULL'
+                query = f'''
+                    SELECT Complaint_ID, {body_column}, ref_url, title, date
+                    FROM {{schema}}.complaints
                     WHERE date >= ? AND date < date(?, '+1 day')
                     ORDER BY date DESC
-                ''', (start_date, end_date))
+                '''
+                cursor.execute(query.format(schema='main'), (start_date, end_date))
+                rows = cursor.fetchall()
+                
+                partitions = self._archive_partitions(cursor, start_date=start_date, end_date=end_date)
+                for partition in partitions:
+                    with self._attached(conn, partition):
+                        cursor.execute(query.format(schema='cold'), (start_date, end_date))
+                        rows.extend(cursor.fetchall())
+                if partitions:
+                    rows.sort(key=lambda r: r[4] or '', reverse=True)
                 
                 columns = ['Complaint_ID', 'full_comment', 'ref_url', 'title', 'date']
-                complaints = [dict(zip(columns, row)) for row in cursor.fetchall()]
+                complaints = [dict(zip(columns, row)) for row in rows]
                 complaint_ids = [c['Complaint_ID'] for c in complaints]
                 
                 return complaints, complaint_ids
@@ -90,30 +606,29 @@ class DatabaseManager:
             return [], []
     
     def get_uncategorized_complaints(self, complaint_ids: List[int] = None) -> List[Dict]:
-        """Analiz yapılmamış şikayetleri getir"""
+        """Analiz yapılmamış şikayetleri getir (deneme hakkı bitmiş 'failed' olanlar hariç)"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
                 
                 if complaint_ids:
                     # Sadece belirli ID'ler içinde analiz yapılmamış olanları bul
                     placeholders = ','.join(['?' for _ in complaint_ids])
                     query = f'''
-                        SELECT c.Complaint_ID, c.full_comment, c.ref_url, c.title, c.date
-                        FROM complaints c
-                        LEFT JOIN Analysis a ON c.Complaint_ID = a.Complaint_ID  
-                        WHERE c.Complaint_ID IN ({placeholders}) 
-                        AND (a.Category IS NULL OR TRIM(a.Category) = '' OR a.Category = 'NULL')
+                        SELECT c.Complaint_ID, comment_body(c.full_comment, c.full_comment_z, c.body_dict_id), c.ref_url, c.title, c.date
+                        FROM analysis_queue q
+                        JOIN complaints c ON c.Complaint_ID = q.Complaint_ID
+                        WHERE q.Complaint_ID IN ({placeholders}) AND q.status != 'failed'
                     '''
                     cursor.execute(query, complaint_ids)
                 else:
                     # Tüm analiz yapılmamış şikayetleri getir
                     cursor.execute('''
-                        SELECT c.Complaint_ID, c.full_comment, c.ref_url, c.title, c.date
-                        FROM complaints c
-                        LEFT JOIN Analysis a ON c.Complaint_ID = a.Complaint_ID
-                        WHERE (a.Category IS NULL OR TRIM(a.Category) = '' OR a.Category = 'NULL')
-                        ORDER BY c.date DESC
+                        SELECT c.Complaint_ID, comment_body(c.full_comment, c.full_comment_z, c.body_dict_id), c.ref_url, c.title, c.date
+                        FROM analysis_queue q
+                        JOIN complaints c ON c.Complaint_ID = q.Complaint_ID
+                        WHERE q.status != 'failed'
+                        ORDER BY q.date DESC
                     ''')
             
             columns = ['Complaint_ID', 'full_comment', 'ref_url', 'title', 'date']
@@ -124,10 +639,216 @@ class DatabaseManager:
         except Exception as e:
             return []
     
+    def claim_analysis_batch(self, limit: int, worker_id: str, lease_seconds: int = 300,
+                             max_attempts: int = 3, complaint_ids: List[int] = None) -> List[Dict]:
+        """Kuyruktan en yeni N şikayeti atomik olarak kirala (süresi dolmuş kiralar tekrar alınabilir)"""
+        conn = self._connect(isolation_level=None)
+        try:
+            cursor = conn.cursor()
+            # Yazma kilidini baştan al - iki worker aynı satırları seçemesin
+            cursor.execute('BEGIN IMMEDIATE')
+            
+            # Son deneme hakkındaki kirası dolan iş (sahibi çöktü) bir daha alınamaz - 'claimed'da asılı kalmasın
+            cursor.execute('''
+                UPDATE analysis_queue
+                SET status = 'failed', lease_owner = NULL, lease_expires_at = NULL,
+                    last_error = COALESCE(last_error, 'Kira süresi doldu')
+                WHERE status = 'claimed' AND lease_expires_at < datetime('now') AND attempts >= ?
+            ''', (max_attempts,))
+            
+            id_filter = ''
+            params = [max_attempts]
+            if complaint_ids:
+                id_filter = f"AND Complaint_ID IN ({','.join(['?' for _ in complaint_ids])})"
+                params.extend(complaint_ids)
+            
+            cursor.execute(f'''
+                SELECT Complaint_ID
+                FROM analysis_queue
+                WHERE (status = 'pending' OR (status = 'claimed' AND lease_expires_at < datetime('now')))
+                AND attempts < ?
+                {id_filter}
+                ORDER BY date DESC
+                LIMIT ?
+            ''', params + [limit])
+            claimed_ids = [row[0] for row in cursor.fetchall()]
+            
+            if claimed_ids:
+                placeholders = ','.join(['?' for _ in claimed_ids])
+                cursor.execute(f'''
+                    UPDATE analysis_queue
+                    SET status = 'claimed', lease_owner = ?, attempts = attempts + 1,
+                        lease_expires_at = datetime('now', ?)
+                    WHERE Complaint_ID IN ({placeholders})
+                ''', [worker_id, f'{int(lease_seconds):+d} seconds'] + claimed_ids)
+            
+            cursor.execute('COMMIT')
+            
+            if not claimed_ids:
+                return []
+            
+            cursor.execute(f'''
+                SELECT Complaint_ID, {BODY_SQL}, ref_url, title, date
+                FROM complaints
+                WHERE Complaint_ID IN ({placeholders})
+                ORDER BY date DESC
+            ''', claimed_ids)
+            
+            columns = ['Complaint_ID', 'full_comment', 'ref_url', 'title', 'date']
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+            
+        except Exception as e:
+            if conn.in_transaction:
+                conn.rollback()
+            return []
+        finally:
+            conn.close()
+    
+    def get_analysis_claim_owners(self, complaint_ids: List[int]) -> Dict[int, Optional[str]]:
+        """Analizi hâlâ bekleyen şikayetler -> kirayı tutan (kiralanmamış ya da kirası dolmuşsa None, 'failed' hariç)"""
+        if not complaint_ids:
+            return {}
+        
+        try:
+            with self._connect() as conn:
+                cursor = conn.cursor()
+                placeholders = ','.join(['?' for _ in complaint_ids])
+                cursor.execute(f'''
+                    SELECT Complaint_ID,
+                           CASE WHEN status = 'claimed' AND lease_expires_at >= datetime('now') THEN lease_owner END
+                    FROM analysis_queue
+                    WHERE Complaint_ID IN ({placeholders}) AND status != 'failed'
+                ''', list(complaint_ids))
+                return {row[0]: row[1] for row in cursor.fetchall()}
+                
+        except Exception as e:
+            return {}
+    
+    def release_analysis_claims(self, complaint_ids: List[int], error: str = None, max_attempts: int = 3,
+                                lease_owner: str = None, count_attempt: bool = True) -> int:
+        """
+        Kiralanmış ama analiz edilemeyen şikayetleri kuyruğa geri bırak (deneme hakkı bitenler 'failed')
+        lease_owner verilirse sadece o sahibin kirası bırakılır (süresi dolup devralınan kira korunur)
+        count_attempt=False: sağlayıcı kesintisi - kiralamada artan deneme sayısı geri alınır, iş 'failed' olmaz
+        """
+        if not complaint_ids:
+            return 0
+        
+        try:
+            with self._connect() as conn:
+                cursor = conn.cursor()
+                placeholders = ','.join(['?' for _ in complaint_ids])
+                owner_filter = 'AND lease_owner = ?' if lease_owner else ''
+                if count_attempt:
+                    status_sql = "status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END"
+                    params = [max_attempts]
+                else:
+                    status_sql = "status = 'pending', attempts = MAX(attempts - 1, 0)"
+                    params = []
+                cursor.execute(f'''
+                    UPDATE analysis_queue
+                    SET {status_sql},
+                        lease_owner = NULL, lease_expires_at = NULL, last_error = ?
+                    WHERE Complaint_ID IN ({placeholders}) AND status = 'claimed' {owner_filter}
+                ''', params + [error] + list(complaint_ids) + ([lease_owner] if lease_owner else []))
+                return cursor.rowcount
+                
+        except Exception as e:
+            return 0
+    
+    def record_analysis_failures(self, complaint_ids: List[int], error: str, max_attempts: int = 3) -> int:
+        """
+        Analizi sonuçsuz kalan şikayetlerin deneme sayısını artır (hakkı bitenler 'failed')
+        Başka bir sahibin geçerli kirasındaki şikayetlere dokunulmaz; kirası dolmuş olanlar işaretlenir
+        """
+        if not complaint_ids:
+            return 0
+        
+        try:
+            with self._connect() as conn:
+                cursor = conn.cursor()
+                placeholders = ','.join(['?' for _ in complaint_ids])
+                cursor.execute(f'''
+                    UPDATE analysis_queue
+                    SET attempts = attempts + 1,
+                        status = CASE WHEN attempts + 1 >= ? THEN 'failed' ELSE 'pending' END,
+                        lease_owner = NULL, lease_expires_at = NULL, last_error = ?
+                    WHERE Complaint_ID IN ({placeholders})
+                      AND (status != 'claimed' OR lease_expires_at < datetime('now'))
+                ''', [max_attempts, error] + list(complaint_ids))
+                return cursor.rowcount
+                
+        except Exception as e:
+            return 0
+    
+    def get_failed_analyses(self, limit: int = 100) -> List[Dict]:
+        """Deneme hakkı biten şikayetler (son hata mesajıyla)"""
+        try:
+            with self._connect() as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    SELECT Complaint_ID, date, attempts, last_error
+                    FROM analysis_queue
+                    WHERE status = 'failed'
+                    ORDER BY date DESC
+                    LIMIT ?
+                ''', (limit,))
+                columns = ['Complaint_ID', 'date', 'attempts', 'last_error']
+                return [dict(zip(columns, row)) for row in cursor.fetchall()]
+                
+        except Exception as e:
+            return []
+    
+    def retry_failed_analyses(self, complaint_ids: List[int] = None) -> int:
+        """'failed' şikayetleri deneme sayacını sıfırlayarak kuyruğa geri al"""
+        try:
+            with self._connect() as conn:
+                cursor = conn.cursor()
+                id_filter = ''
+                if complaint_ids:
+                    id_filter = f"AND Complaint_ID IN ({','.join(['?' for _ in complaint_ids])})"
+                cursor.execute(f'''
+                    UPDATE analysis_queue
+                    SET status = 'pending', attempts = 0, last_error = NULL
+                    WHERE status = 'failed' {id_filter}
+                ''', list(complaint_ids or []))
+                return cursor.rowcount
+                
+        except Exception as e:
+            return 0
+    
+    def get_analysis_queue_stats(self) -> Dict[str, int]:
+        """Kuyruktaki iş sayısını duruma göre getir"""
+        try:
+            with self._connect() as conn:
+                cursor = conn.cursor()
+                cursor.execute('SELECT status, COUNT(*) FROM analysis_queue GROUP BY status')
+                return dict(cursor.fetchall())
+                
+        except Exception as e:
+            return {}
+    
+    def get_analysis_queue_lag(self) -> Dict:
+        """Bekleyen iş sayısı ve en eski bekleyen şikayetin kuyrukta geçirdiği süre (sn)"""
+        try:
+            with self._connect() as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    SELECT COUNT(*), MIN(enqueued_at),
+                           CAST((julianday('now') - julianday(MIN(enqueued_at))) * 86400 AS INTEGER)
+                    FROM analysis_queue
+                    WHERE status IN ('pending', 'claimed')
+                ''')
+                pending, oldest, lag_seconds = cursor.fetchone()
+                return {"pending": pending, "oldest_enqueued_at": oldest, "lag_seconds": lag_seconds or 0}
+                
+        except Exception as e:
+            return {}
+    
     def insert_analysis(self, analysis_data: List[Dict]) -> int:
         """Analiz verilerini ekle/güncelle - Complaint_ID UNIQUE constraint ile"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
                 
                 successful_updates = 0
@@ -139,10 +860,17 @@ class DatabaseManager:
                     
                     try:
                         # UPSERT operation - INSERT OR REPLACE yerine UPDATE ya da INSERT
-                        # Önce kontrol et
-                        cursor.execute('SELECT ID FROM Analysis WHERE Complaint_ID = ?', (complaint_id,))
+                        # Önce kontrol et (eski değerler özet tablodan düşülecek)
+                        cursor.execute('SELECT ID, Category, Reason FROM Analysis WHERE Complaint_ID = ?', (complaint_id,))
                         existing = cursor.fetchone()
                         
+                        cursor.execute('SELECT COALESCE(date(date), \'\') FROM complaints WHERE Complaint_ID = ?', (complaint_id,))
+                        day_row = cursor.fetchone()
+                        if not day_row:
+                            # Arşivlenmiş (ya da olmayan) şikayet: sıcak tabloya sahipsiz analiz yazılmaz
+                            continue
+                        day = day_row[0]
+                        
                         if existing:
                             # UPDATE
                             cursor.execute('''
@@ -150,6 +878,7 @@ class DatabaseManager:
                                 SET Category = ?, Reason = ?, created_at = CURRENT_TIMESTAMP 
                                 WHERE Complaint_ID = ?
                             ''', (category, reason, complaint_id))
+                            self._bump_rollup(cursor, day, existing[1], existing[2], -1)
                         else:
                             # INSERT
                             cursor.execute('''
@@ -157,6 +886,25 @@ class DatabaseManager:
                                 VALUES (?, ?, ?)
                             ''', (complaint_id, category, reason))
                         
+                        self._bump_rollup(cursor, day, category, reason, 1)
+                        
+                        # Versiyon damgası view'da yok - kodlu tabloya doğrudan (damgasız yazım eski kayıt sayılır)
+                        cursor.execute('''
+                            UPDATE analysis_codes
+                            SET taxonomy_version = ?, prompt_version = ?, model_name = ?
+                            WHERE Complaint_ID = ?
+                        ''', (item.get('taxonomy_version'), item.get('prompt_version'), item.get('model_name'),
+                              complaint_id))
+                        
+                        # Geçerli kategori aldıysa kuyruktan çıkar, almadıysa tekrar kuyruğa koy
+                        if category and str(category).strip() and category != 'NULL':
+                            cursor.execute('DELETE FROM analysis_queue WHERE Complaint_ID = ?', (complaint_id,))
+                        else:
+                            cursor.execute('''
+                                INSERT OR IGNORE INTO analysis_queue (Complaint_ID, date)
+                                SELECT Complaint_ID, date FROM complaints WHERE Complaint_ID = ?
+                            ''', (complaint_id,))
+                        
                         successful_updates += 1
                         
                     except sqlite3.IntegrityError as e:
@@ -170,39 +918,292 @@ class DatabaseManager:
         except Exception as e:
             raise
     
-    def get_final_analysis_stats_for_complaints(self, complaint_ids: List[int]) -> Dict[str, Dict[str, int]]:
-        """Belirli şikayetlerin analiz dağılımını getir (Category ve Reason)"""
+    def _stale_analysis_filter(self, versions: Dict, scope: str = 'all', categories: List[str] = None,
+                               include_legacy: bool = False) -> Tuple[str, List]:
+        """Güncel versiyondan eski analiz satırları için WHERE koşulu (a = analysis_codes)"""
+        if scope not in STALE_SCOPES:
+            raise ValueError(f"Bilinmeyen kapsam: {scope} ({', '.join(STALE_SCOPES)})")
+        
+        stale = []
+        params = []
+        if scope in ('all', 'taxonomy'):
+            stale.append('a.taxonomy_version != ?')
+            params.append(versions['taxonomy_version'])
+        if scope in ('all', 'prompt'):
+            # Yerel sınıflandırıcı satırlarında prompt_version NULL - prompt değişikliği onları etkilemez
+            stale.append('a.prompt_version != ?')
+            params.append(versions['prompt_version'])
+        if scope in ('all', 'model'):
+            # Yerel sınıflandırıcı model değişikliğinden etkilenmez; yedek tahminler her zaman eskimiştir
+            stale.append('a.model_name NOT IN (?, ?)')
+            params.extend([versions['model_name'], versions['local_model']])
+        if include_legacy:
+            stale.append('a.taxonomy_version IS NULL')
+        
+        conditions = ['a.Category_Code IS NOT NULL', f"({' OR '.join(stale)})"]
+        if categories:
+            placeholders = ','.join(['?' for _ in categories])
+            conditions.append(
+                f'a.Category_Code IN (SELECT Category_Code FROM category_dim WHERE Name IN ({placeholders}))')
+            params.extend(categories)
+        return ' AND '.join(conditions), params
+    
+    def get_stale_analyses(self, versions: Dict, scope: str = 'all', categories: List[str] = None,
+                           include_legacy: bool = False, limit: int = 100, before: Tuple = None) -> List[Dict]:
+        """
+        Eskimiş analiz satırları, şikayet metni ve mevcut etiketle - yeniden eskiye, (date, ID) keyset
+        Sadece sıcak veritabanı: arşivlenmiş analizler damgalarıyla olduğu gibi kalır
+        """
+        conditions, params = self._stale_analysis_filter(versions, scope, categories, include_legacy)
+        if before:
+            conditions += ' AND (c.date, c.Complaint_ID) < (?, ?)'
+            params.extend(before)
+        
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                SELECT c.Complaint_ID, comment_body(c.full_comment, c.full_comment_z, c.body_dict_id), c.ref_url,
+                       c.title, c.date, cd.Name, rd.Name
+                FROM analysis_codes a
+                JOIN complaints c ON c.Complaint_ID = a.Complaint_ID
+                LEFT JOIN category_dim cd ON cd.Category_Code = a.Category_Code
+                LEFT JOIN reason_dim rd ON rd.Reason_Code = a.Reason_Code
+                WHERE {conditions}
+                ORDER BY c.date DESC, c.Complaint_ID DESC
+                LIMIT ?
+            ''', params + [limit])
+            columns = ['Complaint_ID', 'full_comment', 'ref_url', 'title', 'date', 'Category', 'Reason']
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+    
+    def count_stale_analyses(self, versions: Dict, scope: str = 'all', categories: List[str] = None,
+                             include_legacy: bool = False) -> int:
+        """Yeniden sınıflandırılacak satır sayısı"""
+        conditions, params = self._stale_analysis_filter(versions, scope, categories, include_legacy)
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'SELECT COUNT(*) FROM analysis_codes a WHERE {conditions}', params)
+            return cursor.fetchone()[0]
+    
+    def get_analysis_versions(self) -> List[Dict]:
+        """Analiz satırlarının versiyon dağılımı, arşivler dahil (NULL damga = versiyon takibinden önceki kayıt)"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
+                query = '''
+                    SELECT taxonomy_version, prompt_version, model_name, COUNT(*)
+                    FROM {schema}.analysis_codes
+                    GROUP BY taxonomy_version, prompt_version, model_name
+                '''
+                counts = Counter()
+                cursor.execute(query.format(schema='main'))
+                counts.update({row[:3]: row[3] for row in cursor.fetchall()})
+                for partition in self._archive_partitions(cursor):
+                    with self._attached(conn, partition):
+                        cursor.execute(query.format(schema='cold'))
+                        counts.update({row[:3]: row[3] for row in cursor.fetchall()})
                 
-                placeholders = ','.join(['?' for _ in complaint_ids])
+                columns = ['taxonomy_version', 'prompt_version', 'model_name', 'count']
+                return [dict(zip(columns, key + (count,))) for key, count in counts.most_common()]
+                
+        except Exception as e:
+            return []
+    
+    def _init_analysis_tables(self, cursor):
+        """Kategori/sebep boyut tablolarını, kodlu analiz tablosunu ve Analysis view'ını oluştur"""
+        # Boyut tabloları: sabit sözlükler küçük tamsayı kodlarla
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS category_dim (
+                Category_Code INTEGER PRIMARY KEY,
+                Name TEXT UNIQUE NOT NULL
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS reason_dim (
+                Reason_Code INTEGER PRIMARY KEY,
+                Name TEXT UNIQUE NOT NULL
+            )
+        ''')
+        cursor.executemany('INSERT OR IGNORE INTO category_dim (Name) VALUES (?)', [(c,) for c in Config.CATEGORIES])
+        cursor.executemany('INSERT OR IGNORE INTO reason_dim (Name) VALUES (?)', [(r,) for r in Config.REASONS])
+        
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS analysis_codes (
+                ID INTEGER PRIMARY KEY AUTOINCREMENT,
+                Complaint_ID INTEGER UNIQUE NOT NULL,
+                Category_Code INTEGER REFERENCES category_dim (Category_Code),
+                Reason_Code INTEGER REFERENCES reason_dim (Reason_Code),
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                taxonomy_version TEXT,
+                prompt_version TEXT,
+                model_name TEXT,
+                FOREIGN KEY (Complaint_ID) REFERENCES complaints (Complaint_ID) ON DELETE CASCADE
+            )
+        ''')
+        
+        # Versiyon damgası: hangi kategori/sebep listesi, prompt ve model ile sınıflandırıldı (NULL = eski kayıt)
+        cursor.execute('PRAGMA table_info(analysis_codes)')
+        analysis_columns = {row[1] for row in cursor.fetchall()}
+        for column in ('taxonomy_version', 'prompt_version', 'model_name'):
+            if column not in analysis_columns:
+                cursor.execute(f'ALTER TABLE analysis_codes ADD COLUMN {column} TEXT')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_analysis_codes_version
+            ON analysis_codes (taxonomy_version, prompt_version, model_name)
+        ''')
+        
+        # Eski şema: metin kolonlu Analysis tablosunu kodlu tabloya taşı
+        cursor.execute("SELECT type FROM sqlite_master WHERE name = 'Analysis'")
+        row = cursor.fetchone()
+        if row and row[0] == 'table':
+            cursor.execute('''
+                INSERT OR IGNORE INTO category_dim (Name)
+                SELECT DISTINCT Category FROM Analysis WHERE Category IS NOT NULL
+            ''')
+            cursor.execute('''
+                INSERT OR IGNORE INTO reason_dim (Name)
+                SELECT DISTINCT Reason FROM Analysis WHERE Reason IS NOT NULL
+            ''')
+            cursor.execute('''
+                INSERT INTO analysis_codes (ID, Complaint_ID, Category_Code, Reason_Code, created_at)
+                SELECT a.ID, a.Complaint_ID, cd.Category_Code, rd.Reason_Code, a.created_at
+                FROM Analysis a
+                LEFT JOIN category_dim cd ON cd.Name = a.Category
+                LEFT JOIN reason_dim rd ON rd.Name = a.Reason
+            ''')
+            cursor.execute('DROP TABLE Analysis')
+        
+        # Analysis view: mevcut sorgular aynı kolonları (Category, Reason metin) görmeye devam eder
+        cursor.execute('''
+            CREATE VIEW IF NOT EXISTS Analysis AS
+            SELECT a.ID, a.Complaint_ID, cd.Name AS Category, rd.Name AS Reason, a.created_at
+            FROM analysis_codes a
+            LEFT JOIN category_dim cd ON cd.Category_Code = a.Category_Code
+            LEFT JOIN reason_dim rd ON rd.Reason_Code = a.Reason_Code
+        ''')
+        
+        # View'a yazmalar kodlu tabloya çevrilir (sözlükte olmayan değer yeni kod alır)
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS analysis_view_insert INSTEAD OF INSERT ON Analysis BEGIN
+                INSERT OR IGNORE INTO category_dim (Name) SELECT new.Category WHERE new.Category IS NOT NULL;
+                INSERT OR IGNORE INTO reason_dim (Name) SELECT new.Reason WHERE new.Reason IS NOT NULL;
+                INSERT INTO analysis_codes (Complaint_ID, Category_Code, Reason_Code, created_at)
+                VALUES (
+                    new.Complaint_ID,
+                    (SELECT Category_Code FROM category_dim WHERE Name = new.Category),
+                    (SELECT Reason_Code FROM reason_dim WHERE Name = new.Reason),
+                    COALESCE(new.created_at, CURRENT_TIMESTAMP)
+                );
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS analysis_view_update INSTEAD OF UPDATE ON Analysis BEGIN
+                INSERT OR IGNORE INTO category_dim (Name) SELECT new.Category WHERE new.Category IS NOT NULL;
+                INSERT OR IGNORE INTO reason_dim (Name) SELECT new.Reason WHERE new.Reason IS NOT NULL;
+                UPDATE analysis_codes
+                SET Category_Code = (SELECT Category_Code FROM category_dim WHERE Name = new.Category),
+                    Reason_Code = (SELECT Reason_Code FROM reason_dim WHERE Name = new.Reason),
+                    created_at = new.created_at
+                WHERE ID = old.ID;
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS analysis_view_delete INSTEAD OF DELETE ON Analysis BEGIN
+                DELETE FROM analysis_codes WHERE ID = old.ID;
+            END
+        ''')
+    
+    def _bump_rollup(self, cursor, day: str, category: Optional[str], reason: Optional[str], delta: int):
+        """Günlük özet tablodaki (gün, kategori, sebep) sayacını delta kadar değiştir"""
+        cursor.execute('''
+            INSERT INTO analysis_daily_rollup (day, Category, Reason, count)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT (day, Category, Reason) DO UPDATE SET count = count + excluded.count
+        ''', (day, category or '', reason or '', delta))
+        
+        if delta < 0:
+            cursor.execute('''
+                DELETE FROM analysis_daily_rollup
+                WHERE day = ? AND Category = ? AND Reason = ? AND count <= 0
+            ''', (day, category or '', reason or ''))
+    
+    def _rebuild_rollup(self, cursor, archived_counts: List[Tuple] = None):
+        """Günlük özet tabloyu Analysis tablosundan (ve verilirse arşiv sayımlarından) baştan hesapla"""
+        cursor.execute('DELETE FROM analysis_daily_rollup')
+        cursor.execute('''
+            INSERT INTO analysis_daily_rollup (day, Category, Reason, count)
+            SELECT COALESCE(date(c.date), ''), COALESCE(a.Category, ''), COALESCE(a.Reason, ''), COUNT(*)
+            FROM Analysis a
+            JOIN complaints c ON c.Complaint_ID = a.Complaint_ID
+            GROUP BY 1, 2, 3
+        ''')
+        if archived_counts:
+            cursor.executemany('''
+                INSERT INTO analysis_daily_rollup (day, Category, Reason, count)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (day, Category, Reason) DO UPDATE SET count = count + excluded.count
+            ''', archived_counts)
+    
+    def _archived_rollup_counts(self, conn) -> List[Tuple]:
+        """Arşiv partition'larındaki analizlerin (gün, kategori, sebep) sayımları"""
+        cursor = conn.cursor()
+        counts = []
+        for partition in self._archive_partitions(cursor):
+            with self._attached(conn, partition):
+                cursor.execute('''
+                    SELECT COALESCE(date(c.date), ''), COALESCE(cd.Name, ''), COALESCE(rd.Name, ''), COUNT(*)
+                    FROM cold.analysis_codes a
+                    JOIN cold.complaints c ON c.Complaint_ID = a.Complaint_ID
+                    LEFT JOIN main.category_dim cd ON cd.Category_Code = a.Category_Code
+                    LEFT JOIN main.reason_dim rd ON rd.Reason_Code = a.Reason_Code
+                    GROUP BY 1, 2, 3
+                ''')
+                counts.extend(cursor.fetchall())
+        return counts
+    
+    def rebuild_analysis_rollup(self) -> int:
+        """Günlük özet tabloyu sıcak veritabanı ve arşiv partition'larından yeniden oluştur"""
+        with self._connect() as conn:
+            # ATTACH transaction içinde yapılamaz - arşiv sayımları yazmadan önce okunur
+            archived_counts = self._archived_rollup_counts(conn)
+            cursor = conn.cursor()
+            self._rebuild_rollup(cursor, archived_counts)
+            cursor.execute('SELECT COUNT(*) FROM analysis_daily_rollup')
+            return cursor.fetchone()[0]
+    
+    def get_analysis_stats_for_date_range(self, start_date: str, end_date: str) -> Dict[str, Dict[str, int]]:
+        """Tarih aralığının analiz dağılımını günlük özet tablodan getir (Category ve Reason)"""
+        try:
+            with self._connect() as conn:
+                cursor = conn.cursor()
+                # İki dağılım aynı okuma transaction'ında - araya giren yazma sayıları kaydırmaz
+                cursor.execute('BEGIN')
                 
                 # Category dağılımı
-                cursor.execute(f'''
-                    SELECT a.Category, COUNT(*) as count
-                    FROM Analysis a
-                    WHERE a.Complaint_ID IN ({placeholders}) 
-                    AND a.Category IS NOT NULL 
-                    AND TRIM(a.Category) != ''
-                    GROUP BY a.Category
-                    ORDER BY count DESC
-                ''', complaint_ids)
+                cursor.execute('''
+                    SELECT Category, SUM(count) as total
+                    FROM analysis_daily_rollup
+                    WHERE day >= ? AND day <= ?
+                    AND TRIM(Category) != ''
+                    GROUP BY Category
+                    HAVING total > 0
+                    ORDER BY total DESC
+                ''', (start_date, end_date))
                 
                 category_stats = dict(cursor.fetchall())
                 
                 # Reason dağılımı
-                cursor.execute(f'''
-                    SELECT a.Reason, COUNT(*) as count
-                    FROM Analysis a
-                    WHERE a.Complaint_ID IN ({placeholders}) 
-                    AND a.Reason IS NOT NULL 
-                    AND TRIM(a.Reason) != ''
-                    GROUP BY a.Reason
-                    ORDER BY count DESC
-                ''', complaint_ids)
+                cursor.execute('''
+                    SELECT Reason, SUM(count) as total
+                    FROM analysis_daily_rollup
+                    WHERE day >= ? AND day <= ?
+                    AND TRIM(Reason) != ''
+                    GROUP BY Reason
+                    HAVING total > 0
+                    ORDER BY total DESC
+                ''', (start_date, end_date))
                 
                 reason_stats = dict(cursor.fetchall())
+                conn.commit()
                 
                 return {
                     "categories": category_stats,
@@ -212,14 +1213,430 @@ class DatabaseManager:
         except Exception as e:
             return {"categories": {}, "reasons": {}}
     
+    def get_final_analysis_stats_for_complaints(self, complaint_ids: List[int]) -> Dict[str, Dict[str, int]]:
+        """Belirli şikayetlerin analiz dağılımını getir (Category ve Reason, arşivdekiler dahil)"""
+        try:
+            with self._connect() as conn:
+                cursor = conn.cursor()
+                
+                category_stats = Counter()
+                reason_stats = Counter()
+                
+                # Sıcak veritabanındaki iki dağılım aynı okuma transaction'ında (ATTACH transaction dışında yapılır)
+                cursor.execute('BEGIN')
+                category_stats.update(self._code_distribution(cursor, 'main', 'category_dim', 'Category_Code', complaint_ids))
+                reason_stats.update(self._code_distribution(cursor, 'main', 'reason_dim', 'Reason_Code', complaint_ids))
+                conn.commit()
+                
+                for partition in self._archive_partitions(cursor, complaint_ids=complaint_ids):
+                    with self._attached(conn, partition):
+                        category_stats.update(self._code_distribution(cursor, 'cold', 'category_dim', 'Category_Code', complaint_ids))
+                        reason_stats.update(self._code_distribution(cursor, 'cold', 'reason_dim', 'Reason_Code', complaint_ids))
+                
+                return {
+                    "categories": dict(category_stats.most_common()),
+                    "reasons": dict(reason_stats.most_common())
+                }
+                
+        except Exception as e:
+            return {"categories": {}, "reasons": {}}
+    
+    def _code_distribution(self, cursor, schema: str, dim_table: str, code_column: str,
+                           complaint_ids: List[int]) -> Dict[str, int]:
+        """Tek partition'da önce tamsayı kod üzerinden grupla, sonra isme çevir"""
+        placeholders = ','.join(['?' for _ in complaint_ids])
+        cursor.execute(f'''
+            SELECT d.Name, g.count
+            FROM (
+                SELECT {code_column}, COUNT(*) as count
+                FROM {schema}.analysis_codes
+                WHERE Complaint_ID IN ({placeholders})
+                GROUP BY {code_column}
+            ) g
+            JOIN main.{dim_table} d ON d.{code_column} = g.{code_column}
+            WHERE TRIM(d.Name) != ''
+        ''', complaint_ids)
+        return dict(cursor.fetchall())
+    
+    def _analytics_engine(self):
+        """DuckDB analitik motorunu ilk kullanımda oluştur (duckdb opsiyonel)"""
+        if self._analytics is None:
+            from utils.analytics_engine import AnalyticsEngine
+            self._analytics = AnalyticsEngine(self.db_path, parquet_dir=Config.ANALYTICS_PARQUET_DIR)
+        return self._analytics
+    
+    def get_time_bucketed_counts(self, start_date: str, end_date: str, bucket: str = 'week',
+                                 dimension: str = 'category') -> Dict[str, Dict[str, int]]:
+        """Periyot bazlı kategori/sebep dağılımı (ör. son 6 ayın haftalık kategori trendi)"""
+        try:
+            return self._analytics_engine().time_bucketed_counts(start_date, end_date, bucket, dimension)
+        except Exception as e:
+            return {}
+    
+    def get_category_reason_crosstab(self, start_date: str, end_date: str) -> Dict[str, Dict[str, int]]:
+        """Kategori x sebep matrisi"""
+        try:
+            return self._analytics_engine().cross_tab(start_date, end_date)
+        except Exception as e:
+            return {}
+    
+    def get_top_k_per_period(self, start_date: str, end_date: str, bucket: str = 'month',
+                             k: int = 5, dimension: str = 'category') -> Dict[str, Dict[str, int]]:
+        """Her periyodun en çok şikayet alan k kategorisi/sebebi"""
+        try:
+            return self._analytics_engine().top_k_per_period(start_date, end_date, bucket, k, dimension)
+        except Exception as e:
+            return {}
+    
+    def get_llm_cache_entries(self, cache_keys: List[str]) -> Dict[str, Dict]:
+        """Önbellekteki sınıflandırmaları getir, bulunanların kullanım zamanını tazele"""
+        if not cache_keys:
+            return {}
+        
+        try:
+            with self._connect() as conn:
+                cursor = conn.cursor()
+                placeholders = ','.join(['?' for _ in cache_keys])
+                cursor.execute(f'''
+                    SELECT cache_key, Category, Reason FROM llm_cache
+                    WHERE cache_key IN ({placeholders})
+                ''', cache_keys)
+                entries = {row[0]: {"category": row[1], "reason": row[2]} for row in cursor.fetchall()}
+                
+                if entries and not self.read_only:
+                    found = list(entries)
+                    cursor.execute(f'''
+                        UPDATE llm_cache SET last_used_at = CURRENT_TIMESTAMP
+                        WHERE cache_key IN ({','.join(['?' for _ in found])})
+                    ''', found)
+                    conn.commit()
+                
+                return entries
+                
+        except Exception as e:
+            return {}
+    
+    def put_llm_cache_entries(self, entries: List[Dict], max_entries: int) -> int:
+        """Sınıflandırmaları önbelleğe yaz, boyut sınırı aşılırsa en uzun süre kullanılmayanları at"""
+        if not entries:
+            return 0
+        
+        try:
+            with self._connect() as conn:
+                cursor = conn.cursor()
+                cursor.executemany('''
+                    INSERT INTO llm_cache (cache_key, Category, Reason)
+                    VALUES (?, ?, ?)
+                    ON CONFLICT (cache_key) DO UPDATE SET
+                        Category = excluded.Category,
+                        Reason = excluded.Reason,
+                        last_used_at = CURRENT_TIMESTAMP
+                ''', [(e["cache_key"], e["category"], e["reason"]) for e in entries])
+                
+                cursor.execute('SELECT COUNT(*) FROM llm_cache')
+                overflow = cursor.fetchone()[0] - max_entries
+                if overflow > 0:
+                    cursor.execute('''
+                        DELETE FROM llm_cache WHERE cache_key IN (
+                            SELECT cache_key FROM llm_cache ORDER BY last_used_at, rowid LIMIT ?
+                        )
+                    ''', (overflow,))
+                
+                conn.commit()
+                return len(entries)
+                
+        except Exception as e:
+            return 0
+    
+    def get_llm_cache_size(self) -> int:
+        """Önbellekteki kayıt sayısı"""
+        try:
+            with self._connect() as conn:
+                cursor = conn.cursor()
+                cursor.execute('SELECT COUNT(*) FROM llm_cache')
+                return cursor.fetchone()[0]
+                
+        except Exception as e:
+            return 0
+    
+    def insert_llm_calls(self, calls: List[Dict]):
+        """Biriken LLM çağrı ölçümlerini tek transaction'da yaz"""
+        with self._connect() as conn:
+            conn.executemany('''
+                INSERT INTO llm_calls (call_site, model_name, started_at, latency_ms, first_chunk_ms,
+                                       prompt_tokens, response_tokens, attempt, error)
+                VALUES (:call_site, :model_name, :started_at, :latency_ms, :first_chunk_ms,
+                        :prompt_tokens, :response_tokens, :attempt, :error)
+            ''', calls)
+    
+    def get_llm_cost_report(self, start_date: str, end_date: str) -> List[Dict]:
+        """Gün ve çağrı yeri bazında çağrı, hata, token ve gecikme toplamları"""
+        try:
+            with self._connect() as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    SELECT date(started_at) AS day, call_site, model_name,
+                           COUNT(*), SUM(error IS NOT NULL), SUM(attempt > 0),
+                           SUM(prompt_tokens), SUM(response_tokens), AVG(latency_ms), MAX(latency_ms)
+                    FROM llm_calls
+                    WHERE started_at >= ? AND started_at < date(?, '+1 day')
+                    GROUP BY day, call_site, model_name
+                    ORDER BY day, call_site
+                ''', (start_date, end_date))
+                columns = ['day', 'call_site', 'model_name', 'calls', 'errors', 'retries',
+                           'prompt_tokens', 'response_tokens', 'latency_ms_avg', 'latency_ms_max']
+                return [dict(zip(columns, row)) for row in cursor.fetchall()]
+                
+        except Exception as e:
+            return []
+    
+    def get_pending_analysis_ids(self, start_date: str = None, end_date: str = None, limit: int = None) -> List[int]:
+        """Kuyrukta bekleyen (kiralanmamış) şikayet ID'leri, en yeni önce"""
+        try:
+            with self._connect() as conn:
+                cursor = conn.cursor()
+                where = ["status = 'pending'"]
+                params = []
+                if start_date:
+                    where.append("date >= ?")
+                    params.append(start_date)
+                if end_date:
+                    where.append("date < date(?, '+1 day')")
+                    params.append(end_date)
+                cursor.execute(f'''
+                    SELECT Complaint_ID FROM analysis_queue
+                    WHERE {' AND '.join(where)}
+                    ORDER BY date DESC
+                    LIMIT ?
+                ''', params + [limit if limit else -1])
+                return [row[0] for row in cursor.fetchall()]
+                
+        except Exception as e:
+            return []
+    
+    def create_bulk_job(self, start_date: str = None, end_date: str = None, max_complaints: int = None) -> int:
+        """Yeni toplu sınıflandırma işi ('preparing')"""
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                'INSERT INTO bulk_jobs (start_date, end_date, max_complaints) VALUES (?, ?, ?)',
+                (start_date, end_date, max_complaints)
+            )
+            return cursor.lastrowid
+    
+    def add_bulk_job_batch(self, job_id: int, requests: List[List[int]]) -> int:
+        """İşe sağlayıcıya gönderilecek bir parça ekle (her eleman bir prompt'un Complaint_ID listesi)"""
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                'INSERT INTO bulk_job_batches (Job_ID, requests) VALUES (?, ?)',
+                (job_id, json.dumps(requests))
+            )
+            cursor.execute(
+                'UPDATE bulk_jobs SET total = total + ? WHERE Job_ID = ?',
+                (sum(len(ids) for ids in requests), job_id)
+            )
+            return cursor.lastrowid
+    
+    def update_bulk_job(self, job_id: int, status: str = None, classified: int = 0, released: int = 0,
+                        total: int = 0, error: str = None):
+        """İş sayaçlarını artır, durumu güncelle"""
+        with self._connect() as conn:
+            conn.execute('''
+                UPDATE bulk_jobs
+                SET status = COALESCE(?, status),
+                    classified = classified + ?, released = released + ?, total = total + ?,
+                    error = COALESCE(?, error),
+                    completed_at = CASE WHEN ? IN ('completed', 'failed') THEN CURRENT_TIMESTAMP ELSE completed_at END
+                WHERE Job_ID = ?
+            ''', (status, classified, released, total, error, status, job_id))
+    
+    def update_bulk_job_batch(self, batch_id: int, status: str, provider_job: str = None,
+                              requests: List[List[int]] = None, error: str = None):
+        """Parça durumunu güncelle (submitted / ingested / failed)"""
+        with self._connect() as conn:
+            conn.execute('''
+                UPDATE bulk_job_batches
+                SET status = ?,
+                    provider_job = COALESCE(?, provider_job),
+                    requests = COALESCE(?, requests),
+                    error = ?,
+                    submitted_at = CASE WHEN ? = 'submitted' THEN CURRENT_TIMESTAMP ELSE submitted_at END,
+                    completed_at = CASE WHEN ? IN ('ingested', 'failed') THEN CURRENT_TIMESTAMP ELSE completed_at END
+                WHERE Batch_ID = ?
+            ''', (status, provider_job, json.dumps(requests) if requests is not None else None, error,
+                  status, status, batch_id))
+    
+    def get_bulk_job_batches(self, statuses: List[str], job_id: int = None) -> List[Dict]:
+        """Durumu verilen parçalar (yeniden başlatmada kalınan yerden devam için)"""
+        try:
+            with self._connect() as conn:
+                cursor = conn.cursor()
+                params = list(statuses)
+                job_filter = ''
+                if job_id is not None:
+                    job_filter = 'AND Job_ID = ?'
+                    params.append(job_id)
+                cursor.execute(f'''
+                    SELECT Batch_ID, Job_ID, status, provider_job, requests, submitted_at
+                    FROM bulk_job_batches
+                    WHERE status IN ({','.join(['?' for _ in statuses])}) {job_filter}
+                    ORDER BY Batch_ID
+                ''', params)
+                columns = ['Batch_ID', 'Job_ID', 'status', 'provider_job', 'requests', 'submitted_at']
+                batches = [dict(zip(columns, row)) for row in cursor.fetchall()]
+                for batch in batches:
+                    batch['requests'] = json.loads(batch['requests'])
+                return batches
+                
+        except Exception as e:
+            return []
+    
+    def finish_bulk_jobs(self) -> int:
+        """Bekleyen parçası kalmayan 'running' işleri tamamla"""
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                UPDATE bulk_jobs
+                SET status = 'completed', completed_at = CURRENT_TIMESTAMP
+                WHERE status = 'running'
+                AND NOT EXISTS (
+                    SELECT 1 FROM bulk_job_batches b
+                    WHERE b.Job_ID = bulk_jobs.Job_ID AND b.status IN ('pending', 'submitted')
+                )
+            ''')
+            return cursor.rowcount
+    
+    def get_bulk_jobs(self, job_id: int = None, limit: int = 20) -> List[Dict]:
+        """Toplu işler ve parça durumlarının dağılımı"""
+        try:
+            with self._connect() as conn:
+                cursor = conn.cursor()
+                params = [job_id] if job_id is not None else []
+                cursor.execute(f'''
+                    SELECT Job_ID, status, start_date, end_date, max_complaints, total, classified, released,
+                           created_at, completed_at, error
+                    FROM bulk_jobs
+                    {'WHERE Job_ID = ?' if job_id is not None else ''}
+                    ORDER BY Job_ID DESC
+                    LIMIT ?
+                ''', params + [limit])
+                columns = ['Job_ID', 'status', 'start_date', 'end_date', 'max_complaints', 'total', 'classified',
+                           'released', 'created_at', 'completed_at', 'error']
+                jobs = [dict(zip(columns, row)) for row in cursor.fetchall()]
+                
+                for job in jobs:
+                    cursor.execute(
+                        'SELECT status, COUNT(*) FROM bulk_job_batches WHERE Job_ID = ? GROUP BY status',
+                        (job['Job_ID'],)
+                    )
+                    job['batches'] = dict(cursor.fetchall())
+                return jobs
+                
+        except Exception as e:
+            return []
+    
+    def get_export_watermark(self, name: str) -> int:
+        """Export için son aktarılan analiz ID'sini getir"""
+        try:
+            with self._connect() as conn:
+                cursor = conn.cursor()
+                cursor.execute('SELECT last_id FROM export_watermarks WHERE name = ?', (name,))
+                row = cursor.fetchone()
+                return row[0] if row else 0
+                
+        except Exception as e:
+            return 0
+    
+    def set_export_watermark(self, name: str, last_id: int):
+        """Export watermark'ını güncelle"""
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT INTO export_watermarks (name, last_id, updated_at)
+                VALUES (?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT (name) DO UPDATE SET last_id = excluded.last_id, updated_at = excluded.updated_at
+            ''', (name, last_id))
+    
+    def iter_analyzed_complaints_since(self, last_id: int, chunk_size: int = 5000):
+        """Analiz ID'si last_id'den büyük şikayetleri (analiz ile birlikte) parça parça üret"""
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT a.ID, c.Complaint_ID, c.ref_url, c.title,
+                       comment_body(c.full_comment, c.full_comment_z, c.body_dict_id), c.date,
+                       a.Category, a.Reason, a.created_at
+                FROM Analysis a
+                JOIN complaints c ON c.Complaint_ID = a.Complaint_ID
+                WHERE a.ID > ?
+                ORDER BY a.ID
+            ''', (last_id,))
+            
+            columns = ['Analysis_ID', 'Complaint_ID', 'ref_url', 'title', 'full_comment', 'date',
+                       'Category', 'Reason', 'analyzed_at']
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield [dict(zip(columns, row)) for row in rows]
+    
+    def iter_analyzed_complaints(self, start_date: str, end_date: str, include_body: bool = True,
+                                 chunk_size: int = 1000):
+        """Tarih aralığındaki analizli şikayetleri liste kurmadan parça parça (tuple) üret - sıra EXPORT_COLUMNS"""
+        # Bağlantı generator'a ait; istemci yarıda koparsa finally ile kapanır
+        conn = self._connect()
+        try:
+            cursor = conn.cursor()
+            body_column = 'comment_body(c.full_comment, c.full_comment_z, c.body_dict_id)' if include_body else 'NULL'
+            query = f'''
+                SELECT c.Complaint_ID, c.ref_url, c.title, c.date, cd.Name, rd.Name, {body_column}
+                FROM {{schema}}.complaints c
+                JOIN {{schema}}.analysis_codes a ON a.Complaint_ID = c.Complaint_ID
+                LEFT JOIN main.category_dim cd ON cd.Category_Code = a.Category_Code
+                LEFT JOIN main.reason_dim rd ON rd.Reason_Code = a.Reason_Code
+                WHERE c.date >= ? AND c.date < date(?, '+1 day')
+                ORDER BY c.date
+            '''
+            partitions = self._archive_partitions(cursor, start_date=start_date, end_date=end_date)
+            
+            # Önce arşiv (eskiden yeniye), sonra sıcak veritabanı
+            for partition in reversed(partitions):
+                with self._attached(conn, partition):
+                    cold_cursor = conn.cursor()
+                    try:
+                        cold_cursor.execute(query.format(schema='cold'), (start_date, end_date))
+                        while True:
+                            rows = cold_cursor.fetchmany(chunk_size)
+                            if not rows:
+                                break
+                            yield rows
+                    finally:
+                        # Açık statement DETACH'ı engellemesin
+                        cold_cursor.close()
+            
+            cursor.execute(query.format(schema='main'), (start_date, end_date))
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            conn.close()
+    
     def get_all_ref_urls(self) -> set:
         """TÜM ref_url'leri al (tam karşılaştırma için)"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
                 cursor.execute('SELECT ref_url FROM complaints')
                 
                 ref_urls = set(row[0] for row in cursor.fetchall())
+                
+                for partition in self._archive_partitions(cursor):
+                    with self._attached(conn, partition):
+                        cursor.execute('SELECT ref_url FROM cold.complaints')
+                        ref_urls.update(row[0] for row in cursor.fetchall())
+                
                 return ref_urls
                 
         except Exception as e:
@@ -234,8 +1651,9 @@ class DatabaseManager:
             new_count = 0
             duplicate_count = 0
             new_complaint_ids = []
+            minhash_items = []
             
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
                 
                 for complaint in complaints:
@@ -262,6 +1680,11 @@ class DatabaseManager:
                     
                     new_complaint_ids.append(cursor.lastrowid)
                     new_count += 1
+                    minhash_items.append((cursor.lastrowid, f"{complaint.get('title') or ''} {complaint.get('full_comment') or ''}"))
+                
+                # Yakın kopya indeksi ekleme ile aynı transaction'da güncellenir
+                if Config.NEAR_DUPLICATE_ENABLED:
+                    self._index_minhash(cursor, minhash_items)
                 
                 conn.commit()
                 
@@ -280,18 +1703,170 @@ class DatabaseManager:
                 'duplicate_count': 0
             }
 
+    def _index_minhash(self, cursor, items: List[Tuple[int, str]]):
+        """Şikayetlerin MinHash imzasını ve LSH kovalarını yaz"""
+        signatures = []
+        bands = []
+        for complaint_id, text in items:
+            signature = self.minhasher.signature(text)
+            if not signature:
+                # Boş metinler birbirinin kopyası sayılmasın
+                continue
+            signatures.append((complaint_id, self.minhasher.pack(signature)))
+            bands.extend((band, bucket, complaint_id) for band, bucket in self.minhasher.band_buckets(signature))
+        
+        cursor.executemany('INSERT OR REPLACE INTO minhash_signatures (Complaint_ID, signature) VALUES (?, ?)', signatures)
+        cursor.executemany('INSERT OR IGNORE INTO minhash_bands (band, bucket, Complaint_ID) VALUES (?, ?, ?)', bands)
+    
+    def find_near_duplicate_pairs(self, complaint_ids: List[int], threshold: float) -> List[Tuple[int, int]]:
+        """Verilen şikayetler arasında tahmini Jaccard benzerliği threshold üstündeki çiftler"""
+        if len(complaint_ids) < 2:
+            return []
+        
+        try:
+            with self._connect() as conn:
+                cursor = conn.cursor()
+                cursor.execute('CREATE TEMP TABLE IF NOT EXISTS near_dup_ids (Complaint_ID INTEGER PRIMARY KEY)')
+                cursor.execute('DELETE FROM temp.near_dup_ids')
+                cursor.executemany('INSERT OR IGNORE INTO temp.near_dup_ids VALUES (?)', [(i,) for i in complaint_ids])
+                
+                # Özellik öncesi eklenmiş şikayetlerin imzası ilk ihtiyaçta hesaplanır
+                cursor.execute('''
+                    SELECT c.Complaint_ID, c.title, comment_body(c.full_comment, c.full_comment_z, c.body_dict_id)
+                    FROM temp.near_dup_ids t
+                    JOIN complaints c ON c.Complaint_ID = t.Complaint_ID
+                    LEFT JOIN minhash_signatures s ON s.Complaint_ID = t.Complaint_ID
+                    WHERE s.Complaint_ID IS NULL
+                ''')
+                missing = [(row[0], f"{row[1] or ''} {row[2] or ''}") for row in cursor.fetchall()]
+                if missing and not self.read_only:
+                    self._index_minhash(cursor, missing)
+                    conn.commit()
+                
+                # Herhangi bir bantta aynı kovaya düşen çiftler aday
+                cursor.execute('''
+                    SELECT DISTINCT a.Complaint_ID, b.Complaint_ID
+                    FROM minhash_bands a
+                    JOIN temp.near_dup_ids ta ON ta.Complaint_ID = a.Complaint_ID
+                    JOIN minhash_bands b ON b.band = a.band AND b.bucket = a.bucket AND b.Complaint_ID > a.Complaint_ID
+                    JOIN temp.near_dup_ids tb ON tb.Complaint_ID = b.Complaint_ID
+                ''')
+                candidates = cursor.fetchall()
+                if not candidates:
+                    return []
+                
+                cursor.execute('''
+                    SELECT s.Complaint_ID, s.signature
+                    FROM minhash_signatures s
+                    JOIN temp.near_dup_ids t ON t.Complaint_ID = s.Complaint_ID
+                ''')
+                signatures = {row[0]: self.minhasher.unpack(row[1]) for row in cursor.fetchall()}
+                
+                return [
+                    (first, second) for first, second in candidates
+                    if self.minhasher.similarity(signatures[first], signatures[second]) >= threshold
+                ]
+                
+        except Exception as e:
+            return []
+    
+    def compress_complaint_bodies(self, batch_size: int = 1000, train_sample_size: int = 2000,
+                                  min_train_samples: int = 200) -> Dict:
+        """Düz metin şikayetleri paylaşılan sözlükle sıkıştır (yeni kayıtlar için periyodik çalışır)"""
+        try:
+            with self._connect() as conn:
+                cursor = conn.cursor()
+                
+                # Aktif sözlük: en son eğitilen
+                cursor.execute('SELECT Dict_ID, codec, data FROM compression_dicts ORDER BY Dict_ID DESC LIMIT 1')
+                row = cursor.fetchone()
+                
+                if row is None:
+                    cursor.execute('''
+                        SELECT full_comment FROM complaints
+                        WHERE full_comment IS NOT NULL AND full_comment != ''
+                        ORDER BY RANDOM()
+                        LIMIT ?
+                    ''', (train_sample_size,))
+                    samples = [r[0] for r in cursor.fetchall()]
+                    
+                    # Sözlük eğitmek için yeterli örnek yok - sonraki çalıştırmada tekrar denenir
+                    if len(samples) < min_train_samples:
+                        return {"success": True, "compressed_count": 0, "message": "Sözlük için yeterli örnek yok"}
+                    
+                    codec, data = BodyCodec.train_dictionary(samples)
+                    cursor.execute(
+                        'INSERT INTO compression_dicts (codec, data, sample_count) VALUES (?, ?, ?)',
+                        (codec, data, len(samples))
+                    )
+                    row = (cursor.lastrowid, codec, data)
+                    conn.commit()
+                
+                dict_id, codec, data = row
+                if not self.body_codec.has_dictionary(dict_id):
+                    self.body_codec.register_dictionary(dict_id, codec, data)
+                
+                compressed_count = 0
+                raw_bytes = 0
+                compressed_bytes = 0
+                
+                while True:
+                    cursor.execute('''
+                        SELECT Complaint_ID, full_comment FROM complaints
+                        WHERE full_comment IS NOT NULL AND full_comment_z IS NULL
+                        LIMIT ?
+                    ''', (batch_size,))
+                    rows = cursor.fetchall()
+                    if not rows:
+                        break
+                    
+                    updates = []
+                    for complaint_id, body in rows:
+                        blob = self.body_codec.compress(body, dict_id)
+                        raw_bytes += len(body.encode('utf-8'))
+                        compressed_bytes += len(blob)
+                        updates.append((blob, dict_id, complaint_id))
+                    
+                    cursor.executemany('''
+                        UPDATE complaints
+                        SET full_comment_z = ?, body_dict_id = ?, full_comment = NULL
+                        WHERE Complaint_ID = ?
+                    ''', updates)
+                    conn.commit()
+                    compressed_count += len(updates)
+                
+                return {
+                    "success": True,
+                    "compressed_count": compressed_count,
+                    "codec": codec,
+                    "raw_bytes": raw_bytes,
+                    "compressed_bytes": compressed_bytes
+                }
+                
+        except Exception as e:
+            return {"success": False, "error": str(e), "compressed_count": 0}
+    
     def get_complaint_by_id(self, complaint_id: int) -> Optional[Dict]:
         """Belirli ID'ye göre şikayet getir"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
-                cursor.execute('''
-                    SELECT Complaint_ID, full_comment, ref_url, title, date
-                    FROM complaints
+                query = f'''
+                    SELECT Complaint_ID, {BODY_SQL}, ref_url, title, date
+                    FROM {{schema}}.complaints
                     WHERE Complaint_ID = ?
-                ''', (complaint_id,))
-                
+                '''
+                cursor.execute(query.format(schema='main'), (complaint_id,))
                 row = cursor.fetchone()
+                
+                if not row:
+                    for partition in self._archive_partitions(cursor, complaint_ids=[complaint_id]):
+                        with self._attached(conn, partition):
+                            cursor.execute(query.format(schema='cold'), (complaint_id,))
+                            row = cursor.fetchone()
+                        if row:
+                            break
+                
                 if row:
                     columns = ['Complaint_ID', 'full_comment', 'ref_url', 'title', 'date']
                     return dict(zip(columns, row))
@@ -304,15 +1879,24 @@ class DatabaseManager:
     def get_data_date_range(self) -> Dict[str, str]:
         """Database'deki en eski ve en yeni şikayet tarihlerini al"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
                 cursor.execute('''
                     SELECT MIN(date) as earliest, MAX(date) as latest
                     FROM complaints
                     WHERE date IS NOT NULL
                 ''')
-                
                 row = cursor.fetchone()
+                
+                # Arşiv partition'larının tarih sınırları katalogda
+                cursor.execute('SELECT MIN(min_date), MAX(max_date) FROM archive_partitions')
+                archive_row = cursor.fetchone()
+                if archive_row and archive_row[0]:
+                    row = (
+                        min(d for d in (row[0], archive_row[0]) if d),
+                        max(d for d in (row[1], archive_row[1]) if d)
+                    )
+                
                 if row and row[0] and row[1]:
                     return {
                         "earliest": row[0],
@@ -328,4 +1912,226 @@ class DatabaseManager:
             return {
                 "earliest": None,
                 "latest": None
-            }
\ No newline at end of file
+            }
+    
+    def _archive_partitions(self, cursor, start_date: str = None, end_date: str = None,
+                            complaint_ids: List[int] = None) -> List[Dict]:
+        """Tarih aralığı ya da ID listesiyle kesişen arşiv partition'ları (yeniden eskiye)"""
+        conditions = []
+        params = []
+        if start_date:
+            conditions.append('max_date >= ?')
+            params.append(start_date)
+        if end_date:
+            conditions.append("min_date < date(?, '+1 day')")
+            params.append(end_date)
+        if complaint_ids:
+            conditions.append('max_complaint_id >= ? AND min_complaint_id <= ?')
+            params.extend([min(complaint_ids), max(complaint_ids)])
+        
+        where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        cursor.execute(f'''
+            SELECT month, path, max_date FROM archive_partitions
+            {where_clause}
+            ORDER BY month DESC
+        ''', params)
+        return [{"month": row[0], "path": row[1], "max_date": row[2]} for row in cursor.fetchall()]
+    
+    @contextmanager
+    def _attached(self, conn, partition: Dict, schema: str = 'cold'):
+        """Arşiv partition'ını sorgu süresince bağla"""
+        path = partition['path']
+        if self.read_only:
+            conn.execute(f"ATTACH DATABASE ? AS {schema}", (f'file:{path}?mode=ro',))
+        else:
+            conn.execute(f"ATTACH DATABASE ? AS {schema}", (path,))
+        try:
+            yield
+        finally:
+            # Yarım kalan yazma işlemi varsa DETACH'tan önce geri al
+            if conn.in_transaction:
+                conn.rollback()
+            conn.execute(f"DETACH DATABASE {schema}")
+    
+    def _init_cold_schema(self, cursor):
+        """Bağlı arşiv dosyasında tabloları oluştur, eski şemalı dosyayı güncelle"""
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS cold.complaints (
+                Complaint_ID INTEGER PRIMARY KEY,
+                ref_url TEXT UNIQUE NOT NULL,
+                title TEXT,
+                full_comment TEXT,
+                date TEXT,
+                created_at DATETIME,
+                full_comment_z BLOB,
+                body_dict_id INTEGER
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS cold.analysis_codes (
+                ID INTEGER PRIMARY KEY,
+                Complaint_ID INTEGER UNIQUE NOT NULL,
+                Category_Code INTEGER,
+                Reason_Code INTEGER,
+                created_at TIMESTAMP,
+                taxonomy_version TEXT,
+                prompt_version TEXT,
+                model_name TEXT
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS cold.idx_complaints_date ON complaints (date)')
+        
+        # Şema 1 arşivleri versiyon kolonlarını taşımıyordu - damgaları kayıp, NULL (eski kayıt) kalır
+        cursor.execute('PRAGMA cold.table_info(analysis_codes)')
+        analysis_columns = {row[1] for row in cursor.fetchall()}
+        for column in ('taxonomy_version', 'prompt_version', 'model_name'):
+            if column not in analysis_columns:
+                cursor.execute(f'ALTER TABLE cold.analysis_codes ADD COLUMN {column} TEXT')
+        
+        if not self.fts_enabled:
+            return
+        cursor.execute("SELECT 1 FROM cold.sqlite_master WHERE name = 'complaints_fts'")
+        if cursor.fetchone():
+            return
+        # Sıcak indeksle aynı düzen; arşiv salt eklemeli olduğu için trigger gerekmez.
+        # Şema 1 arşivinde indeks yoktu - mevcut satırlar bir kez indekslenir
+        cursor.execute('''
+            CREATE VIRTUAL TABLE cold.complaints_fts USING fts5(
+                title,
+                full_comment,
+                tokenize='unicode61 remove_diacritics 2',
+                prefix='2 3'
+            )
+        ''')
+        cursor.execute('''
+            INSERT INTO cold.complaints_fts (rowid, title, full_comment)
+            SELECT Complaint_ID, replace(title, 'ı', 'i'),
+                   replace(comment_body(full_comment, full_comment_z, body_dict_id), 'ı', 'i')
+            FROM cold.complaints
+        ''')
+    
+    def _migrate_archive_partitions(self, conn):
+        """Eski şemalı arşiv dosyalarını güncelle (versiyon kolonları, FTS indeksi)"""
+        cursor = conn.cursor()
+        cursor.execute('SELECT month, path FROM archive_partitions WHERE schema_version < ?',
+                       (ARCHIVE_SCHEMA_VERSION,))
+        for month, path in cursor.fetchall():
+            if not os.path.exists(path):
+                continue
+            with self._attached(conn, {"path": path}):
+                self._init_cold_schema(cursor)
+                cursor.execute('UPDATE main.archive_partitions SET schema_version = ? WHERE month = ?',
+                               (ARCHIVE_SCHEMA_VERSION, month))
+                conn.commit()
+    
+    def archive_old_partitions(self, horizon_months: int = None) -> Dict:
+        """Ufuktan eski ve analizi tamamlanmış şikayetleri ay bazlı arşiv veritabanlarına taşı"""
+        horizon_months = Config.ARCHIVE_HORIZON_MONTHS if horizon_months is None else horizon_months
+        
+        # Ufuk: içinde bulunulan aydan horizon_months önceki ayın ilk günü
+        today = datetime.now()
+        month_index = today.year * 12 + (today.month - 1) - horizon_months
+        cutoff = f"{month_index // 12:04d}-{month_index % 12 + 1:02d}-01"
+        
+        archived = {}
+        try:
+            os.makedirs(self.archive_dir, exist_ok=True)
+            
+            with self._connect() as conn:
+                cursor = conn.cursor()
+                # Analizi olmayan şikayetler sıcak veritabanında (analiz kuyruğunda) kalır
+                cursor.execute('''
+                    SELECT DISTINCT substr(c.date, 1, 7)
+                    FROM complaints c
+                    JOIN analysis_codes a ON a.Complaint_ID = c.Complaint_ID
+                    WHERE c.date < ? AND c.date IS NOT NULL AND c.date != ''
+                ''', (cutoff,))
+                months = [row[0] for row in cursor.fetchall()]
+                
+                for month in sorted(months):
+                    archived[month] = self._archive_month(conn, month)
+            
+            return {
+                "success": True,
+                "cutoff": cutoff,
+                "archived": archived,
+                "archived_count": sum(archived.values())
+            }
+            
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e),
+                "archived": archived
+            }
+    
+    def _archive_month(self, conn, month: str) -> int:
+        """Tek bir ayı arşiv veritabanına taşı, taşınan şikayet sayısını döndür"""
+        path = os.path.join(self.archive_dir, f"complaints_{month.replace('-', '_')}.db")
+        cursor = conn.cursor()
+        
+        with self._attached(conn, {"path": path}):
+            self._init_cold_schema(cursor)
+            
+            cursor.execute('''
+                CREATE TEMP TABLE IF NOT EXISTS archive_batch (Complaint_ID INTEGER PRIMARY KEY)
+            ''')
+            cursor.execute('DELETE FROM temp.archive_batch')
+            cursor.execute('''
+                INSERT INTO temp.archive_batch (Complaint_ID)
+                SELECT c.Complaint_ID
+                FROM main.complaints c
+                JOIN main.analysis_codes a ON a.Complaint_ID = c.Complaint_ID
+                WHERE c.date >= ? AND c.date < date(?, '+1 month')
+            ''', (f"{month}-01", f"{month}-01"))
+            
+            # Önce kopyala, sonra sil - yarıda kesilirse tekrar çalıştırmak güvenli (OR IGNORE)
+            cursor.execute('''
+                INSERT OR IGNORE INTO cold.complaints
+                    (Complaint_ID, ref_url, title, full_comment, date, created_at, full_comment_z, body_dict_id)
+                SELECT Complaint_ID, ref_url, title, full_comment, date, created_at, full_comment_z, body_dict_id
+                FROM main.complaints
+                WHERE Complaint_ID IN (SELECT Complaint_ID FROM temp.archive_batch)
+            ''')
+            cursor.execute('''
+                INSERT OR REPLACE INTO cold.analysis_codes
+                    (ID, Complaint_ID, Category_Code, Reason_Code, created_at, taxonomy_version, prompt_version, model_name)
+                SELECT ID, Complaint_ID, Category_Code, Reason_Code, created_at, taxonomy_version, prompt_version, model_name
+                FROM main.analysis_codes
+                WHERE Complaint_ID IN (SELECT Complaint_ID FROM temp.archive_batch)
+            ''')
+            # Arama indeksi satırları partition'a taşınır (sıcak indeksten silme trigger'ı yapar)
+            if self.fts_enabled:
+                cursor.execute('''
+                    DELETE FROM cold.complaints_fts
+                    WHERE rowid IN (SELECT Complaint_ID FROM temp.archive_batch)
+                ''')
+                cursor.execute('''
+                    INSERT INTO cold.complaints_fts (rowid, title, full_comment)
+                    SELECT rowid, title, full_comment
+                    FROM main.complaints_fts
+                    WHERE rowid IN (SELECT Complaint_ID FROM temp.archive_batch)
+                ''')
+            
+            # Analiz doğrudan kodlu tablodan silinir; günlük özet tablo tüm geçmişi tutmaya devam eder
+            cursor.execute('''
+                DELETE FROM main.analysis_codes
+                WHERE Complaint_ID IN (SELECT Complaint_ID FROM temp.archive_batch)
+            ''')
+            cursor.execute('''
+                DELETE FROM main.complaints
+                WHERE Complaint_ID IN (SELECT Complaint_ID FROM temp.archive_batch)
+            ''')
+            moved = cursor.rowcount
+            
+            cursor.execute('''
+                INSERT OR REPLACE INTO main.archive_partitions
+                    (month, path, row_count, min_date, max_date, min_complaint_id, max_complaint_id, archived_at,
+                     schema_version)
+                SELECT ?, ?, COUNT(*), MIN(date), MAX(date), MIN(Complaint_ID), MAX(Complaint_ID), CURRENT_TIMESTAMP, ?
+                FROM cold.complaints
+            ''', (month, os.path.abspath(path), ARCHIVE_SCHEMA_VERSION))
+            
+            conn.commit()
+        
+        return moved
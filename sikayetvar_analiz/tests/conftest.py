@@ -0,0 +1,46 @@
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    """Geçici veritabanı - LLM ölçümleri, arşiv, grafikler ve yerel LLM işleri de test dizininde"""
+    monkeypatch.chdir(tmp_path)
+    path = str(tmp_path / 'sikayetvar.db')
+    monkeypatch.setattr(Config, 'DATABASE_PATH', path)
+    monkeypatch.setattr(Config, 'LLM_BACKEND', 'fake')
+    monkeypatch.setattr(Config, 'FAKE_LLM_LATENCY_MS', 0)
+    monkeypatch.setattr(Config, 'FAKE_LLM_TOKENS_PER_SECOND', 1000000)
+    monkeypatch.setattr(Config, 'FAKE_LLM_BATCH_DIR', str(tmp_path / 'fake_llm_batches'))
+    return path
+
+
+@pytest.fixture
+def db_manager(db_path):
+    from database_manager import DatabaseManager
+    return DatabaseManager(db_path)
+
+
+def make_complaints(count, start=0, newest=None, title='Buzdolabı soğutmuyor', body='Servis randevusu gelmedi'):
+    """Tarihi birer dakika geriye giden sentetik şikayetler"""
+    newest = newest or datetime(2025, 6, 30, 12, 0, 0)
+    return [{
+        'ref_url': f'https://www.sikayetvar.com/vestel/test-{index}',
+        'title': f'{title} {index}',
+        'full_comment': f'{body} {index}',
+        'date': (newest - timedelta(minutes=index)).strftime('%Y-%m-%d %H:%M:%S')
+    } for index in range(start, start + count)]
+
+
+@pytest.fixture
+def complaint_ids(db_manager):
+    """20 kategorisiz şikayet (hepsi analysis_queue'da)"""
+    result = db_manager.save_new_complaints_incremental(make_complaints(20))
+    return result['new_complaint_ids']
@@ -0,0 +1,136 @@
+import sqlite3
+import time
+
+
+def queue_row(db_path, complaint_id):
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute(
+            'SELECT status, attempts, lease_owner FROM analysis_queue WHERE Complaint_ID = ?', (complaint_id,)
+        ).fetchone()
+
+
+def test_new_complaints_are_queued(db_manager, complaint_ids):
+    assert db_manager.get_analysis_queue_stats() == {'pending': 20}
+    assert len(db_manager.get_uncategorized_complaints(complaint_ids)) == 20
+
+
+def test_claim_is_exclusive_and_newest_first(db_manager, complaint_ids):
+    first = db_manager.claim_analysis_batch(5, 'w1')
+    second = db_manager.claim_analysis_batch(5, 'w2')
+
+    assert [c['Complaint_ID'] for c in first] == complaint_ids[:5]
+    assert not {c['Complaint_ID'] for c in first} & {c['Complaint_ID'] for c in second}
+    assert db_manager.get_analysis_queue_stats() == {'pending': 10, 'claimed': 10}
+
+
+def test_release_counts_attempt_and_fails_when_exhausted(db_path, db_manager, complaint_ids):
+    complaint_id = complaint_ids[0]
+    for attempt in range(1, 4):
+        assert db_manager.claim_analysis_batch(1, 'w1', max_attempts=3, complaint_ids=[complaint_id])
+        assert db_manager.release_analysis_claims([complaint_id], 'hata', max_attempts=3) == 1
+
+    assert queue_row(db_path, complaint_id) == ('failed', 3, None)
+    assert db_manager.claim_analysis_batch(1, 'w1', max_attempts=3, complaint_ids=[complaint_id]) == []
+
+
+def test_release_only_touches_own_lease(db_path, db_manager, complaint_ids):
+    complaint_id = complaint_ids[0]
+    db_manager.claim_analysis_batch(1, 'w1', complaint_ids=[complaint_id])
+
+    assert db_manager.release_analysis_claims([complaint_id], lease_owner='w2') == 0
+    assert queue_row(db_path, complaint_id) == ('claimed', 1, 'w1')
+    assert db_manager.release_analysis_claims([complaint_id], lease_owner='w1') == 1
+
+
+def test_expired_lease_can_be_reclaimed(db_path, db_manager, complaint_ids):
+    complaint_id = complaint_ids[0]
+    db_manager.claim_analysis_batch(1, 'crashed', lease_seconds=-1, complaint_ids=[complaint_id])
+
+    assert db_manager.get_analysis_claim_owners([complaint_id]) == {complaint_id: None}
+    assert db_manager.claim_analysis_batch(1, 'w2', complaint_ids=[complaint_id])
+    assert queue_row(db_path, complaint_id) == ('claimed', 2, 'w2')
+    assert db_manager.get_analysis_claim_owners([complaint_id]) == {complaint_id: 'w2'}
+
+
+def test_lease_expiring_on_last_attempt_is_failed(db_path, db_manager, complaint_ids):
+    complaint_id = complaint_ids[0]
+    for _ in range(3):
+        assert db_manager.claim_analysis_batch(1, 'crashed', lease_seconds=-1, max_attempts=3,
+                                               complaint_ids=[complaint_id])
+
+    # Hakkı bitmiş, kirası dolmuş iş 'claimed'da asılı kalmaz ve sahibi raporlanmaz
+    assert db_manager.claim_analysis_batch(1, 'w2', max_attempts=3, complaint_ids=[complaint_id]) == []
+    assert queue_row(db_path, complaint_id) == ('failed', 3, None)
+    assert db_manager.get_analysis_claim_owners([complaint_id]) == {}
+
+
+def test_unclaimed_failures_skip_live_leases(db_path, db_manager, complaint_ids):
+    db_manager.claim_analysis_batch(1, 'w1', complaint_ids=complaint_ids[:1])
+    db_manager.claim_analysis_batch(1, 'crashed', lease_seconds=-1, complaint_ids=complaint_ids[1:2])
+
+    # Kiralamadan analiz eden çağıranın hatası, başka worker'ın elindeki şikayeti kuyruktan düşürmez
+    assert db_manager.record_analysis_failures(complaint_ids[:3], 'hata', max_attempts=3) == 2
+    assert queue_row(db_path, complaint_ids[0]) == ('claimed', 1, 'w1')
+    assert queue_row(db_path, complaint_ids[1]) == ('pending', 2, None)
+    assert queue_row(db_path, complaint_ids[2]) == ('pending', 1, None)
+
+
+def test_insert_analysis_removes_from_queue(db_manager, complaint_ids):
+    db_manager.claim_analysis_batch(2, 'w1')
+    db_manager.insert_analysis([{'Complaint_ID': cid, 'category': 'Buzdolabı', 'reason': 'Teknik Servis'}
+                                for cid in complaint_ids[:2]])
+
+    assert db_manager.get_analysis_claim_owners(complaint_ids[:2]) == {}
+    assert db_manager.get_analysis_queue_stats() == {'pending': 18}
+
+
+def test_request_claims_skip_in_flight_and_expired_bulk(db_manager, complaint_ids):
+    from agents.data_management_agent import DataManagementAgent
+
+    data_agent = DataManagementAgent(db_manager)
+    db_manager.claim_analysis_batch(2, 'worker-1', complaint_ids=complaint_ids[:2])
+    db_manager.claim_analysis_batch(2, 'bulk-1', lease_seconds=3600, complaint_ids=complaint_ids[2:4])
+    db_manager.claim_analysis_batch(2, 'bulk-2', lease_seconds=-1, complaint_ids=complaint_ids[4:6])
+
+    claimed, in_flight, bulk_queued = data_agent.claim_uncategorized(complaint_ids[:8], 'request-1')
+
+    # Kirası dolan toplu iş satırları devralınır, geçerli kiralar tekrar gönderilmez
+    assert sorted(c['Complaint_ID'] for c in claimed) == sorted(complaint_ids[4:8])
+    assert sorted(in_flight) == sorted(complaint_ids[:2])
+    assert sorted(bulk_queued) == sorted(complaint_ids[2:4])
+
+
+def test_bulk_release_keeps_taken_over_leases(db_path, db_manager, complaint_ids, monkeypatch):
+    from agents.analysis_agent import AnalysisAgent
+    from agents.bulk_classifier import BulkClassifier
+
+    bulk = BulkClassifier(db_manager, AnalysisAgent(db_manager))
+    job_id = bulk.create_job()
+    bulk.prepare_job(job_id)
+
+    # Toplu işin kirası doldu, iki şikayeti arka plan worker'ı devraldı; sonra iş sağlayıcıda başarısız oldu
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("UPDATE analysis_queue SET lease_expires_at = datetime('now', '-1 minute')")
+    db_manager.claim_analysis_batch(2, 'worker-1', complaint_ids=complaint_ids[:2])
+    monkeypatch.setattr(bulk.llm_client.backend, 'get_batch', lambda name: {"state": "failed", "error": "iptal"})
+
+    assert bulk.poll(job_id)['released'] == 18
+    assert queue_row(db_path, complaint_ids[0]) == ('claimed', 2, 'worker-1')
+    assert queue_row(db_path, complaint_ids[2]) == ('pending', 1, None)
+
+
+def test_bulk_poller_records_errors(db_manager, monkeypatch):
+    from agents.analysis_agent import AnalysisAgent
+    from agents.bulk_classifier import BulkClassifier
+
+    bulk = BulkClassifier(db_manager, AnalysisAgent(db_manager), poll_seconds=60)
+    monkeypatch.setattr(bulk, 'resume', lambda: 1 / 0)
+    bulk.start()
+    for _ in range(100):
+        if bulk.get_metrics()['runs']:
+            break
+        time.sleep(0.01)
+    bulk.stop()
+
+    assert bulk.get_metrics()['errors'] == 1
+    assert 'division by zero' in bulk.get_metrics()['last_error']
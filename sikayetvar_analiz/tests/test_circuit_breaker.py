@@ -0,0 +1,77 @@
+import pytest
+
+from utils import llm_resilience
+from utils.llm_resilience import CircuitBreaker
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Elle ilerletilen monotonic saat"""
+    now = [1000.0]
+    monkeypatch.setattr(llm_resilience.time, 'monotonic', lambda: now[0])
+    return now
+
+
+def test_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_seconds=30)
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.snapshot()['state'] == 'closed'
+    assert breaker.allow()
+    assert not breaker.healthy()
+    
+    breaker.record_failure()
+    assert breaker.snapshot()['state'] == 'open'
+    assert breaker.snapshot()['trips'] == 1
+    assert not breaker.available()
+    assert not breaker.allow()
+
+
+def test_success_resets_failure_count(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=30)
+    breaker.record_failure()
+    breaker.record_success()
+    assert breaker.healthy()
+    
+    breaker.record_failure()
+    assert breaker.snapshot() == {'state': 'closed', 'consecutive_failures': 1, 'trips': 0,
+                                  'open_for_seconds': None}
+
+
+def test_half_open_allows_single_probe(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=30)
+    breaker.record_failure()
+    
+    clock[0] += 29
+    assert not breaker.available()
+    clock[0] += 1
+    # available deneme hakkını tüketmez
+    assert breaker.available()
+    assert breaker.available()
+    
+    assert breaker.allow()
+    assert breaker.snapshot()['state'] == 'half_open'
+    assert not breaker.available()
+    assert not breaker.allow()
+    assert not breaker.healthy()
+    
+    breaker.record_success()
+    assert breaker.snapshot()['state'] == 'closed'
+    assert breaker.healthy()
+    assert breaker.allow()
+
+
+def test_failed_probe_reopens(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=30)
+    breaker.record_failure()
+    clock[0] += 30
+    assert breaker.allow()
+    
+    breaker.record_failure()
+    assert breaker.snapshot()['state'] == 'open'
+    assert breaker.snapshot()['trips'] == 2
+    assert not breaker.allow()
+    
+    # Süre yeniden sayılır
+    clock[0] += 30
+    assert breaker.allow()
@@ -0,0 +1,74 @@
+import json
+
+import pytest
+
+from config import Config
+from conftest import make_complaints
+
+
+@pytest.fixture
+def build_agent(db_manager, monkeypatch):
+    monkeypatch.setattr(Config, 'LLM_CACHE_MAX_ENTRIES', 1000)
+    monkeypatch.setattr(Config, 'NEAR_DUPLICATE_ENABLED', False)
+    monkeypatch.setattr(Config, 'LOCAL_CLASSIFIER_ENABLED', False)
+    from agents.analysis_agent import AnalysisAgent
+    return lambda: AnalysisAgent(db_manager)
+
+
+def save_copies(db_manager, count, batch):
+    """Aynı metinli şikayetler, farklı URL ile (tekrar paylaşım)"""
+    complaints = make_complaints(count)
+    for complaint in complaints:
+        complaint['ref_url'] += f'-{batch}'
+    return db_manager.save_new_complaints_incremental(complaints)['new_complaint_ids']
+
+
+def analyze(db_manager, analysis_agent, complaint_ids):
+    rows = db_manager.get_uncategorized_complaints(complaint_ids)
+    jsonl_data = '\n'.join(json.dumps({key: row[key] for key in
+                                       ('Complaint_ID', 'full_comment', 'ref_url', 'title', 'date')},
+                                      ensure_ascii=False) for row in rows)
+    result = analysis_agent.analyze_complaints(jsonl_data, complaint_ids)
+    assert result['success']
+    return result
+
+
+def cache_counts(analysis_agent):
+    stats = analysis_agent.cache.get_stats()
+    return stats['hits'], stats['misses']
+
+
+def test_same_text_hits_cache(db_manager, build_agent):
+    agent = build_agent()
+    analyze(db_manager, agent, save_copies(db_manager, 10, 'a'))
+    assert cache_counts(agent) == (0, 10)
+    assert db_manager.get_llm_cache_size() == 10
+    
+    result = analyze(db_manager, agent, save_copies(db_manager, 10, 'b'))
+    assert cache_counts(agent) == (10, 10)
+    assert len(result['analysis_assignments']) == 10
+
+
+def test_prompt_version_change_misses_cache(db_manager, build_agent, monkeypatch):
+    from agents.analysis_agent import AnalysisAgent
+    
+    analyze(db_manager, build_agent(), save_copies(db_manager, 10, 'a'))
+    
+    monkeypatch.setattr(AnalysisAgent, 'PROMPT_VERSION', 'test-next')
+    agent = build_agent()
+    result = analyze(db_manager, agent, save_copies(db_manager, 10, 'b'))
+    assert cache_counts(agent) == (0, 10)
+    assert {a['prompt_version'] for a in result['analysis_assignments']} == {'test-next'}
+    
+    # Yeni versiyonla yazılan kayıtlar yeni versiyonda isabet eder
+    analyze(db_manager, agent, save_copies(db_manager, 10, 'c'))
+    assert cache_counts(agent) == (10, 10)
+
+
+def test_taxonomy_change_misses_cache(db_manager, build_agent, monkeypatch):
+    analyze(db_manager, build_agent(), save_copies(db_manager, 10, 'a'))
+    
+    monkeypatch.setattr(Config, 'CATEGORIES', Config.CATEGORIES + ['Yeni Kategori'])
+    agent = build_agent()
+    analyze(db_manager, agent, save_copies(db_manager, 10, 'b'))
+    assert cache_counts(agent) == (0, 10)
@@ -0,0 +1,45 @@
+import sqlite3
+import time
+
+from config import Config
+
+
+def llm_call_count(db_path):
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute('SELECT COUNT(*) FROM llm_calls').fetchone()[0]
+
+
+def buffered_metrics(db_manager, monkeypatch, flush_size):
+    from utils.llm_metrics import LLMMetrics
+
+    monkeypatch.setattr(Config, 'LLM_METRICS_FLUSH_SECONDS', 3600)
+    monkeypatch.setattr(Config, 'LLM_METRICS_FLUSH_SIZE', flush_size)
+    metrics = LLMMetrics(persist=True)
+    metrics._db_manager = db_manager
+    return metrics
+
+
+def test_calls_are_buffered_until_flush(db_path, db_manager, monkeypatch):
+    metrics = buffered_metrics(db_manager, monkeypatch, flush_size=100)
+    for _ in range(5):
+        metrics.record('analysis_batch', 'fake-llm', 120.0, prompt_tokens=100, response_tokens=20)
+
+    # Çağrı yolunda yazma yok, bellek içi özet hemen güncel
+    assert llm_call_count(db_path) == 0
+    assert metrics.snapshot()['analysis_batch']['calls'] == 5
+
+    assert metrics.flush() == 5
+    assert metrics.flush() == 0
+    assert db_manager.get_llm_cost_report('2000-01-01', '2100-01-01')[0]['calls'] == 5
+
+
+def test_full_buffer_is_flushed_in_background(db_path, db_manager, monkeypatch):
+    metrics = buffered_metrics(db_manager, monkeypatch, flush_size=3)
+    for _ in range(3):
+        metrics.record('root_command', 'fake-llm', 80.0)
+
+    for _ in range(200):
+        if llm_call_count(db_path) == 3:
+            break
+        time.sleep(0.01)
+    assert llm_call_count(db_path) == 3
@@ -0,0 +1,42 @@
+from conftest import make_complaints
+
+
+def test_update_does_not_run_maintenance_inline(db_manager, monkeypatch):
+    from agents.data_management_agent import DataManagementAgent
+    
+    data_agent = DataManagementAgent(db_manager)
+    monkeypatch.setattr(data_agent, '_run_spider_incremental', lambda refs: dict(
+        db_manager.save_new_complaints_incremental(make_complaints(250))))
+    maintenance_calls = []
+    monkeypatch.setattr(db_manager, 'compress_complaint_bodies', lambda *a, **k: maintenance_calls.append('compress'))
+    monkeypatch.setattr(db_manager, 'archive_old_partitions', lambda *a, **k: maintenance_calls.append('archive'))
+    
+    assert data_agent.update_database_incremental()['new_count'] == 250
+    assert maintenance_calls == []
+
+
+def test_maintenance_compresses_new_rows(db_manager):
+    from agents.maintenance_worker import MaintenanceWorker
+    
+    db_manager.save_new_complaints_incremental(make_complaints(250))
+    worker = MaintenanceWorker(db_manager, interval_seconds=0)
+    worker.start()
+    assert worker._thread is None
+    
+    result = worker.run_once()
+    assert result['compression']['compressed_count'] == 250
+    assert worker.get_metrics()['runs'] == 1
+    assert worker.get_metrics()['last_error'] is None
+    assert db_manager.get_complaint_by_id(1)['full_comment'].startswith('Servis randevusu gelmedi')
+
+
+def test_archive_runs_only_when_enabled(db_manager):
+    from agents.maintenance_worker import MaintenanceWorker
+    from test_rollup_archive import archived_setup
+    
+    archived_setup(db_manager)
+    
+    assert 'archive' not in MaintenanceWorker(db_manager, interval_seconds=0).run_once()
+    
+    result = MaintenanceWorker(db_manager, interval_seconds=0, archive_enabled=True).run_once()
+    assert result['archive']['archived'] == {'2024-02': 29, '2024-03': 11}
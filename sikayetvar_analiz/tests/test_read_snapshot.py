@@ -0,0 +1,80 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from config import Config
+from conftest import make_complaints
+
+
+@pytest.fixture
+def snapshots(db_path, tmp_path):
+    from utils.read_snapshot import ReadSnapshotManager
+    return ReadSnapshotManager(db_path, str(tmp_path / 'snapshots'), refresh_seconds=60)
+
+
+def test_requests_never_copy(db_manager, snapshots, complaint_ids):
+    # Henüz snapshot yok: canlı veritabanı salt okunur
+    live = snapshots.current()
+    assert live['version'] == 0
+    assert len(live['db_manager'].get_complaints_by_count(100)[1]) == 20
+    assert snapshots._current is None
+    
+    first = snapshots.refresh_if_changed()
+    db_manager.save_new_complaints_incremental(make_complaints(5, start=20))
+    # İstek yolu hazır versiyonu okur, yazma sonrası bile kopya almaz
+    assert snapshots.current() is first
+    assert len(snapshots.current()['db_manager'].get_complaints_by_count(100)[1]) == 20
+
+
+def test_refresh_copies_only_when_live_db_changed(db_manager, snapshots, complaint_ids):
+    first = snapshots.refresh_if_changed()
+    assert first['version'] == 1
+    
+    checked_at = datetime.now().isoformat()
+    again = snapshots.refresh_if_changed()
+    assert again['version'] == 1
+    assert again['as_of'] >= checked_at
+    
+    db_manager.save_new_complaints_incremental(make_complaints(5, start=20))
+    fresh = snapshots.refresh_if_changed()
+    assert fresh['version'] == 2
+    assert len(fresh['db_manager'].get_complaints_by_count(100)[1]) == 25
+
+
+def test_background_refresh_takes_first_version(snapshots, complaint_ids):
+    snapshots.start()
+    try:
+        for _ in range(100):
+            if snapshots.current()['version']:
+                break
+            snapshots._stop_event.wait(0.05)
+        assert snapshots.current()['version'] == 1
+    finally:
+        snapshots.stop()
+
+
+def test_root_agent_statistics_use_snapshot_or_live(db_manager, snapshots, complaint_ids):
+    from agents.root_agent import RootAgent
+    
+    root_agent = RootAgent(snapshots)
+    data_agent = SimpleNamespace(db_manager=db_manager)
+    data_result = {'all_complaint_ids': complaint_ids}
+    snapshots.refresh_if_changed()
+    
+    db_manager.insert_analysis([{'Complaint_ID': complaint_id, 'category': Config.CATEGORIES[0],
+                                 'reason': Config.REASONS[0]} for complaint_id in complaint_ids])
+    written_at = datetime.now().isoformat()
+    
+    # Snapshot kayıttan önce alınmış: kopya beklenmez, canlı veritabanı okunur
+    stats = root_agent._generate_final_statistics(data_agent, {}, data_result, written_at)
+    assert stats['category_stats'] == {Config.CATEGORIES[0]: 20}
+    assert stats['snapshot']['version'] is None
+    assert snapshots.current()['version'] == 1
+    
+    # Arka plan yenilemesinden sonra aynı sonuç snapshot'tan gelir
+    snapshots.refresh_if_changed()
+    stats = root_agent._generate_final_statistics(data_agent, {}, data_result, written_at)
+    assert stats['category_stats'] == {Config.CATEGORIES[0]: 20}
+    assert stats['snapshot']['version'] == 2
+    assert stats['snapshot']['as_of'] >= written_at
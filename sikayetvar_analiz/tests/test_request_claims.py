@@ -0,0 +1,82 @@
+import sqlite3
+
+import pytest
+
+from agents.data_management_agent import DataManagementAgent
+from config import Config
+
+
+class OfflineDataAgent(DataManagementAgent):
+    """Crawler çalıştırmayan veri agentı"""
+
+    def ensure_database_updated(self, command_info=None):
+        return {"success": True, "new_records": 0}
+
+
+@pytest.fixture
+def open_breaker(monkeypatch):
+    from utils.llm_client import LLMClient
+    from utils.llm_resilience import CircuitBreaker
+
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=3600)
+    breaker.record_failure()
+    monkeypatch.setattr(LLMClient, 'breaker', breaker)
+    return breaker
+
+
+@pytest.fixture
+def agents(db_path, monkeypatch):
+    monkeypatch.setattr(Config, 'LLM_CACHE_MAX_ENTRIES', 0)
+    monkeypatch.setattr(Config, 'LOCAL_CLASSIFIER_ENABLED', False)
+    monkeypatch.setattr(Config, 'LLM_BREAKER_LOCAL_FALLBACK', False)
+    monkeypatch.setattr(Config, 'NEAR_DUPLICATE_ENABLED', False)
+    from agents.analysis_agent import AnalysisAgent
+    from agents.root_agent import RootAgent
+
+    def build(db_manager):
+        return RootAgent(), OfflineDataAgent(db_manager), AnalysisAgent(db_manager)
+    return build
+
+
+def test_release_without_counting_attempt(db_path, db_manager, complaint_ids):
+    complaint_id = complaint_ids[0]
+    for _ in range(5):
+        db_manager.claim_analysis_batch(1, 'w1', max_attempts=3, complaint_ids=[complaint_id])
+        db_manager.release_analysis_claims([complaint_id], 'kesinti', max_attempts=3, count_attempt=False)
+
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute('SELECT status, attempts FROM analysis_queue WHERE Complaint_ID = ?',
+                            (complaint_id,)).fetchone() == ('pending', 0)
+
+
+def test_outage_does_not_exhaust_attempts(db_path, db_manager, complaint_ids, agents, open_breaker):
+    root_agent, data_agent, analysis_agent = agents(db_manager)
+
+    for _ in range(Config.ANALYSIS_MAX_ATTEMPTS + 1):
+        root_agent.process_request("son 20 şikayeti analiz et", data_agent, analysis_agent)
+
+    assert db_manager.get_analysis_queue_stats() == {'pending': 20}
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute('SELECT MAX(attempts) FROM analysis_queue').fetchone() == (0,)
+
+
+def test_concurrent_request_waits_instead_of_resending(db_manager, complaint_ids, agents, monkeypatch):
+    monkeypatch.setattr(Config, 'ANALYSIS_CLAIM_POLL_SECONDS', 0.05)
+    root_agent, data_agent, analysis_agent = agents(db_manager)
+
+    # Başka bir istek ilk 10 şikayeti kiralamış ve sonra sonucu yazıyor
+    db_manager.claim_analysis_batch(10, 'request-other', complaint_ids=complaint_ids[:10])
+    original_wait = root_agent._wait_for_in_flight
+
+    def wait_after_other_finishes(*args, **kwargs):
+        db_manager.insert_analysis([{'Complaint_ID': cid, 'category': 'Buzdolabı', 'reason': 'Teknik Servis'}
+                                    for cid in complaint_ids[:10]])
+        return original_wait(*args, **kwargs)
+    monkeypatch.setattr(root_agent, '_wait_for_in_flight', wait_after_other_finishes)
+
+    result = root_agent.process_request("son 20 şikayeti analiz et", data_agent, analysis_agent)
+
+    assert result['success'], result.get('error')
+    assert sorted(result['data_result']['complaint_ids']) == sorted(complaint_ids[10:])
+    assert result['analysis_result']['in_flight']['resolved_elsewhere'] == 10
+    assert db_manager.get_analysis_queue_stats() == {}
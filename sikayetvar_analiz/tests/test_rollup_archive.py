@@ -0,0 +1,102 @@
+import glob
+import sqlite3
+from datetime import datetime
+
+from config import Config
+from conftest import make_complaints
+
+CATEGORY_A, CATEGORY_B = Config.CATEGORIES[0], Config.CATEGORIES[1]
+REASON = Config.REASONS[0]
+VERSIONS = {'taxonomy_version': 'tx1', 'prompt_version': 'p1', 'model_name': 'fake'}
+
+
+def rollup_rows(db_path):
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute(
+            'SELECT day, Category, Reason, count FROM analysis_daily_rollup ORDER BY 1, 2, 3').fetchall()
+
+
+def analyze(db_manager, ids, category):
+    return db_manager.insert_analysis(
+        [dict(VERSIONS, Complaint_ID=complaint_id, category=category, reason=REASON) for complaint_id in ids])
+
+
+def archived_setup(db_manager):
+    """Şubat/Mart 2024'e yayılan 40 eski ve 10 yeni şikayet, hepsi analizli ve eski olanlar arşivde"""
+    old_ids = db_manager.save_new_complaints_incremental(
+        make_complaints(40, newest=datetime(2024, 3, 1, 0, 10)))['new_complaint_ids']
+    recent_ids = db_manager.save_new_complaints_incremental(
+        make_complaints(10, start=40, newest=datetime.now()))['new_complaint_ids']
+    analyze(db_manager, old_ids, CATEGORY_A)
+    analyze(db_manager, recent_ids, CATEGORY_B)
+    return old_ids, recent_ids
+
+
+def test_rollup_tracks_reinsert(db_path, db_manager, complaint_ids):
+    analyze(db_manager, complaint_ids, CATEGORY_A)
+    analyze(db_manager, complaint_ids[:5], CATEGORY_B)
+    analyze(db_manager, complaint_ids[:5], CATEGORY_B)
+    
+    stats = db_manager.get_analysis_stats_for_date_range('2025-01-01', '2025-12-31')
+    assert stats['categories'] == {CATEGORY_A: 15, CATEGORY_B: 5}
+    
+    incremental = rollup_rows(db_path)
+    db_manager.rebuild_analysis_rollup()
+    assert rollup_rows(db_path) == incremental
+
+
+def test_archive_keeps_rollup_and_versions(db_path, db_manager):
+    old_ids, recent_ids = archived_setup(db_manager)
+    before = rollup_rows(db_path)
+    
+    result = db_manager.archive_old_partitions(horizon_months=12)
+    assert result['archived'] == {'2024-02': 29, '2024-03': 11}
+    assert rollup_rows(db_path) == before
+    
+    # Yeniden hesaplama arşiv partition'larını da sayar
+    db_manager.rebuild_analysis_rollup()
+    assert rollup_rows(db_path) == before
+    
+    assert db_manager.get_analysis_versions() == [dict(VERSIONS, count=50)]
+    
+    # Arşivdeki şikayetin analizi sıcak tabloya sahipsiz satır olarak yazılmaz
+    assert analyze(db_manager, old_ids[:1], CATEGORY_B) == 0
+    assert rollup_rows(db_path) == before
+
+
+def test_search_spans_archive(db_manager):
+    old_ids, recent_ids = archived_setup(db_manager)
+    db_manager.archive_old_partitions(horizon_months=12)
+    
+    result = db_manager.search('buzdolabi', page_size=30)
+    assert result['total'] == 50
+    assert len(result['results']) == 30
+    assert {row['Complaint_ID'] for row in db_manager.search('buzdolabi', page=2, page_size=30)['results']} \
+        | {row['Complaint_ID'] for row in result['results']} == set(old_ids + recent_ids)
+    
+    february = db_manager.search('buzdolabi', start_date='2024-02-01', end_date='2024-02-29', page_size=50)
+    assert february['total'] == 29
+    assert {row['Complaint_ID'] for row in february['results']} == set(old_ids[11:])
+
+
+def test_old_archive_files_are_migrated(db_path, db_manager):
+    from database_manager import DatabaseManager
+    
+    old_ids, recent_ids = archived_setup(db_manager)
+    db_manager.archive_old_partitions(horizon_months=12)
+    
+    # Şema 1 arşivi: versiyon kolonları ve FTS indeksi yok
+    for path in glob.glob(f'{db_manager.archive_dir}/*.db'):
+        with sqlite3.connect(path) as conn:
+            conn.execute('DROP TABLE complaints_fts')
+            for column in VERSIONS:
+                conn.execute(f'ALTER TABLE analysis_codes DROP COLUMN {column}')
+    with sqlite3.connect(db_path) as conn:
+        conn.execute('UPDATE archive_partitions SET schema_version = 1')
+    
+    migrated = DatabaseManager(db_path)
+    assert migrated.search('buzdolabi')['total'] == 50
+    assert sorted(migrated.get_analysis_versions(), key=lambda row: row['count']) == [
+        dict(VERSIONS, count=10),
+        {'taxonomy_version': None, 'prompt_version': None, 'model_name': None, 'count': 40}
+    ]
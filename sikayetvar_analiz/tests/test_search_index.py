@@ -0,0 +1,52 @@
+import sqlite3
+
+from conftest import make_complaints
+
+
+def _search_ids(db_manager, query):
+    return {row['Complaint_ID'] for row in db_manager.search(query, page_size=100)['results']}
+
+
+def test_search_folds_turkish_characters(db_manager):
+    db_manager.save_new_complaints_incremental(
+        make_complaints(1, title='KOMBİ ARIZASI', body='Kombi ısınmıyor'))
+    
+    assert len(_search_ids(db_manager, 'kombi arıza')) == 1
+    assert len(_search_ids(db_manager, 'kombi ariza')) == 1
+    assert len(_search_ids(db_manager, 'isinmiyor')) == 1
+
+
+def test_search_follows_update_and_delete(db_manager):
+    ids = db_manager.save_new_complaints_incremental(
+        make_complaints(3, title='Kombi arızası', body='Servis gelmedi'))['new_complaint_ids']
+    
+    with db_manager._connect() as conn:
+        conn.execute("UPDATE complaints SET title = 'Çamaşır makinesi' WHERE Complaint_ID = ?", (ids[0],))
+        conn.execute("UPDATE complaints SET full_comment = 'Kargo kayboldu' WHERE Complaint_ID = ?", (ids[1],))
+        conn.execute('DELETE FROM complaints WHERE Complaint_ID = ?', (ids[2],))
+        conn.commit()
+    
+    assert _search_ids(db_manager, 'kombi') == {ids[1]}
+    assert _search_ids(db_manager, 'camasir') == {ids[0]}
+    assert _search_ids(db_manager, 'kargo') == {ids[1]}
+    assert _search_ids(db_manager, 'servis') == {ids[0]}
+    
+    with db_manager._connect() as conn:
+        conn.execute("INSERT INTO complaints_fts (complaints_fts) VALUES ('integrity-check')")
+
+
+def test_search_index_survives_compression_and_foreign_writers(db_manager, db_path):
+    ids = db_manager.save_new_complaints_incremental(
+        make_complaints(250, title='Kombi arızası', body='Servis randevusu gelmedi'))['new_complaint_ids']
+    assert db_manager.compress_complaint_bodies(min_train_samples=10)['compressed_count'] == 250
+    assert len(_search_ids(db_manager, 'randevusu')) == 100
+    
+    # comment_body kayıtlı olmayan bağlantı sıkıştırılmış satırı silip güncelleyebilmeli
+    with sqlite3.connect(db_path) as conn:
+        conn.execute('DELETE FROM complaints WHERE Complaint_ID = ?', (ids[0],))
+        conn.execute("UPDATE complaints SET title = 'Klima' WHERE Complaint_ID = ?", (ids[1],))
+        conn.commit()
+    
+    assert db_manager.search('randevusu')['total'] == 249
+    assert _search_ids(db_manager, 'klima') == {ids[1]}
+    assert ids[1] in _search_ids(db_manager, 'randevusu')
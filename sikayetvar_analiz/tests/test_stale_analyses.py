@@ -0,0 +1,104 @@
+import pytest
+
+from config import Config
+
+CATEGORY_A, CATEGORY_B = Config.CATEGORIES[0], Config.CATEGORIES[1]
+REASON = Config.REASONS[0]
+CURRENT = {'taxonomy_version': 'tx2', 'prompt_version': 'p2', 'model_name': 'llm-2', 'local_model': 'local'}
+
+
+def stamp(taxonomy_version='tx2', prompt_version='p2', model_name='llm-2'):
+    return {'taxonomy_version': taxonomy_version, 'prompt_version': prompt_version, 'model_name': model_name}
+
+
+@pytest.fixture
+def stamped(db_manager, complaint_ids):
+    """Complaint_ID -> damga; complaint_ids yeniden eskiye sıralı"""
+    stamps = {
+        complaint_ids[0]: stamp(),
+        complaint_ids[1]: stamp(taxonomy_version='tx1'),
+        complaint_ids[2]: stamp(prompt_version='p1'),
+        complaint_ids[3]: stamp(model_name='llm-1'),
+        complaint_ids[4]: stamp(prompt_version=None, model_name='local'),
+        complaint_ids[5]: stamp(prompt_version=None, model_name='local-fallback'),
+        complaint_ids[6]: stamp(taxonomy_version=None, prompt_version=None, model_name=None),
+        complaint_ids[7]: stamp(taxonomy_version='tx1', prompt_version='p1'),
+    }
+    db_manager.insert_analysis([
+        dict(versions, Complaint_ID=complaint_id, category=CATEGORY_B if complaint_id == complaint_ids[7] else CATEGORY_A,
+             reason=REASON)
+        for complaint_id, versions in stamps.items()
+    ])
+    return complaint_ids
+
+
+def stale_ids(db_manager, scope='all', **kwargs):
+    return [row['Complaint_ID'] for row in db_manager.get_stale_analyses(CURRENT, scope, **kwargs)]
+
+
+def test_scopes_select_only_their_version_difference(db_manager, stamped):
+    ids = stamped
+    assert stale_ids(db_manager, 'taxonomy') == [ids[1], ids[7]]
+    # Yerel sınıflandırıcı satırı prompt/model değişikliğinden etkilenmez, yedek tahmin her zaman eskimiştir
+    assert stale_ids(db_manager, 'prompt') == [ids[2], ids[7]]
+    assert stale_ids(db_manager, 'model') == [ids[3], ids[5]]
+    assert stale_ids(db_manager, 'all') == [ids[1], ids[2], ids[3], ids[5], ids[7]]
+    assert db_manager.count_stale_analyses(CURRENT, 'all') == 5
+
+
+def test_legacy_rows_only_on_request(db_manager, stamped):
+    ids = stamped
+    assert ids[6] not in stale_ids(db_manager, 'taxonomy')
+    assert stale_ids(db_manager, 'taxonomy', include_legacy=True) == [ids[1], ids[6], ids[7]]
+
+
+def test_category_filter_and_keyset_paging(db_manager, stamped):
+    ids = stamped
+    assert stale_ids(db_manager, 'all', categories=[CATEGORY_B]) == [ids[7]]
+    
+    first = db_manager.get_stale_analyses(CURRENT, 'all', limit=2)
+    assert [row['Complaint_ID'] for row in first] == [ids[1], ids[2]]
+    assert first[0]['Category'] == CATEGORY_A
+    assert first[0]['full_comment']
+    
+    before = (first[-1]['date'], first[-1]['Complaint_ID'])
+    assert stale_ids(db_manager, 'all', limit=10, before=before) == [ids[3], ids[5], ids[7]]
+
+
+def test_rewritten_row_is_no_longer_stale(db_manager, stamped):
+    ids = stamped
+    db_manager.insert_analysis([dict(stamp(), Complaint_ID=ids[1], category=CATEGORY_A, reason=REASON)])
+    assert ids[1] not in stale_ids(db_manager)
+    
+    # Yeniden yazılan satır dağılımda tek kez sayılır
+    assert db_manager.get_final_analysis_stats_for_complaints(ids[:8])['categories'] == {CATEGORY_A: 7, CATEGORY_B: 1}
+
+
+def test_unknown_scope_is_rejected(db_manager):
+    with pytest.raises(ValueError):
+        db_manager.count_stale_analyses(CURRENT, 'everything')
+
+
+def test_reclassifier_clears_stale_rows(db_manager, complaint_ids, monkeypatch):
+    monkeypatch.setattr(Config, 'LLM_CACHE_MAX_ENTRIES', 0)
+    monkeypatch.setattr(Config, 'NEAR_DUPLICATE_ENABLED', False)
+    monkeypatch.setattr(Config, 'LOCAL_CLASSIFIER_ENABLED', False)
+    from agents.analysis_agent import AnalysisAgent
+    from agents.reclassifier import Reclassifier
+    
+    analysis_agent = AnalysisAgent(db_manager)
+    versions = analysis_agent.current_versions()
+    db_manager.insert_analysis([dict(stamp(taxonomy_version='eski', prompt_version=versions['prompt_version'],
+                                           model_name=versions['model_name']),
+                                     Complaint_ID=complaint_id, category=CATEGORY_A, reason=REASON)
+                                for complaint_id in complaint_ids])
+    
+    reclassifier = Reclassifier(db_manager, analysis_agent, batch_size=8, batches_per_minute=6000)
+    assert reclassifier.plan('taxonomy')['stale'] == 20
+    
+    metrics = reclassifier.run('taxonomy', limit=10)
+    assert metrics['reclassified'] == 10
+    assert db_manager.count_stale_analyses(versions, 'taxonomy') == 10
+    
+    reclassifier.run('taxonomy')
+    assert db_manager.count_stale_analyses(versions, 'all') == 0
@@ -0,0 +1,155 @@
+import os
+import threading
+from typing import Dict, List
+
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+
+class AnalyticsEngine:
+    """
+    DuckDB Analitik Motoru (opsiyonel)
+    - Trend, çapraz tablo ve dönem bazlı top-k sorgularını tek vektörel geçişte yapar
+    - Kaynak: SQLite dosyası (sıcak + arşiv partition'ları, DuckDB sqlite eklentisi ile)
+      ya da Parquet snapshot dizini (utils/snapshot_exporter.py çıktısı)
+    """
+
+    BUCKETS = ('day', 'week', 'month', 'quarter', 'year')
+    DIMENSIONS = {'category': 'Category', 'reason': 'Reason'}
+
+    def __init__(self, db_path: str, parquet_dir: str = None):
+        if duckdb is None:
+            raise ImportError("Analitik motor için duckdb kurulmalı (pip install duckdb)")
+
+        self.db_path = os.path.abspath(db_path)
+        self.parquet_dir = parquet_dir
+        self._conn = duckdb.connect()
+        self._lock = threading.Lock()
+        self._attached_partitions: List[str] = None
+
+        if parquet_dir:
+            pattern = os.path.join(os.path.abspath(parquet_dir), '**', '*.parquet')
+            self._conn.execute(f'''
+                CREATE VIEW facts AS
+                SELECT TRY_CAST(date AS TIMESTAMP) AS ts, Category, Reason
+                FROM read_parquet('{pattern}', hive_partitioning = true, union_by_name = true)
+            ''')
+        else:
+            try:
+                self._conn.execute('INSTALL sqlite')
+            except Exception as e:
+                # Çevrimdışı ortam: eklenti önceden kurulmuşsa LOAD yine çalışır
+                pass
+            try:
+                self._conn.execute('LOAD sqlite')
+            except Exception as e:
+                raise RuntimeError(
+                    f"DuckDB sqlite eklentisi yüklenemedi ({e}). "
+                    "Çevrimdışı kullanım için ANALYTICS_PARQUET_DIR ile Parquet snapshot dizinini verin."
+                )
+            self._conn.execute(f"ATTACH '{self.db_path}' AS hot (TYPE sqlite, READ_ONLY)")
+            self._sync_partitions()
+
+    def _sync_partitions(self):
+        """Arşiv kataloğundaki yeni partition'ları bağla ve facts view'ını yeniden kur"""
+        if self.parquet_dir:
+            return
+
+        with self._lock:
+            rows = self._conn.execute('SELECT month, path FROM hot.archive_partitions ORDER BY month').fetchall()
+            aliases = {f"cold_{month.replace('-', '_')}": path for month, path in rows}
+            if self._attached_partitions is not None and list(aliases) == self._attached_partitions:
+                return
+
+            for alias, path in aliases.items():
+                if alias not in (self._attached_partitions or []):
+                    self._conn.execute(f"ATTACH '{path}' AS {alias} (TYPE sqlite, READ_ONLY)")
+
+            # Kategori/sebep isimleri sıcak veritabanındaki boyut tablolarında
+            selects = []
+            for schema in ['hot'] + list(aliases):
+                selects.append(f'''
+                    SELECT TRY_CAST(c.date AS TIMESTAMP) AS ts, cd.Name AS Category, rd.Name AS Reason
+                    FROM {schema}.complaints c
+                    JOIN {schema}.analysis_codes a ON a.Complaint_ID = c.Complaint_ID
+                    LEFT JOIN hot.category_dim cd ON cd.Category_Code = a.Category_Code
+                    LEFT JOIN hot.reason_dim rd ON rd.Reason_Code = a.Reason_Code
+                ''')
+
+            self._conn.execute(f"CREATE OR REPLACE VIEW facts AS {' UNION ALL '.join(selects)}")
+            self._attached_partitions = list(aliases)
+
+    def _query(self, sql: str, params: List) -> List[tuple]:
+        """Thread başına ayrı cursor ile sorgu çalıştır"""
+        self._sync_partitions()
+        cursor = self._conn.cursor()
+        try:
+            return cursor.execute(sql, params).fetchall()
+        finally:
+            cursor.close()
+
+    def _validate(self, bucket: str = None, dimension: str = None):
+        if bucket is not None and bucket not in self.BUCKETS:
+            raise ValueError(f"Geçersiz periyot: {bucket} ({', '.join(self.BUCKETS)})")
+        if dimension is not None and dimension not in self.DIMENSIONS:
+            raise ValueError(f"Geçersiz boyut: {dimension} ({', '.join(self.DIMENSIONS)})")
+
+    def time_bucketed_counts(self, start_date: str, end_date: str, bucket: str = 'week',
+                             dimension: str = 'category') -> Dict[str, Dict[str, int]]:
+        """Periyot -> {kategori/sebep: adet}"""
+        self._validate(bucket, dimension)
+        column = self.DIMENSIONS[dimension]
+
+        rows = self._query(f'''
+            SELECT strftime(date_trunc('{bucket}', ts), '%Y-%m-%d') AS period, {column} AS value, COUNT(*) AS count
+            FROM facts
+            WHERE ts >= CAST(? AS DATE) AND ts < CAST(? AS DATE) + INTERVAL 1 DAY
+            AND {column} IS NOT NULL AND TRIM({column}) != ''
+            GROUP BY ALL
+            ORDER BY period, count DESC
+        ''', [start_date, end_date])
+
+        result: Dict[str, Dict[str, int]] = {}
+        for period, value, count in rows:
+            result.setdefault(period, {})[value] = count
+        return result
+
+    def cross_tab(self, start_date: str, end_date: str) -> Dict[str, Dict[str, int]]:
+        """Kategori -> {sebep: adet} matrisi"""
+        rows = self._query('''
+            SELECT Category, Reason, COUNT(*) AS count
+            FROM facts
+            WHERE ts >= CAST(? AS DATE) AND ts < CAST(? AS DATE) + INTERVAL 1 DAY
+            AND Category IS NOT NULL AND TRIM(Category) != ''
+            AND Reason IS NOT NULL AND TRIM(Reason) != ''
+            GROUP BY ALL
+            ORDER BY Category, count DESC
+        ''', [start_date, end_date])
+
+        result: Dict[str, Dict[str, int]] = {}
+        for category, reason, count in rows:
+            result.setdefault(category, {})[reason] = count
+        return result
+
+    def top_k_per_period(self, start_date: str, end_date: str, bucket: str = 'month',
+                         k: int = 5, dimension: str = 'category') -> Dict[str, Dict[str, int]]:
+        """Her periyotta en çok şikayet alan k kategori/sebep"""
+        self._validate(bucket, dimension)
+        column = self.DIMENSIONS[dimension]
+
+        rows = self._query(f'''
+            SELECT strftime(date_trunc('{bucket}', ts), '%Y-%m-%d') AS period, {column} AS value, COUNT(*) AS count
+            FROM facts
+            WHERE ts >= CAST(? AS DATE) AND ts < CAST(? AS DATE) + INTERVAL 1 DAY
+            AND {column} IS NOT NULL AND TRIM({column}) != ''
+            GROUP BY period, value
+            QUALIFY ROW_NUMBER() OVER (PARTITION BY period ORDER BY count DESC, value) <= ?
+            ORDER BY period, count DESC
+        ''', [start_date, end_date, k])
+
+        result: Dict[str, Dict[str, int]] = {}
+        for period, value, count in rows:
+            result.setdefault(period, {})[value] = count
+        return result
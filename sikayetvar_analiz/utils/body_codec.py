@@ -0,0 +1,112 @@
+import threading
+import zlib
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# zlib preset dictionary penceresi 32KB
+ZLIB_DICT_SIZE = 32 * 1024
+ZSTD_DICT_SIZE = 112 * 1024
+
+
+class BodyCodec:
+    """
+    Şikayet metni sıkıştırma
+    - Ortak, eğitilmiş sözlük ile sıkıştırır (kısa metinlerde oran çok daha iyi)
+    - zstandard kuruluysa zstd, değilse zlib preset dictionary kullanır
+    - Sözlükler ID ile kayıtlıdır, her satır kendi sözlük ID'sini taşır
+    """
+
+    def __init__(self):
+        self._dictionaries: Dict[int, Tuple[str, bytes]] = {}
+        self._zstd_dicts: Dict[int, object] = {}
+        self._local = threading.local()
+
+    @staticmethod
+    def train_dictionary(samples: List[str]) -> Tuple[str, bytes]:
+        """Örnek metinlerden paylaşılan sözlük eğit, (codec, sözlük) döndür"""
+        encoded = [s.encode('utf-8') for s in samples if s]
+
+        if zstandard is not None:
+            try:
+                trained = zstandard.train_dictionary(ZSTD_DICT_SIZE, encoded)
+                return 'zstd', trained.as_bytes()
+            except zstandard.ZstdError:
+                # Örnek sayısı eğitim için yetersiz - zlib sözlüğüne düş
+                pass
+
+        return 'zlib', BodyCodec._build_zlib_dictionary(samples)
+
+    @staticmethod
+    def _build_zlib_dictionary(samples: List[str]) -> bytes:
+        """Sık geçen kelimelerden zlib preset dictionary oluştur (en sık olanlar sonda)"""
+        counts = Counter()
+        for sample in samples:
+            counts.update(word for word in sample.split() if len(word) > 2)
+
+        # Kazanç ~ frekans * uzunluk; zlib yakın mesafeyi daha ucuz kodladığı için en değerliler sona
+        ranked = sorted(counts.items(), key=lambda item: item[1] * len(item[0]))
+        dictionary = b''
+        for word, count in reversed(ranked):
+            if count < 2:
+                continue
+            candidate = word.encode('utf-8') + b' ' + dictionary
+            if len(candidate) > ZLIB_DICT_SIZE:
+                break
+            dictionary = candidate
+        return dictionary
+
+    def register_dictionary(self, dict_id: int, codec: str, data: bytes):
+        """Sözlüğü kullanılabilir yap"""
+        self._dictionaries[dict_id] = (codec, data)
+        if codec == 'zstd':
+            if zstandard is None:
+                raise ImportError("Bu sözlük zstd ile eğitilmiş, zstandard kurulmalı (pip install zstandard)")
+            self._zstd_dicts[dict_id] = zstandard.ZstdCompressionDict(data)
+
+    def has_dictionary(self, dict_id: int) -> bool:
+        return dict_id in self._dictionaries
+
+    def compress(self, text: str, dict_id: int) -> bytes:
+        """Metni verilen sözlükle sıkıştır"""
+        codec, data = self._dictionaries[dict_id]
+        raw = text.encode('utf-8')
+
+        if codec == 'zstd':
+            return self._zstd(dict_id)[0].compress(raw)
+
+        compressor = zlib.compressobj(level=9, zdict=data)
+        return compressor.compress(raw) + compressor.flush()
+
+    def decompress(self, blob: bytes, dict_id: int) -> Optional[str]:
+        """Sıkıştırılmış metni aç"""
+        if blob is None:
+            return None
+
+        codec, data = self._dictionaries[dict_id]
+
+        if codec == 'zstd':
+            raw = self._zstd(dict_id)[1].decompress(blob)
+        else:
+            decompressor = zlib.decompressobj(zdict=data)
+            raw = decompressor.decompress(blob) + decompressor.flush()
+
+        return raw.decode('utf-8')
+
+    def _zstd(self, dict_id: int):
+        """Thread başına (compressor, decompressor) - zstandard nesneleri thread-safe değil"""
+        cache = getattr(self._local, 'zstd', None)
+        if cache is None:
+            cache = self._local.zstd = {}
+
+        if dict_id not in cache:
+            zstd_dict = self._zstd_dicts[dict_id]
+            cache[dict_id] = (
+                zstandard.ZstdCompressor(level=12, dict_data=zstd_dict),
+                zstandard.ZstdDecompressor(dict_data=zstd_dict)
+            )
+        return cache[dict_id]
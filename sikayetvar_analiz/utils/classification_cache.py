@@ -0,0 +1,84 @@
+import hashlib
+import threading
+from typing import Dict, List, Tuple
+
+from utils.text_normalizer import normalize_turkish
+
+
+class ClassificationCache:
+    """
+    LLM Sınıflandırma Önbelleği (kalıcı, içerik adresli)
+    - Anahtar: normalize edilmiş başlık + metin, prompt versiyonu ve model adının hash'i
+    - Aynı metin (tekrar paylaşım, yeniden import, silinen analiz) ikinci kez LLM'e gitmez
+    - Kayıtlar llm_cache tablosunda; boyut sınırı aşılınca en uzun süre kullanılmayanlar silinir
+    """
+
+    def __init__(self, db_manager, model_name: str, prompt_version: str, max_entries: int):
+        self.db_manager = db_manager
+        self.model_name = model_name
+        self.prompt_version = prompt_version
+        self.max_entries = max_entries
+
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def make_key(self, complaint: Dict) -> str:
+        """Şikayet içeriğinden önbellek anahtarı üret"""
+        # Büyük/küçük harf, Türkçe aksan ve boşluk farkları aynı anahtara düşsün
+        title = ' '.join(normalize_turkish(complaint.get('title') or '').split())
+        body = ' '.join(normalize_turkish(complaint.get('full_comment') or '').split())
+        content = '\x1f'.join([title, body, self.prompt_version, self.model_name])
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+    def lookup(self, complaints: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+        """(önbellekten gelen atamalar, LLM'e gidecek şikayetler)"""
+        keys = {complaint['Complaint_ID']: self.make_key(complaint) for complaint in complaints}
+        entries = self.db_manager.get_llm_cache_entries(list(set(keys.values())))
+
+        assignments = []
+        misses = []
+        for complaint in complaints:
+            entry = entries.get(keys[complaint['Complaint_ID']])
+            if entry:
+                assignments.append({
+                    "Complaint_ID": complaint['Complaint_ID'],
+                    "category": entry['category'],
+                    "reason": entry['reason']
+                })
+            else:
+                misses.append(complaint)
+
+        with self._lock:
+            self._hits += len(assignments)
+            self._misses += len(misses)
+
+        return assignments, misses
+
+    def store(self, complaints: List[Dict], assignments: List[Dict]) -> int:
+        """LLM'den gelen atamaları önbelleğe yaz"""
+        by_id = {complaint['Complaint_ID']: complaint for complaint in complaints}
+        entries = []
+        for assignment in assignments:
+            complaint = by_id.get(assignment['Complaint_ID'])
+            if complaint is None:
+                continue
+            entries.append({
+                "cache_key": self.make_key(complaint),
+                "category": assignment['category'],
+                "reason": assignment['reason']
+            })
+        return self.db_manager.put_llm_cache_entries(entries, self.max_entries)
+
+    def get_stats(self) -> Dict:
+        """İsabet oranı metrikleri"""
+        with self._lock:
+            hits, misses = self._hits, self._misses
+        total = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / total, 4) if total else 0.0,
+            "entries": self.db_manager.get_llm_cache_size(),
+            "max_entries": self.max_entries
+        }
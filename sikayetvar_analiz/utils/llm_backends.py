@@ -0,0 +1,452 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import urllib.request
+from datetime import datetime
+from typing import Dict, Iterator, List
+
+try:
+    import google.generativeai as genai
+except ImportError:
+    genai = None
+
+try:
+    # Toplu (batch) API yalnızca yeni SDK'da var - sadece toplu sınıflandırma için gerekli
+    from google import genai as genai_sdk
+except ImportError:
+    genai_sdk = None
+
+
+class GeminiBackend:
+    """Google Gemini (varsayılan, gerçek sağlayıcı)"""
+
+    def __init__(self, api_key: str, model_name: str = 'gemini-2.5-flash'):
+        if genai is None:
+            raise ImportError("Gemini backend için google-generativeai kurulmalı (pip install google-generativeai)")
+        if not api_key:
+            raise ValueError("Google API key bulunamadı!")
+
+        genai.configure(api_key=api_key)
+        self.api_key = api_key
+        self.model_name = model_name
+        self.model = genai.GenerativeModel(model_name)
+        self._batch_client = None
+
+    @staticmethod
+    def _read_usage(response, usage: Dict):
+        """usage_metadata'daki token sayılarını usage sözlüğüne yaz"""
+        metadata = getattr(response, 'usage_metadata', None)
+        if usage is not None and metadata:
+            usage["prompt_tokens"] = metadata.prompt_token_count
+            usage["response_tokens"] = metadata.candidates_token_count
+
+    @staticmethod
+    def _request_options(timeout: float = None) -> Dict:
+        # Süre SDK'ya da verilir: çağıran vazgeçtiğinde arka plandaki istek de kapanır
+        return {'timeout': timeout} if timeout else {}
+
+    def generate(self, prompt: str, usage: Dict = None, timeout: float = None) -> str:
+        response = self.model.generate_content(prompt, request_options=self._request_options(timeout))
+        self._read_usage(response, usage)
+        return response.text if response and response.text else ""
+
+    def generate_stream(self, prompt: str, usage: Dict = None, timeout: float = None) -> Iterator[str]:
+        for chunk in self.model.generate_content(prompt, stream=True,
+                                                 request_options=self._request_options(timeout)):
+            # Toplam token sayıları son parçada gelir
+            self._read_usage(chunk, usage)
+            try:
+                text = chunk.text
+            except ValueError as e:
+                # Metin içermeyen parça (ör. sadece finish_reason)
+                continue
+            if text:
+                yield text
+
+    def count_tokens(self, text: str) -> int:
+        return self.model.count_tokens(text).total_tokens
+
+    def _batches(self):
+        if genai_sdk is None:
+            raise ImportError("Toplu sınıflandırma için google-genai kurulmalı (pip install google-genai)")
+        if self._batch_client is None:
+            self._batch_client = genai_sdk.Client(api_key=self.api_key)
+        return self._batch_client.batches
+
+    def submit_batch(self, prompts: List[str], display_name: str) -> str:
+        """Prompt'ları Batch API'ye satır içi iş olarak gönder, iş adını döndür"""
+        job = self._batches().create(
+            model=self.model_name,
+            src=[{'contents': [{'parts': [{'text': prompt}], 'role': 'user'}]} for prompt in prompts],
+            config={'display_name': display_name}
+        )
+        return job.name
+
+    def get_batch(self, name: str) -> Dict:
+        """İş durumu: running | succeeded (results: prompt sırasıyla metin ya da None) | failed"""
+        job = self._batches().get(name=name)
+        state = job.state.name if job.state else ''
+        if state == 'JOB_STATE_SUCCEEDED':
+            results, usage = [], {"prompt_tokens": 0, "response_tokens": 0}
+            for item in job.dest.inlined_responses:
+                if item.response is None:
+                    results.append(None)
+                    continue
+                item_usage = {}
+                self._read_usage(item.response, item_usage)
+                for key in usage:
+                    usage[key] += item_usage.get(key) or 0
+                try:
+                    results.append(item.response.text)
+                except ValueError as e:
+                    results.append(None)
+            return {"state": "succeeded", "results": results, "usage": usage}
+        if state in ('JOB_STATE_FAILED', 'JOB_STATE_CANCELLED', 'JOB_STATE_EXPIRED'):
+            return {"state": "failed", "error": str(job.error or state)}
+        return {"state": "running"}
+
+
+class FakeBackend:
+    """
+    Deterministik yerel LLM yerine geçen (ağsız benchmark / yük testi)
+    - Sınıflandırma prompt'unu (GİRİŞ satırları) ve komut prompt'unu (KULLANICI KOMUTU) anlar
+    - Gecikme = latency_ms + çıktı token'ı / tokens_per_second; aynı anda en fazla max_concurrency istek
+    - Hata: aynı prompt + deneme sırası için her zaman aynı sonuç (error_rate olasılıkla)
+    - Kuyruk gecikmesi: isteklerin slow_rate kadarı slow_latency_ms ek bekler (hedge / timeout denemeleri için)
+    - Toplu işler batch_dir'de dosya olarak tutulur (süreç yeniden başlasa da sorgulanabilir),
+      batch_turnaround_seconds sonra tamamlanır
+    """
+
+    MONTHS = {
+        'ocak': 1, 'şubat': 2, 'mart': 3, 'nisan': 4, 'mayıs': 5, 'haziran': 6,
+        'temmuz': 7, 'ağustos': 8, 'eylül': 9, 'ekim': 10, 'kasım': 11, 'aralık': 12
+    }
+
+    def __init__(self, latency_ms: float = 200, tokens_per_second: float = 200, error_rate: float = 0.0,
+                 max_concurrency: int = 8, seed: int = 0, batch_dir: str = None,
+                 batch_turnaround_seconds: float = 5, slow_rate: float = 0.0, slow_latency_ms: float = 0):
+        from config import Config
+        from utils.local_classifier import LocalClassifier
+
+        self.model_name = 'fake-llm'
+        self.latency = latency_ms / 1000.0
+        self.tokens_per_second = tokens_per_second
+        self.error_rate = error_rate
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency_ms / 1000.0
+        self.seed = seed
+        self.batch_dir = batch_dir or Config.FAKE_LLM_BATCH_DIR
+        self.batch_turnaround = batch_turnaround_seconds
+        self.categories = Config.CATEGORIES
+        self.reasons = Config.REASONS
+        # Etiketler sözlük eşleşmesinden, eşleşmeyenler metnin hash'inden (threshold 0: her zaman tahmin)
+        self.classifier = LocalClassifier(Config.CATEGORIES, Config.REASONS, threshold=0.0)
+        self._slots = threading.Semaphore(max_concurrency)
+        self._attempts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "errors": 0, "slow": 0, "input_tokens": 0, "output_tokens": 0}
+
+    @staticmethod
+    def count_tokens(text: str) -> int:
+        return len(text) // 3 + 1
+
+    def _hash(self, *parts) -> int:
+        digest = hashlib.sha256('|'.join(str(part) for part in (self.seed,) + parts).encode('utf-8')).digest()
+        return int.from_bytes(digest[:8], 'big')
+
+    def _draw(self, prompt: str, kind: str, rate: float) -> bool:
+        """Aynı prompt'un kaçıncı denemesi olduğuna göre deterministik karar (kind: error | slow)"""
+        if rate <= 0:
+            return False
+        key = hashlib.sha256(prompt.encode('utf-8')).hexdigest() + kind
+        with self._lock:
+            attempt = self._attempts.get(key, 0)
+            self._attempts[key] = attempt + 1
+        return self._hash(key, attempt) / 2 ** 64 < rate
+
+    def _should_fail(self, prompt: str) -> bool:
+        return self._draw(prompt, 'error', self.error_rate)
+
+    def _respond(self, prompt: str) -> str:
+        if 'KULLANICI KOMUTU:' in prompt:
+            return self._respond_command(prompt)
+        if 'GİRİŞ:' in prompt:
+            return self._respond_classification(prompt)
+        return "Tamam."
+
+    def _respond_classification(self, prompt: str) -> str:
+        items = []
+        for line in prompt.split('GİRİŞ:', 1)[1].split('\n'):
+            line = line.strip()
+            if not line.startswith('{'):
+                continue
+            try:
+                item = json.loads(line)
+            except json.JSONDecodeError as e:
+                continue
+            if isinstance(item, dict) and 'i' in item:
+                items.append(item)
+
+        results = self.classifier.classify_many(
+            [{'title': item.get('t', ''), 'full_comment': item.get('b', '')} for item in items])
+
+        lines = []
+        for item, result in zip(items, results):
+            text_hash = self._hash(item.get('t', ''), item.get('b', ''))
+            category = result['category'] or self.categories[text_hash % len(self.categories)]
+            reason = result['reason'] or self.reasons[(text_hash >> 16) % len(self.reasons)]
+            lines.append(json.dumps({"i": item['i'], "c": category, "r": reason}, ensure_ascii=False))
+        return '\n'.join(lines)
+
+    def _respond_command(self, prompt: str) -> str:
+        match = re.search(r'KULLANICI KOMUTU: "(.*)"', prompt)
+        command = (match.group(1) if match else '').lower()
+        # "ocak 2024" gibi ay adı geçen komutlarda yıl şikayet/gün sayısı sanılmasın
+        year = re.search(r'\b(20\d{2})\b', command)
+        counts = command
+        if year and any(name in command for name in self.MONTHS):
+            counts = command.replace(year.group(1), '')
+
+        patterns = [
+            (r'(\d+)\s+saat', lambda n: {"command_type": "hours_back", "parameters": {"hours": n}}),
+            (r'(\d+)\s+gün', lambda n: {"command_type": "days_back", "parameters": {"days": n}}),
+            (r'(\d+)\s+hafta', lambda n: {"command_type": "days_back", "parameters": {"days": n * 7}}),
+            (r'(\d+)\s+şikayet', lambda n: {"command_type": "last_count", "parameters": {"count": n}}),
+        ]
+        for pattern, build in patterns:
+            found = re.search(pattern, counts)
+            if found:
+                result = build(int(found.group(1)))
+                return json.dumps(dict(success=True, description=command, **result), ensure_ascii=False)
+
+        for name, month in self.MONTHS.items():
+            if name in command:
+                # Yıl komutta yoksa içinde bulunulan yıl
+                return json.dumps({"success": True, "command_type": "month",
+                                   "parameters": {"year": int(year.group(1)) if year else datetime.now().year,
+                                                  "month": month},
+                                   "description": command},
+                                  ensure_ascii=False)
+
+        return json.dumps({"success": True, "command_type": "chat",
+                           "message": "Merhaba! Vestel şikayet analizi için buradayım."}, ensure_ascii=False)
+
+    def generate(self, prompt: str, usage: Dict = None, timeout: float = None) -> str:
+        return ''.join(self.generate_stream(prompt, usage))
+
+    def generate_stream(self, prompt: str, usage: Dict = None, timeout: float = None) -> Iterator[str]:
+        with self._slots:
+            slow = self._draw(prompt, 'slow', self.slow_rate)
+            time.sleep(self.latency + (self.slow_latency if slow else 0))
+            fail = self._should_fail(prompt)
+            response = self._respond(prompt)
+            lines = response.split('\n')
+            prompt_tokens, response_tokens = self.count_tokens(prompt), self.count_tokens(response)
+            with self._lock:
+                self.stats["requests"] += 1
+                self.stats["errors"] += int(fail)
+                self.stats["slow"] += int(slow)
+                self.stats["input_tokens"] += prompt_tokens
+                self.stats["output_tokens"] += response_tokens
+            if usage is not None:
+                usage.update(prompt_tokens=prompt_tokens, response_tokens=response_tokens)
+
+            # Hatalı istekte yanıt yarıda kesilir (akış modundaki kısmi sonuç davranışı)
+            cutoff = len(lines) // 2 if fail else len(lines)
+            for index, line in enumerate(lines[:cutoff]):
+                text = line + ('\n' if index < len(lines) - 1 else '')
+                if self.tokens_per_second > 0:
+                    time.sleep(self.count_tokens(text) / self.tokens_per_second)
+                yield text
+
+            if fail:
+                raise RuntimeError("Fake LLM: simüle edilmiş sağlayıcı hatası (503)")
+
+    def _batch_path(self, name: str) -> str:
+        return os.path.join(self.batch_dir, name.replace('/', '_') + '.json')
+
+    def submit_batch(self, prompts: List[str], display_name: str) -> str:
+        os.makedirs(self.batch_dir, exist_ok=True)
+        name = f"batches/fake-{self._hash(display_name, time.time()) % 16 ** 12:012x}"
+        with open(self._batch_path(name), 'w', encoding='utf-8') as f:
+            json.dump({"display_name": display_name, "created": time.time(), "prompts": prompts}, f,
+                      ensure_ascii=False)
+        return name
+
+    def get_batch(self, name: str) -> Dict:
+        try:
+            with open(self._batch_path(name), encoding='utf-8') as f:
+                job = json.load(f)
+        except FileNotFoundError as e:
+            return {"state": "failed", "error": f"Toplu iş bulunamadı: {name}"}
+        if time.time() - job["created"] < self.batch_turnaround:
+            return {"state": "running"}
+
+        # Hatalı istekler sonuçsuz döner (Batch API'deki istek bazlı hata gibi)
+        results, usage = [], {"prompt_tokens": 0, "response_tokens": 0}
+        for prompt in job["prompts"]:
+            if self._should_fail(prompt):
+                results.append(None)
+                continue
+            response = self._respond(prompt)
+            usage["prompt_tokens"] += self.count_tokens(prompt)
+            usage["response_tokens"] += self.count_tokens(response)
+            results.append(response)
+        with self._lock:
+            self.stats["requests"] += len(job["prompts"])
+            self.stats["errors"] += results.count(None)
+            self.stats["input_tokens"] += usage["prompt_tokens"]
+            self.stats["output_tokens"] += usage["response_tokens"]
+        return {"state": "succeeded", "results": results, "usage": usage}
+
+
+class HTTPBackend:
+    """Ayrı süreçte çalışan yerel LLM sunucusu (python utils/llm_backends.py --port 8765)"""
+
+    def __init__(self, url: str, timeout: float = 120):
+        if not url:
+            raise ValueError("http backend için LLM_BACKEND_URL tanımlanmalı")
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+        with urllib.request.urlopen(f"{self.url}/info", timeout=timeout) as response:
+            self.model_name = json.loads(response.read()).get('model_name', 'http-llm')
+
+    def _post(self, prompt: str, stream: bool, timeout: float = None):
+        request = urllib.request.Request(
+            f"{self.url}/generate",
+            data=json.dumps({"prompt": prompt, "stream": stream}).encode('utf-8'),
+            headers={'Content-Type': 'application/json'}
+        )
+        return urllib.request.urlopen(request, timeout=min(self.timeout, timeout or self.timeout))
+
+    def generate(self, prompt: str, usage: Dict = None, timeout: float = None) -> str:
+        with self._post(prompt, stream=False, timeout=timeout) as response:
+            payload = json.loads(response.read())
+        if usage is not None:
+            usage.update(payload.get('usage', {}))
+        return payload['text']
+
+    def generate_stream(self, prompt: str, usage: Dict = None, timeout: float = None) -> Iterator[str]:
+        # Akışta kullanım bilgisi gelmez - token sayıları tahmin edilir
+        received = []
+        with self._post(prompt, stream=True, timeout=timeout) as response:
+            for line in response:
+                text = line.decode('utf-8')
+                received.append(text)
+                yield text
+        if usage is not None:
+            usage.update(prompt_tokens=self.count_tokens(prompt), response_tokens=self.count_tokens(''.join(received)))
+
+    @staticmethod
+    def count_tokens(text: str) -> int:
+        return len(text) // 3 + 1
+
+
+def create_backend(name: str = None):
+    """Config.LLM_BACKEND'e göre backend oluştur: gemini | fake | http"""
+    from config import Config
+
+    name = (name or Config.LLM_BACKEND).lower()
+    if name == 'gemini':
+        return GeminiBackend(Config.GOOGLE_API_KEY)
+    if name == 'fake':
+        return FakeBackend(
+            latency_ms=Config.FAKE_LLM_LATENCY_MS,
+            tokens_per_second=Config.FAKE_LLM_TOKENS_PER_SECOND,
+            error_rate=Config.FAKE_LLM_ERROR_RATE,
+            max_concurrency=Config.FAKE_LLM_MAX_CONCURRENCY,
+            seed=Config.FAKE_LLM_SEED,
+            batch_dir=Config.FAKE_LLM_BATCH_DIR,
+            batch_turnaround_seconds=Config.FAKE_LLM_BATCH_TURNAROUND_SECONDS,
+            slow_rate=Config.FAKE_LLM_SLOW_RATE,
+            slow_latency_ms=Config.FAKE_LLM_SLOW_LATENCY_MS
+        )
+    if name == 'http':
+        return HTTPBackend(Config.LLM_BACKEND_URL)
+    raise ValueError(f"Bilinmeyen LLM backend: {name} (gemini, fake, http)")
+
+
+def serve(backend: FakeBackend, host: str = '127.0.0.1', port: int = 8765):
+    """FakeBackend'i HTTP üzerinden sun (çoklu süreç yük testi için)"""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.0'
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status: int, body: bytes, content_type: str = 'application/json'):
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == '/info':
+                self._send(200, json.dumps({"model_name": backend.model_name}).encode('utf-8'))
+            else:
+                self._send(404, b'{}')
+
+        def do_POST(self):
+            if self.path != '/generate':
+                self._send(404, b'{}')
+                return
+
+            payload = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+            try:
+                if not payload.get('stream'):
+                    usage = {}
+                    text = backend.generate(payload['prompt'], usage)
+                    self._send(200, json.dumps({"text": text, "usage": usage}, ensure_ascii=False).encode('utf-8'))
+                    return
+
+                # Uzunluk bilinmiyor: HTTP/1.0, bağlantı kapanınca yanıt biter
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; charset=utf-8')
+                self.end_headers()
+                for text in backend.generate_stream(payload['prompt']):
+                    self.wfile.write(text.encode('utf-8'))
+                    self.wfile.flush()
+            except RuntimeError as e:
+                # Akış başladıysa bağlantı kesilir, istemci kısmi yanıt görür
+                if not payload.get('stream'):
+                    self._send(503, json.dumps({"error": str(e)}, ensure_ascii=False).encode('utf-8'))
+                else:
+                    self.close_connection = True
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    import argparse
+    import os
+    import sys
+
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from config import Config
+
+    parser = argparse.ArgumentParser(description="Deterministik yerel LLM sunucusu (LLM_BACKEND=http ile kullanılır)")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency-ms', type=float, default=Config.FAKE_LLM_LATENCY_MS)
+    parser.add_argument('--tokens-per-second', type=float, default=Config.FAKE_LLM_TOKENS_PER_SECOND)
+    parser.add_argument('--error-rate', type=float, default=Config.FAKE_LLM_ERROR_RATE)
+    parser.add_argument('--max-concurrency', type=int, default=Config.FAKE_LLM_MAX_CONCURRENCY)
+    parser.add_argument('--seed', type=int, default=Config.FAKE_LLM_SEED)
+    parser.add_argument('--slow-rate', type=float, default=Config.FAKE_LLM_SLOW_RATE)
+    parser.add_argument('--slow-latency-ms', type=float, default=Config.FAKE_LLM_SLOW_LATENCY_MS)
+    args = parser.parse_args()
+
+    print(f"Yerel LLM sunucusu: http://{args.host}:{args.port}")
+    serve(FakeBackend(args.latency_ms, args.tokens_per_second, args.error_rate, args.max_concurrency, args.seed,
+                      slow_rate=args.slow_rate, slow_latency_ms=args.slow_latency_ms),
+          args.host, args.port)
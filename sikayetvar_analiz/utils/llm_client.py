@@ -1,25 +1,243 @@
-import google.generativeai as genai
-from typing import Dict
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Iterator
 from config import Config
+from utils.llm_backends import create_backend
+from utils.llm_metrics import LLMMetrics
+from utils.llm_resilience import CircuitBreaker, CircuitOpenError, LLMTimeoutError, backoff_delay, is_retryable
+from utils.rate_limiter import RateLimiter
 
 class LLMClient:
-    def __init__(self):
-        if not Config.GOOGLE_API_KEY:
-            raise ValueError("Google API key bulunamadı!")
-        
-        genai.configure(api_key=Config.GOOGLE_API_KEY)
-        self.model = genai.GenerativeModel('gemini-2.5-flash')
+    # Tüm LLMClient örnekleri (root + analiz agent) aynı sağlayıcı kotasını paylaşır
+    rate_limiter = RateLimiter(Config.LLM_REQUESTS_PER_MINUTE)
+    # Çağrı ölçümleri de tüm örnekler için ortak
+    metrics = LLMMetrics()
+    # Sağlayıcı sağlığı da ortak: bir agentın gördüğü kesinti diğerlerini de yedek yola geçirir
+    breaker = CircuitBreaker(Config.LLM_BREAKER_FAILURES, Config.LLM_BREAKER_RESET_SECONDS)
+    # Süreli çağrılar bu havuzda çalışır; süresi dolan çağrıyı çağıran beklemez, arka planda biter
+    _executor = ThreadPoolExecutor(max_workers=Config.LLM_CALL_THREADS, thread_name_prefix='llm-call')
     
-    def generate_content(self, prompt: str) -> str:
-        """LLM'ye prompt gönder ve yanıt al"""
-        try:
+    def __init__(self, backend=None):
+        # Backend: Config.LLM_BACKEND (gemini | fake | http) ya da doğrudan verilen örnek
+        self.backend = backend or create_backend()
+        self.model_name = self.backend.model_name
+    
+    def available(self) -> bool:
+        """Sağlayıcı kullanılabilir mi (circuit breaker açıksa çağıranlar yerel yedeğe geçer)"""
+        return self.breaker.available()
+    
+    def provider_failing(self) -> bool:
+        """Breaker açık ya da son çağrı geçici sağlayıcı hatası verdi - sonuçsuz işin deneme hakkı tüketilmemeli"""
+        return not self.breaker.healthy()
+    
+    def generate_content(self, prompt: str, call_site: str = 'other', attempt: int = 0,
+                         timeout: float = None) -> str:
+        """
+        LLM'ye prompt gönder ve yanıt al (call_site: ölçümlerde çağrı yeri, attempt > 0: tekrar deneme)
+        timeout: tekrar denemeler dahil toplam süre (varsayılan LLM_TIMEOUT_SECONDS); aşılırsa LLMTimeoutError,
+        circuit breaker açıksa çağrı gönderilmeden CircuitOpenError
+        """
+        deadline = time.monotonic() + (timeout or Config.LLM_TIMEOUT_SECONDS)
+        retry = 0
+        while True:
+            if not self.breaker.allow():
+                raise CircuitOpenError("LLM sağlayıcısı geçici olarak devre dışı (circuit breaker açık)")
+            self.rate_limiter.acquire()
+            try:
+                response = self._call_with_deadline(prompt, call_site, attempt + retry, deadline)
             
-            response = self.model.generate_content(prompt)
+            except Exception as e:
+                delay = self._on_error(e, retry, deadline)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                retry += 1
+                continue
             
-            if response and response.text:
-                return response.text.strip()
+            self.breaker.record_success()
+            if response:
+                return response.strip()
             else:
                 return ""
-                
+    
+    def _on_error(self, error: Exception, retry: int, deadline: float):
+        """Breaker'ı güncelle; tekrar denenecekse bekleme süresi, denenmeyecekse None"""
+        if not is_retryable(error):
+            # Sağlayıcı yanıt verdi (ör. geçersiz istek) - kesinti sayılmaz
+            self.breaker.record_success()
+            return None
+        
+        self.breaker.record_failure()
+        delay = backoff_delay(retry, Config.LLM_RETRY_BACKOFF_SECONDS)
+        if retry >= Config.LLM_RETRIES or time.monotonic() + delay >= deadline:
+            return None
+        return delay
+    
+    def _call_with_deadline(self, prompt: str, call_site: str, attempt: int, deadline: float) -> str:
+        """Çağrıyı süre sınırıyla çalıştır; yanıt p95'i aşarsa (LLM_HEDGE_ENABLED) kopyasını da gönder"""
+        futures = {self._executor.submit(self._timed_generate, prompt, call_site, attempt, deadline)}
+        hedge_at = self._hedge_at(call_site)
+        
+        last_error = None
+        while futures:
+            now = time.monotonic()
+            if now >= deadline:
+                break
+            wake_at = min(deadline, hedge_at) if hedge_at else deadline
+            done, futures = wait(futures, timeout=wake_at - now, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                last_error = future.exception()
+            
+            # Kota varsa tek kopya - hedge hiçbir zaman hız sınırı için beklemez
+            if hedge_at and time.monotonic() >= hedge_at and futures:
+                hedge_at = None
+                if self.rate_limiter.try_acquire():
+                    futures.add(self._executor.submit(
+                        self._timed_generate, prompt, f"{call_site}_hedge", attempt, deadline))
+        
+        if futures or last_error is None:
+            raise LLMTimeoutError(f"LLM çağrısı süresinde tamamlanmadı ({call_site})")
+        raise last_error
+    
+    def _hedge_at(self, call_site: str, first_chunk: bool = False):
+        """Kopya isteğin gönderileceği an (p95 gecikme sonrası); hedge kapalıysa ya da örnek azsa None"""
+        if not Config.LLM_HEDGE_ENABLED:
+            return None
+        p95_ms = self.metrics.latency_quantile(call_site, 0.95, Config.LLM_HEDGE_MIN_SAMPLES, first_chunk=first_chunk)
+        if p95_ms is None:
+            return None
+        return time.monotonic() + p95_ms / 1000
+    
+    def _timed_generate(self, prompt: str, call_site: str, attempt: int, deadline: float) -> str:
+        usage = {}
+        started = time.perf_counter()
+        try:
+            response = self.backend.generate(prompt, usage, timeout=max(deadline - time.monotonic(), 0.1))
+        
+        except Exception as e:
+            self._record(call_site, started, usage, attempt, error=str(e))
+            raise
+        
+        self._record(call_site, started, usage, attempt)
+        return response
+    
+    def generate_content_stream(self, prompt: str, call_site: str = 'other', attempt: int = 0,
+                                timeout: float = None) -> Iterator[str]:
+        """
+        LLM yanıtını parça parça al (parçalar satır sınırına denk gelmeyebilir)
+        Süre tüm akış için geçerlidir; henüz parça gelmeden oluşan geçici hatada istek tekrar gönderilir
+        Hedge: ilk parça p95 süresinde gelmezse kopya akış açılır, ilk parçayı veren akış kullanılır
+        """
+        deadline = time.monotonic() + (timeout or Config.LLM_TIMEOUT_SECONDS)
+        retry = 0
+        while True:
+            if not self.breaker.allow():
+                raise CircuitOpenError("LLM sağlayıcısı geçici olarak devre dışı (circuit breaker açık)")
+            self.rate_limiter.acquire()
+            
+            # Akış kaynağı -> iptal işareti (0: asıl istek, 1: hedge kopyası)
+            chunks = queue.Queue()
+            sources = {0: threading.Event()}
+            self._executor.submit(self._produce_stream, prompt, call_site, attempt + retry, deadline,
+                                  chunks, sources[0], 0)
+            hedge_at = self._hedge_at(call_site, first_chunk=True)
+            leader = None
+            finished = set()
+            received = False
+            try:
+                while True:
+                    now = time.monotonic()
+                    if now >= deadline:
+                        raise LLMTimeoutError(f"LLM akışı süresinde tamamlanmadı ({call_site})")
+                    wake_at = min(deadline, hedge_at) if hedge_at else deadline
+                    try:
+                        source, kind, value = chunks.get(timeout=wake_at - now)
+                    except queue.Empty:
+                        if hedge_at and leader is None and time.monotonic() >= hedge_at:
+                            hedge_at = None
+                            if self.rate_limiter.try_acquire():
+                                sources[1] = threading.Event()
+                                self._executor.submit(self._produce_stream, prompt, f"{call_site}_hedge",
+                                                      attempt + retry, deadline, chunks, sources[1], 1)
+                        continue
+                    
+                    if leader is not None and source != leader:
+                        continue
+                    if kind == 'error':
+                        finished.add(source)
+                        # Diğer kopya hâlâ sürüyorsa onu bekle
+                        if leader is None and len(finished) < len(sources):
+                            continue
+                        raise value
+                    if kind == 'done':
+                        break
+                    if leader is None:
+                        # İlk parçayı veren akış kazanır, diğeri bırakılır
+                        leader = source
+                        hedge_at = None
+                        for other, other_cancelled in sources.items():
+                            if other != source:
+                                other_cancelled.set()
+                    received = True
+                    yield value
+            
+            except GeneratorExit:
+                # Çağıran yanıtın geri kalanını istemedi - sağlayıcı yanıt veriyordu
+                self.breaker.record_success()
+                raise
+            except Exception as e:
+                delay = self._on_error(e, retry, deadline)
+                # Parça iletildiyse tekrar gönderilmez - çağıran kısmi yanıtı zaten işledi
+                if delay is None or received:
+                    raise
+                time.sleep(delay)
+                retry += 1
+                continue
+            finally:
+                for cancelled in list(sources.values()):
+                    cancelled.set()
+            
+            self.breaker.record_success()
+            return
+    
+    def _produce_stream(self, prompt: str, call_site: str, attempt: int, deadline: float,
+                        chunks: queue.Queue, cancelled: threading.Event, source: int = 0):
+        """Akışı havuz thread'inde oku, parçaları kuyruğa aktar (çağıran vazgeçince bırakır)"""
+        usage = {}
+        started = time.perf_counter()
+        first_chunk_ms = None
+        error = None
+        try:
+            for text in self.backend.generate_stream(prompt, usage, timeout=max(deadline - time.monotonic(), 0.1)):
+                if first_chunk_ms is None:
+                    first_chunk_ms = (time.perf_counter() - started) * 1000
+                if cancelled.is_set():
+                    break
+                chunks.put((source, 'chunk', text))
+            chunks.put((source, 'done', None))
+        except Exception as e:
+            error = str(e)
+            chunks.put((source, 'error', e))
+        finally:
+            # Yanıt yarıda kesildiyse de (hata ya da çağıran bıraktı) kaydedilir
+            self._record(call_site, started, usage, attempt, error=error, streamed=True,
+                         first_chunk_ms=first_chunk_ms)
+    
+    def _record(self, call_site: str, started: float, usage: Dict, attempt: int, error: str = None,
+                streamed: bool = False, first_chunk_ms: float = None):
+        self.metrics.record(
+            call_site, self.model_name, (time.perf_counter() - started) * 1000,
+            prompt_tokens=usage.get("prompt_tokens", 0), response_tokens=usage.get("response_tokens", 0),
+            attempt=attempt, error=error, streamed=streamed, first_chunk_ms=first_chunk_ms
+        )
+    
+    def count_tokens(self, text: str) -> int:
+        """Metnin model tokenizer'ına göre token sayısı (API erişilemezse kaba tahmin)"""
+        try:
+            return self.backend.count_tokens(text)
         except Exception as e:
-            raise
\ No newline at end of file
+            return len(text) // 3 + 1
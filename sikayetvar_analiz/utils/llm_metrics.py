@@ -0,0 +1,179 @@
+import atexit
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from config import Config
+
+# Gecikme histogram kovaları (ms, üst sınır dahil)
+LATENCY_BUCKETS_MS = [100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000]
+# Hedge gecikmesi için çağrı yeri başına tutulan son başarılı çağrı sayısı
+RECENT_LATENCY_WINDOW = 200
+
+
+def estimate_cost(prompt_tokens: int, response_tokens: int, call_site: str = None) -> float:
+    """Config'teki milyon token fiyatlarına göre USD maliyet (toplu işler Batch API fiyatıyla)"""
+    factor = Config.LLM_BATCH_PRICE_FACTOR if call_site == 'bulk_batch' else 1.0
+    return factor * (prompt_tokens * Config.LLM_PRICE_INPUT_PER_MTOK
+                     + response_tokens * Config.LLM_PRICE_OUTPUT_PER_MTOK) / 1_000_000
+
+
+class LLMMetrics:
+    """
+    LLM Çağrı Ölçümleri (thread-safe)
+    - Her çağrı: çağrı yeri (root_command, analysis_batch, analysis_gap_retry...), gecikme, ilk parça süresi,
+      prompt/yanıt token'ı (usage_metadata), deneme no ve hata
+    - Bellekte çağrı yeri başına gecikme histogramı ve toplamlar
+    - Maliyet raporu için llm_calls tablosuna yazılır (Config.LLM_METRICS_PERSIST); çağrı yolunda
+      veritabanına dokunulmaz, satırlar bellekte biriktirilip arka plan thread'inde toplu yazılır
+    """
+
+    def __init__(self, persist: bool = None):
+        self.persist = Config.LLM_METRICS_PERSIST if persist is None else persist
+        self._lock = threading.Lock()
+        self._sites: Dict[str, Dict] = {}
+        self._db_manager = None
+        # Henüz yazılmamış llm_calls satırları
+        self._pending: List[Dict] = []
+        self._flush_lock = threading.Lock()
+        self._flush_event = threading.Event()
+        self._flusher = None
+        if self.persist:
+            # Süreç kapanırken bekleyenler kaybolmasın
+            atexit.register(self.flush)
+
+    def _site(self, call_site: str) -> Dict:
+        site = self._sites.get(call_site)
+        if site is None:
+            site = self._sites[call_site] = {
+                "calls": 0, "errors": 0, "retries": 0, "streamed": 0,
+                "prompt_tokens": 0, "response_tokens": 0, "latency_ms_total": 0.0,
+                "buckets": [0] * (len(LATENCY_BUCKETS_MS) + 1),
+                "recent": deque(maxlen=RECENT_LATENCY_WINDOW),
+                "recent_first_chunk": deque(maxlen=RECENT_LATENCY_WINDOW)
+            }
+        return site
+
+    def record(self, call_site: str, model_name: str, latency_ms: float, prompt_tokens: int = 0,
+               response_tokens: int = 0, attempt: int = 0, error: str = None, streamed: bool = False,
+               first_chunk_ms: Optional[float] = None):
+        """Tek çağrıyı kaydet"""
+        prompt_tokens = prompt_tokens or 0
+        response_tokens = response_tokens or 0
+        bucket = next((index for index, bound in enumerate(LATENCY_BUCKETS_MS) if latency_ms <= bound),
+                      len(LATENCY_BUCKETS_MS))
+        pending = 0
+
+        with self._lock:
+            site = self._site(call_site)
+            site["calls"] += 1
+            site["errors"] += int(error is not None)
+            site["retries"] += int(attempt > 0)
+            site["streamed"] += int(streamed)
+            site["prompt_tokens"] += prompt_tokens
+            site["response_tokens"] += response_tokens
+            site["latency_ms_total"] += latency_ms
+            site["buckets"][bucket] += 1
+            if error is None:
+                site["recent"].append(latency_ms)
+            if first_chunk_ms is not None:
+                site["recent_first_chunk"].append(first_chunk_ms)
+
+            if self.persist:
+                self._pending.append({
+                    "call_site": call_site,
+                    "model_name": model_name,
+                    "started_at": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                    "latency_ms": round(latency_ms, 1),
+                    "first_chunk_ms": round(first_chunk_ms, 1) if first_chunk_ms is not None else None,
+                    "prompt_tokens": prompt_tokens,
+                    "response_tokens": response_tokens,
+                    "attempt": attempt,
+                    "error": error
+                })
+                pending = len(self._pending)
+                self._start_flusher()
+
+        if pending >= Config.LLM_METRICS_FLUSH_SIZE:
+            self._flush_event.set()
+
+    def _start_flusher(self):
+        # self._lock altında çağrılır
+        if self._flusher is None or not self._flusher.is_alive():
+            self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+            self._flusher.start()
+
+    def _flush_loop(self):
+        while True:
+            self._flush_event.wait(Config.LLM_METRICS_FLUSH_SECONDS)
+            self._flush_event.clear()
+            self.flush()
+
+    def flush(self) -> int:
+        """Biriken ölçümleri llm_calls tablosuna toplu yaz - yazılan satır sayısı"""
+        with self._flush_lock:
+            with self._lock:
+                calls, self._pending = self._pending, []
+            if not calls:
+                return 0
+            try:
+                self._database().insert_llm_calls(calls)
+                return len(calls)
+            except Exception as e:
+                # Ölçüm yazılamaması LLM çağrılarını bozmamalı
+                return 0
+
+    def _database(self):
+        # Geç oluşturulur: benchmark gibi araçlar DATABASE_PATH'i agentlardan önce değiştirebilir
+        if self._db_manager is None:
+            from database_manager import DatabaseManager
+            self._db_manager = DatabaseManager()
+        return self._db_manager
+
+    def latency_quantile(self, call_site: str, ratio: float, min_samples: int = 20,
+                         first_chunk: bool = False) -> Optional[float]:
+        """Son başarılı çağrılardan gecikme (ya da akışta ilk parça) yüzdeliği (ms); yeterli örnek yoksa None"""
+        with self._lock:
+            site = self._sites.get(call_site)
+            recent = sorted(site["recent_first_chunk" if first_chunk else "recent"]) if site else []
+        if len(recent) < max(min_samples, 1):
+            return None
+        return recent[min(len(recent) - 1, int(ratio * len(recent)))]
+
+    @staticmethod
+    def _percentile(buckets: List[int], ratio: float) -> Optional[int]:
+        """Histogramdan yüzdelik (kovanın üst sınırı, son kova için None = 60 sn üstü)"""
+        total = sum(buckets)
+        if not total:
+            return None
+        threshold = ratio * total
+        running = 0
+        for index, count in enumerate(buckets):
+            running += count
+            if running >= threshold:
+                return LATENCY_BUCKETS_MS[index] if index < len(LATENCY_BUCKETS_MS) else None
+        return None
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Çağrı yeri -> toplamlar, histogram ve yaklaşık p50/p95"""
+        with self._lock:
+            sites = {name: dict(site, buckets=list(site["buckets"])) for name, site in self._sites.items()}
+
+        result = {}
+        for name, site in sites.items():
+            labels = [f"<={bound}ms" for bound in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}ms"]
+            result[name] = {
+                "calls": site["calls"],
+                "errors": site["errors"],
+                "retries": site["retries"],
+                "streamed": site["streamed"],
+                "prompt_tokens": site["prompt_tokens"],
+                "response_tokens": site["response_tokens"],
+                "cost_usd": round(estimate_cost(site["prompt_tokens"], site["response_tokens"], name), 6),
+                "latency_ms_avg": round(site["latency_ms_total"] / site["calls"], 1) if site["calls"] else None,
+                "latency_ms_p50": self._percentile(site["buckets"], 0.5),
+                "latency_ms_p95": self._percentile(site["buckets"], 0.95),
+                "histogram": dict(zip(labels, site["buckets"]))
+            }
+        return result
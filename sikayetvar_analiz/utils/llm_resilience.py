@@ -0,0 +1,113 @@
+import random
+import threading
+import time
+import urllib.error
+from typing import Dict
+
+# Metninde bu ifadelerden biri geçen hatalar geçici sayılır (SDK'lar her zaman durum kodu taşımıyor)
+RETRYABLE_MARKERS = ('429', '500', '502', '503', '504', 'timeout', 'timed out', 'deadline',
+                     'unavailable', 'resource has been exhausted', 'connection')
+
+
+class CircuitOpenError(RuntimeError):
+    """Sağlayıcı art arda hata verdi - çağrı hiç gönderilmedi"""
+
+
+class LLMTimeoutError(TimeoutError):
+    """Çağrı süresi (deadline) doldu"""
+
+
+def is_retryable(error: Exception) -> bool:
+    """Zaman aşımı, bağlantı hatası, 429 ve 5xx tekrar denenir; geçersiz istek (4xx) denenmez"""
+    if isinstance(error, CircuitOpenError):
+        return False
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    if isinstance(error, urllib.error.HTTPError):
+        return error.code == 429 or error.code >= 500
+    if isinstance(error, urllib.error.URLError):
+        return True
+
+    code = getattr(error, 'code', None)
+    if isinstance(code, int):
+        return code == 429 or code >= 500
+    text = str(error).lower()
+    return any(marker in text for marker in RETRYABLE_MARKERS)
+
+
+def backoff_delay(retry: int, base_seconds: float, cap_seconds: float = 30.0) -> float:
+    """Üstel bekleme, tam jitter (aynı anda düşen istekler aynı anda tekrar gelmesin)"""
+    return random.uniform(0, min(cap_seconds, base_seconds * (2 ** retry)))
+
+
+class CircuitBreaker:
+    """
+    Devre Kesici (thread-safe)
+    - closed: çağrılar serbest; art arda failure_threshold geçici hatada open olur
+    - open: reset_seconds boyunca çağrı gönderilmez (çağıran hemen yedek yola geçer)
+    - half_open: süre dolunca tek bir deneme çağrısına izin verilir; başarılıysa closed, değilse tekrar open
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._lock = threading.Lock()
+        self._state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._trips = 0
+
+    def available(self) -> bool:
+        """Çağrı gönderilebilir mi (deneme hakkını tüketmez - yedek yola geçme kararı için)"""
+        with self._lock:
+            if self._state == "closed":
+                return True
+            if self._state == "open":
+                return time.monotonic() - self._opened_at >= self.reset_seconds
+            return not self._probe_in_flight
+
+    def healthy(self) -> bool:
+        """closed ve son çağrı geçici hatayla bitmedi (sonuçsuz kalan iş sağlayıcıya bağlanamaz)"""
+        with self._lock:
+            return self._state == "closed" and self._failures == 0
+
+    def allow(self) -> bool:
+        """Çağrıdan hemen önce: izin varsa True (half_open'da tek deneme hakkını alır)"""
+        with self._lock:
+            if self._state == "closed":
+                return True
+            if self._state == "open":
+                if time.monotonic() - self._opened_at < self.reset_seconds:
+                    return False
+                self._state = "half_open"
+                self._probe_in_flight = False
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._state = "closed"
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == "half_open" or self._failures >= self.failure_threshold:
+                if self._state != "open":
+                    self._trips += 1
+                self._state = "open"
+                self._opened_at = time.monotonic()
+                self._probe_in_flight = False
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                "state": self._state,
+                "consecutive_failures": self._failures,
+                "trips": self._trips,
+                "open_for_seconds": round(time.monotonic() - self._opened_at, 1) if self._state == "open" else None
+            }
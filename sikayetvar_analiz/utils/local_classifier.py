@@ -0,0 +1,246 @@
+import re
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from utils.text_normalizer import normalize_turkish
+
+try:
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.pipeline import make_pipeline
+except ImportError:
+    TfidfVectorizer = None
+
+# Kategori adlarından türemeyen yaygın kullanımlar (normalize edilmiş, kelime başı eşleşir)
+CATEGORY_SYNONYMS = {
+    "Televizyon": ["tv", "smart tv", "led tv", "ekran karti"],
+    "Kumanda": ["uzaktan kumanda"],
+    "Buzdolabı": ["no frost", "buzdolap"],
+    "Uydu Alıcısı": ["uydu alici", "uydu cihaz"],
+    "Çamaşır Makinesi": ["camasir makin"],
+    "Bulaşık Makinesi": ["bulasik makin"],
+    "Kurutma Makinesi": ["kurutma makin"],
+    "Su Arıtma Cihazı": ["su aritma", "aritma cihaz"],
+    "Termosifon": ["sofben"],
+}
+
+# Şikayet nedeni ipuçları (normalize edilmiş, kelime başı eşleşir)
+REASON_KEYWORDS = {
+    "Teknik Servis": ["servis", "teknisyen", "usta"],
+    "Kargo & Teslimat": ["kargo", "teslimat", "teslim edil", "kurye", "nakliye"],
+    "Müşteri Hizmetleri": ["musteri hizmet", "cagri merkez", "musteri temsilci", "temsilci"],
+    "Fiyat & Fatura": ["fatura", "fiyat", "ucret", "odeme", "taksit"],
+    "Ürün Kalitesi": ["kalitesiz", "kalite", "bozul", "kirild", "catla", "pasla"],
+    "Website & Uygulama": ["uygulama", "web sitesi", "internet sitesi", "siteden", "online siparis"],
+    "İade & Değişim": ["iade", "degisim", "degistir"],
+    "Satış & Mağaza": ["magaza", "bayi", "satis temsilci", "satici"],
+    "Zaman & Süreç": ["gundur", "haftadir", "aydir", "hala bekli", "oyalan"],
+}
+
+# "15 ocak", "ocak ayinda" gibi tarih ifadeleri 'Ocak' kategorisine eşleşmesin
+_DATE_PATTERN = re.compile(r'\b\d{1,2}\s+ocak\w*|\bocak\s+ay\w*')
+
+
+def _stem(token: str) -> str:
+    """Kaba Türkçe kök: iyelik/hal eklerini ve k/p/t/ç yumuşamasını tolere edecek kadar kısalt"""
+    if len(token) >= 6:
+        return token[:max(4, len(token) - 2)]
+    if token[-1:] in 'kptc' and len(token) >= 5:
+        return token[:-1]
+    return token
+
+
+class LocalClassifier:
+    """
+    Yerel Ön Sınıflandırıcı (CPU, LLM'siz)
+    - Türkçe normalize edilmiş sözlük eşleşmesi: kategori adları + eş anlamlılar, neden ipuçları
+    - Opsiyonel: kendi etiketli Analysis satırlarımızla eğitilen TF-IDF + lojistik regresyon (scikit-learn)
+    - Güveni eşiğin altında kalan şikayetler LLM'e bırakılır
+    """
+
+    def __init__(self, categories: List[str], reasons: List[str], threshold: float = 0.8):
+        self.categories = categories
+        self.reasons = reasons
+        self.threshold = threshold
+        self.category_patterns = self._compile(self._category_phrases())
+        self.reason_patterns = self._compile({
+            reason: REASON_KEYWORDS.get(reason, []) for reason in reasons
+        })
+        self.category_model = None
+        self.reason_model = None
+
+    def _category_phrases(self) -> Dict[str, List[str]]:
+        """Her kategori için kök haline getirilmiş ifade listesi"""
+        phrases = {}
+        for category in self.categories:
+            tokens = normalize_turkish(category).split()
+            phrases[category] = [' '.join(_stem(token) for token in tokens)] + CATEGORY_SYNONYMS.get(category, [])
+        return phrases
+
+    @staticmethod
+    def _compile(phrases: Dict[str, List[str]]) -> List[Tuple[re.Pattern, str]]:
+        """İfadeleri kelime başı eşleşen regex'lere çevir (uzun ifade önce: 'kurutmali camasir' 'camasir'dan önce)"""
+        compiled = []
+        for label, label_phrases in phrases.items():
+            for phrase in label_phrases:
+                words = phrase.split()
+                if not words:
+                    continue
+                pattern = r'\b' + r'\w*\s+'.join(re.escape(word) for word in words)
+                compiled.append((len(phrase), re.compile(pattern), label))
+        compiled.sort(key=lambda item: -item[0])
+        return [(pattern, label) for _, pattern, label in compiled]
+
+    @staticmethod
+    def _match(patterns: List[Tuple[re.Pattern, str]], title: str, body: str) -> Tuple[Optional[str], float]:
+        """Sözlük eşleşmesi: (etiket, güven). Başlık eşleşmeleri iki kat sayılır."""
+        scores = Counter()
+        for text, weight in ((title, 2), (body, 1)):
+            for pattern, label in patterns:
+                text, hits = pattern.subn(' ', text)
+                # Eşleşen kısım silinir, kısa ifade aynı yeri tekrar saymaz
+                if hits:
+                    scores[label] += hits * weight
+
+        if not scores:
+            return None, 0.0
+        label, top = scores.most_common(1)[0]
+        return label, top / sum(scores.values())
+
+    def classify(self, complaint: Dict) -> Dict:
+        """Tek şikayet için {category, reason, confidence}"""
+        return self.classify_many([complaint])[0]
+
+    def classify_many(self, complaints: List[Dict]) -> List[Dict]:
+        results = []
+        for complaint in complaints:
+            title = normalize_turkish(complaint.get('title') or '')
+            body = normalize_turkish(complaint.get('full_comment') or '')
+            category, category_conf = self._match(self.category_patterns,
+                                                  _DATE_PATTERN.sub(' ', title), _DATE_PATTERN.sub(' ', body))
+            reason, reason_conf = self._match(self.reason_patterns, title, body)
+            results.append({
+                "category": category, "category_confidence": category_conf,
+                "reason": reason, "reason_confidence": reason_conf
+            })
+
+        # Model eğitilmişse her hedef için daha emin olan kaynak seçilir
+        if self.category_model is not None and complaints:
+            texts = [self._model_text(complaint) for complaint in complaints]
+            for model, target in ((self.category_model, 'category'), (self.reason_model, 'reason')):
+                probabilities = model.predict_proba(texts)
+                for result, row in zip(results, probabilities):
+                    best = row.argmax()
+                    if row[best] > result[f"{target}_confidence"]:
+                        result[target] = model.classes_[best]
+                        result[f"{target}_confidence"] = float(row[best])
+
+        for result in results:
+            result["confidence"] = min(result["category_confidence"], result["reason_confidence"])
+        return results
+
+    def split_confident(self, complaints: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+        """(yerelde atanan analizler, LLM'e gidecek şikayetler)"""
+        assignments = []
+        remaining = []
+        for complaint, result in zip(complaints, self.classify_many(complaints)):
+            if result["category"] and result["reason"] and result["confidence"] >= self.threshold:
+                assignments.append({
+                    "Complaint_ID": complaint["Complaint_ID"],
+                    "category": result["category"],
+                    "reason": result["reason"]
+                })
+            else:
+                remaining.append(complaint)
+        return assignments, remaining
+
+    @staticmethod
+    def _model_text(complaint: Dict) -> str:
+        title = complaint.get('title') or ''
+        return f"{title} {title} {complaint.get('full_comment') or ''}"
+
+    def fit(self, labelled: Iterable[Dict], max_rows: int = 20000) -> int:
+        """Etiketli satırlarla (title, full_comment, Category, Reason) TF-IDF + lojistik regresyon eğit"""
+        if TfidfVectorizer is None:
+            raise ImportError("Model tabanlı ön sınıflandırma için scikit-learn kurulmalı (pip install scikit-learn)")
+
+        texts, categories, reasons = [], [], []
+        for row in labelled:
+            if row.get('Category') in self.categories and row.get('Reason') in self.reasons:
+                texts.append(self._model_text(row))
+                categories.append(row['Category'])
+                reasons.append(row['Reason'])
+            if len(texts) >= max_rows:
+                break
+
+        # Her hedefte en az iki sınıf olmalı
+        if len(set(categories)) < 2 or len(set(reasons)) < 2:
+            return 0
+
+        models = []
+        for labels in (categories, reasons):
+            vectorizer = TfidfVectorizer(preprocessor=normalize_turkish, analyzer='char_wb',
+                                         ngram_range=(3, 5), sublinear_tf=True, min_df=2, max_features=200000)
+            model = make_pipeline(vectorizer, LogisticRegression(max_iter=1000, C=4.0))
+            model.fit(texts, labels)
+            models.append(model)
+
+        self.category_model, self.reason_model = models
+        return len(texts)
+
+    def evaluate(self, labelled: Iterable[Dict]) -> Dict:
+        """Mevcut etiketlere karşı doğruluk, kapsama ve hız raporu"""
+        rows = [row for row in labelled if row.get('Category') and row.get('Reason')]
+        if not rows:
+            return {"total": 0}
+
+        started = time.perf_counter()
+        results = self.classify_many(rows)
+        elapsed = time.perf_counter() - started
+
+        covered = [(row, result) for row, result in zip(rows, results)
+                   if result["category"] and result["reason"] and result["confidence"] >= self.threshold]
+        category_correct = sum(1 for row, result in covered if result["category"] == row['Category'])
+        reason_correct = sum(1 for row, result in covered if result["reason"] == row['Reason'])
+        joint_correct = sum(1 for row, result in covered
+                            if result["category"] == row['Category'] and result["reason"] == row['Reason'])
+
+        return {
+            "total": len(rows),
+            "threshold": self.threshold,
+            "covered": len(covered),
+            "coverage": round(len(covered) / len(rows), 4),
+            "category_accuracy": round(category_correct / len(covered), 4) if covered else None,
+            "reason_accuracy": round(reason_correct / len(covered), 4) if covered else None,
+            "joint_accuracy": round(joint_correct / len(covered), 4) if covered else None,
+            "complaints_per_sec": round(len(rows) / elapsed, 1) if elapsed else None,
+            "model": self.category_model is not None
+        }
+
+
+if __name__ == '__main__':
+    import argparse
+    import os
+    import sys
+
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from config import Config
+    from database_manager import DatabaseManager
+
+    parser = argparse.ArgumentParser(description="Yerel ön sınıflandırıcıyı mevcut etiketlere karşı değerlendir")
+    parser.add_argument('--threshold', type=float, default=Config.LOCAL_CLASSIFIER_THRESHOLD)
+    parser.add_argument('--model', action='store_true', help="TF-IDF modelini de eğit (%%80 eğitim / %%20 test)")
+    args = parser.parse_args()
+
+    db = DatabaseManager()
+    rows = [row for chunk in db.iter_analyzed_complaints_since(0) for row in chunk]
+    classifier = LocalClassifier(Config.CATEGORIES, Config.REASONS, threshold=args.threshold)
+
+    if args.model:
+        # Test satırları eğitimde görülmesin
+        train = [row for row in rows if row['Analysis_ID'] % 5 != 0]
+        rows = [row for row in rows if row['Analysis_ID'] % 5 == 0]
+        print(f"Eğitim satırı: {classifier.fit(train)}")
+
+    print(classifier.evaluate(rows))
@@ -0,0 +1,89 @@
+import hashlib
+import random
+import struct
+import zlib
+from typing import Dict, List, Tuple
+
+from utils.text_normalizer import tokenize_turkish
+
+# 2^61 - 1 (Mersenne asal) - evrensel hash ailesi için
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+
+class MinHasher:
+    """
+    MinHash imzaları ve LSH bantları (yakın kopya tespiti)
+    - Metin: normalize edilmiş başlık + gövde, kelime 3'lüleri (shingle)
+    - num_perm imza = bands x rows; aynı bantta aynı kovaya düşen şikayetler adaydır
+    - Adaylar imzadan tahmin edilen Jaccard benzerliği ile doğrulanır
+    """
+
+    def __init__(self, num_perm: int = 64, bands: int = 16, shingle_size: int = 3, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm bands'a tam bölünmeli")
+
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+
+        # Sabit seed: imzalar farklı süreçler ve yeniden başlatmalar arasında karşılaştırılabilir kalır
+        rng = random.Random(seed)
+        self._perms = [(rng.randrange(1, _PRIME), rng.randrange(0, _PRIME)) for _ in range(num_perm)]
+        self._format = f'<{num_perm}I'
+
+    def _shingles(self, text: str) -> set:
+        tokens = tokenize_turkish(text)
+        if len(tokens) < self.shingle_size:
+            return {' '.join(tokens)} if tokens else set()
+        return {' '.join(tokens[i:i + self.shingle_size]) for i in range(len(tokens) - self.shingle_size + 1)}
+
+    def signature(self, text: str) -> List[int]:
+        """Metnin MinHash imzası (kelime içermeyen metin için boş liste)"""
+        hashes = [zlib.crc32(shingle.encode('utf-8')) for shingle in self._shingles(text)]
+        if not hashes:
+            return []
+        return [min(((a * h + b) % _PRIME) & _MAX_HASH for h in hashes) for a, b in self._perms]
+
+    def band_buckets(self, signature: List[int]) -> List[Tuple[int, int]]:
+        """(bant no, kova) çiftleri - kova, bandın satırlarının 64 bit hash'i"""
+        buckets = []
+        for band in range(self.bands):
+            rows = signature[band * self.rows:(band + 1) * self.rows]
+            digest = hashlib.blake2b(struct.pack(f'<{self.rows}I', *rows), digest_size=8).digest()
+            buckets.append((band, int.from_bytes(digest, 'big', signed=True)))
+        return buckets
+
+    @staticmethod
+    def similarity(first: List[int], second: List[int]) -> float:
+        """İmzalardan tahmini Jaccard benzerliği"""
+        return sum(1 for a, b in zip(first, second) if a == b) / len(first)
+
+    def pack(self, signature: List[int]) -> bytes:
+        return struct.pack(self._format, *signature)
+
+    def unpack(self, data: bytes) -> List[int]:
+        return list(struct.unpack(self._format, data))
+
+
+def cluster_pairs(ids: List[int], pairs: List[Tuple[int, int]]) -> Dict[int, List[int]]:
+    """Benzer çiftlerden kümeler oluştur (union-find); temsilci -> üyeler (temsilci dahil, en küçük ID)"""
+    parent = {complaint_id: complaint_id for complaint_id in ids}
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for first, second in pairs:
+        if first in parent and second in parent:
+            root_first, root_second = find(first), find(second)
+            if root_first != root_second:
+                parent[max(root_first, root_second)] = min(root_first, root_second)
+
+    clusters: Dict[int, List[int]] = {}
+    for complaint_id in ids:
+        clusters.setdefault(find(complaint_id), []).append(complaint_id)
+    return clusters
@@ -0,0 +1,186 @@
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from agents.data_management_agent import DataManagementAgent
+
+# Sentetik şikayet parçaları - bir kısmı sözlükle eşleşir (yerel ön sınıflandırıcı), bir kısmı LLM'e kalır
+TITLE_TEMPLATES = [
+    "{category} {reason} sorunu",
+    "{category} hakkında şikayet",
+    "Vestel mağdur etti",
+    "Hala çözüm yok",
+    "Rezalet bir deneyim",
+]
+BODY_WORDS = [
+    "aldım", "gün", "oldu", "hala", "çözüm", "yok", "ürün", "arıza", "servis", "randevu", "kargo", "iade",
+    "fatura", "ekran", "ses", "kapak", "su", "sızdırıyor", "çalışmıyor", "bozuldu", "müşteri", "temsilci",
+    "bekliyorum", "kimse", "ilgilenmiyor", "garanti", "değişim", "para", "tekrar", "geldi", "yine"
+]
+
+
+def synthetic_complaints(rng: random.Random, count: int, start_index: int, now: datetime) -> List[Dict]:
+    """Deterministik sentetik şikayetler (en yenisi now)"""
+    complaints = []
+    for offset in range(count):
+        index = start_index + offset
+        title = rng.choice(TITLE_TEMPLATES).format(
+            category=rng.choice(Config.CATEGORIES).lower(),
+            reason=rng.choice(Config.REASONS).split(' ')[0].lower()
+        )
+        body = ' '.join(rng.choice(BODY_WORDS) for _ in range(rng.randint(25, 120)))
+        complaints.append({
+            'ref_url': f'https://www.sikayetvar.com/vestel/benchmark-{index}',
+            'title': title,
+            'full_comment': body,
+            'date': (now - timedelta(seconds=count - offset)).strftime('%Y-%m-%d %H:%M:%S')
+        })
+    return complaints
+
+
+class OfflineDataAgent(DataManagementAgent):
+    """Crawler yerine her istekte hazır sentetik şikayetleri ekleyen veri agentı"""
+
+    def __init__(self, db_manager, batches: List[List[Dict]]):
+        super().__init__(db_manager)
+        self.batches = batches
+
+    def ensure_database_updated(self, command_info: Dict = None) -> Dict:
+        complaints = self.batches.pop(0) if self.batches else []
+        result = self.db_manager.save_new_complaints_incremental(complaints)
+        return {"success": True, "message": "Veritabanı güncellendi", "new_records": result.get('new_count', 0)}
+
+
+def percentile(values: List[float], ratio: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(ratio * (len(ordered) - 1))))]
+
+
+def run_benchmark(complaints_per_request: int, requests: int, seed: int = 0) -> Dict:
+    """RootAgent.process_request üzerinden uçtan uca gecikme ve şikayet/sn ölçümü (ağsız)"""
+    from agents.root_agent import RootAgent
+    from agents.analysis_agent import AnalysisAgent
+    from database_manager import DatabaseManager
+    from utils.llm_client import LLMClient
+
+    rng = random.Random(seed)
+    now = datetime.now()
+    batches = [synthetic_complaints(rng, complaints_per_request, round_index * complaints_per_request,
+                                    now - timedelta(hours=requests - round_index))
+               for round_index in range(requests)]
+
+    db_manager = DatabaseManager()
+    root_agent = RootAgent()
+    data_agent = OfflineDataAgent(db_manager, batches)
+    analysis_agent = AnalysisAgent(db_manager)
+
+    latencies = []
+    stage_totals: Dict[str, float] = {}
+    classified = 0
+    hits = {"cache_hits": 0, "local_hits": 0, "near_duplicate_hits": 0, "fallback_hits": 0, "failed": 0}
+    errors = []
+    started = time.perf_counter()
+
+    for round_index in range(requests):
+        request_started = time.perf_counter()
+        result = root_agent.process_request(
+            f"Son {complaints_per_request} şikayeti analiz et", data_agent, analysis_agent)
+        latencies.append(time.perf_counter() - request_started)
+        for stage, elapsed_ms in result.get('timings', {}).items():
+            stage_totals[stage] = stage_totals.get(stage, 0.0) + elapsed_ms
+
+        if not result.get('success'):
+            errors.append(result.get('error'))
+            continue
+
+        analysis_result = result.get('analysis_result', {})
+        classified += analysis_result.get('processed_count', 0)
+        for key in ("cache_hits", "local_hits", "near_duplicate_hits", "fallback_hits"):
+            hits[key] += analysis_result.get(key, 0)
+        hits["failed"] += len(analysis_result.get('failed_ids', []))
+
+    elapsed = time.perf_counter() - started
+    backend = analysis_agent.llm_client.backend
+    return {
+        "backend": Config.LLM_BACKEND,
+        "requests": requests,
+        "complaints_per_request": complaints_per_request,
+        "classified": classified,
+        "errors": errors,
+        "latency_p50": round(statistics.median(latencies), 3),
+        "latency_p95": round(percentile(latencies, 0.95), 3),
+        "latency_p99": round(percentile(latencies, 0.99), 3),
+        "latency_max": round(max(latencies), 3),
+        "complaints_per_sec": round(classified / elapsed, 1) if elapsed else None,
+        "stage_ms_avg": {stage: round(total / requests, 1) for stage, total in stage_totals.items()},
+        "llm": dict(getattr(backend, 'stats', {})),
+        "llm_call_sites": {site: {key: value for key, value in metrics.items() if key != 'histogram'}
+                           for site, metrics in LLMClient.metrics.snapshot().items()},
+        "circuit_breaker": LLMClient.breaker.snapshot(),
+        **hits
+    }
+
+
+if __name__ == '__main__':
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(
+        description="Ağsız uçtan uca benchmark (RootAgent.process_request, yerel LLM yerine geçen ile)")
+    parser.add_argument('--complaints', type=int, default=200, help="İstek başına yeni şikayet")
+    parser.add_argument('--requests', type=int, default=5)
+    parser.add_argument('--backend', choices=['fake', 'http'], default='fake')
+    parser.add_argument('--latency-ms', type=float, default=Config.FAKE_LLM_LATENCY_MS)
+    parser.add_argument('--tokens-per-second', type=float, default=Config.FAKE_LLM_TOKENS_PER_SECOND)
+    parser.add_argument('--error-rate', type=float, default=Config.FAKE_LLM_ERROR_RATE)
+    parser.add_argument('--max-concurrency', type=int, default=Config.FAKE_LLM_MAX_CONCURRENCY)
+    parser.add_argument('--rpm', type=int, default=Config.LLM_REQUESTS_PER_MINUTE, help="Ortak hız sınırı")
+    parser.add_argument('--seed', type=int, default=Config.FAKE_LLM_SEED)
+    parser.add_argument('--slow-rate', type=float, default=Config.FAKE_LLM_SLOW_RATE,
+                        help="Ek gecikmeyle dönen istek oranı (kuyruk gecikmesi)")
+    parser.add_argument('--slow-latency-ms', type=float, default=Config.FAKE_LLM_SLOW_LATENCY_MS)
+    parser.add_argument('--timeout', type=float, default=Config.LLM_TIMEOUT_SECONDS, help="LLM çağrı süresi (sn)")
+    parser.add_argument('--hedge', action='store_true', help="p95 gecikmesinden sonra kopya istek gönder")
+    parser.add_argument('--no-cache', action='store_true')
+    parser.add_argument('--local', action='store_true', help="Yerel ön sınıflandırıcıyı aç (varsayılan kapalı)")
+    parser.add_argument('--no-near-duplicate', action='store_true')
+    args = parser.parse_args()
+
+    # Ayarlar agentlar oluşturulmadan önce verilir
+    Config.LLM_BACKEND = args.backend
+    Config.FAKE_LLM_LATENCY_MS = args.latency_ms
+    Config.FAKE_LLM_TOKENS_PER_SECOND = args.tokens_per_second
+    Config.FAKE_LLM_ERROR_RATE = args.error_rate
+    Config.FAKE_LLM_MAX_CONCURRENCY = args.max_concurrency
+    Config.FAKE_LLM_SEED = args.seed
+    Config.FAKE_LLM_SLOW_RATE = args.slow_rate
+    Config.FAKE_LLM_SLOW_LATENCY_MS = args.slow_latency_ms
+    Config.LLM_TIMEOUT_SECONDS = args.timeout
+    Config.LLM_HEDGE_ENABLED = args.hedge
+    if args.no_cache:
+        Config.LLM_CACHE_MAX_ENTRIES = 0
+    if args.local:
+        Config.LOCAL_CLASSIFIER_ENABLED = True
+    if args.no_near_duplicate:
+        Config.NEAR_DUPLICATE_ENABLED = False
+
+    from utils.llm_client import LLMClient
+    from utils.rate_limiter import RateLimiter
+    LLMClient.rate_limiter = RateLimiter(args.rpm)
+
+    # Veritabanı ve grafikler geçici dizinde - gerçek veritabanına dokunulmaz
+    with tempfile.TemporaryDirectory() as workdir:
+        Config.DATABASE_PATH = os.path.join(workdir, 'benchmark.db')
+        os.chdir(workdir)
+        result = run_benchmark(args.complaints, args.requests, args.seed)
+        # Biriken llm_calls satırları geçici dizin silinmeden yazılır
+        LLMClient.metrics.flush()
+        print(json.dumps(result, ensure_ascii=False, indent=2))
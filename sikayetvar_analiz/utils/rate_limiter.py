@@ -0,0 +1,41 @@
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    Token bucket hız sınırlayıcı (thread-safe)
+    - Dakikada en fazla requests_per_minute istek, kısa patlamalara burst kadar izin verir
+    - acquire() kota açılana kadar bekler
+    """
+
+    def __init__(self, requests_per_minute: int, burst: int = None):
+        self.rate = requests_per_minute / 60.0
+        self.capacity = burst or max(1, requests_per_minute // 10)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Bir istek hakkı al (gerekirse bekle)"""
+        while True:
+            wait = self._take()
+            if wait is None:
+                return
+            time.sleep(wait)
+
+    def try_acquire(self) -> bool:
+        """Hak varsa al, yoksa beklemeden False (ör. hedge isteği kotayı zorlamasın)"""
+        return self._take() is None
+
+    def _take(self):
+        """Hak alındıysa None, yoksa yeni hakka kalan süre"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return None
+            return (1 - self._tokens) / self.rate
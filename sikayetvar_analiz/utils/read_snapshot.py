@@ -0,0 +1,154 @@
+import glob
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from config import Config
+from database_manager import DatabaseManager
+
+
+class ReadSnapshotManager:
+    """
+    Okuma Snapshot Yöneticisi
+    - Canlı veritabanının anlık kopyasını SQLite online backup API ile alır
+    - Kopyalar sadece arka plan thread'inde, refresh_seconds aralıklarla ve canlı dosya son kopyadan beri
+      değiştiyse alınır (her yenileme yeni bir versiyon); değişmediyse mevcut versiyonun as_of zamanı ilerler
+    - İstekler hazır olan en son versiyonu okur, istek yolunda hiçbir zaman kopya alınmaz
+    - Salt okunur analitik istekler bu kopyadan okur, crawler yazmalarından etkilenmez
+    """
+
+    def __init__(self, db_path: str = None, snapshot_dir: str = None, refresh_seconds: int = None,
+                 keep_versions: int = 3):
+        self.db_path = db_path or Config.DATABASE_PATH
+        self.snapshot_dir = snapshot_dir or Config.SNAPSHOT_DIR
+        self.refresh_seconds = Config.SNAPSHOT_REFRESH_SECONDS if refresh_seconds is None else refresh_seconds
+        # Uzun süren bir istek eski versiyonu okurken dosyası silinmesin diye birkaç versiyon tutulur
+        self.keep_versions = max(keep_versions, 2)
+
+        self._lock = threading.Lock()
+        self._current: Optional[Dict] = None
+        self._fingerprint: Optional[Tuple] = None
+        self._version = 0
+        self._stop_event = threading.Event()
+        self._thread = None
+
+        os.makedirs(self.snapshot_dir, exist_ok=True)
+
+        # Yeniden başlatmada versiyon numarası kaldığı yerden devam etsin
+        existing = glob.glob(os.path.join(self.snapshot_dir, 'snapshot_*.db'))
+        if existing:
+            self._version = max(int(os.path.basename(p)[9:15]) for p in existing)
+
+    def _source_fingerprint(self) -> Tuple:
+        """Canlı dosyanın değişim izi - WAL modunda her commit -wal dosyasını, checkpoint ana dosyayı değiştirir"""
+        fingerprint = []
+        for path in (self.db_path, self.db_path + '-wal'):
+            try:
+                stat = os.stat(path)
+                fingerprint.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                fingerprint.append(None)
+        return tuple(fingerprint)
+
+    def refresh(self) -> Dict:
+        """Yeni bir snapshot versiyonu al ve aktif yap"""
+        with self._lock:
+            return self._refresh_locked()
+
+    def _refresh_locked(self) -> Dict:
+        version = self._version + 1
+        # İz kopyadan önce alınır: kopya sırasında gelen yazmalar bir sonraki kontrolde görülür
+        fingerprint = self._source_fingerprint()
+        taken_at = datetime.now().isoformat()
+        snapshot_path = os.path.join(self.snapshot_dir, f"snapshot_{version:06d}.db")
+        tmp_path = snapshot_path + '.tmp'
+
+        source = sqlite3.connect(self.db_path)
+        target = sqlite3.connect(tmp_path)
+        try:
+            # Tek adımda kopyala - kaynak üzerinde tutarlı bir okuma işlemi içinde yapılır
+            source.backup(target)
+            # Kopya salt okunur açılacak; WAL/shm dosyası gerektirmesin
+            target.execute('PRAGMA journal_mode=DELETE')
+        finally:
+            target.close()
+            source.close()
+        os.replace(tmp_path, snapshot_path)
+
+        self._version = version
+        self._fingerprint = fingerprint
+        self._current = {
+            "version": version,
+            "taken_at": taken_at,
+            "as_of": taken_at,
+            "db_manager": DatabaseManager(snapshot_path, read_only=True)
+        }
+        self._cleanup_old_versions()
+
+        return self._current
+
+    def current(self) -> Dict:
+        """
+        Hazır olan en son snapshot (kopya almaz)
+        Henüz snapshot yoksa canlı veritabanı salt okunur açılır (version 0)
+        as_of: snapshot'ın canlı veritabanıyla aynı olduğu bilinen en son zaman (ISO)
+        """
+        snapshot = self._current
+        if snapshot is None:
+            return {
+                "version": 0,
+                "taken_at": None,
+                "as_of": datetime.now().isoformat(),
+                "db_manager": DatabaseManager(self.db_path, read_only=True)
+            }
+        return snapshot
+
+    def refresh_if_changed(self) -> Dict:
+        """Canlı dosya son kopyadan beri değiştiyse yeni versiyon al, değişmediyse as_of'u ilerlet"""
+        with self._lock:
+            checked_at = datetime.now().isoformat()
+            if self._current is not None and self._source_fingerprint() == self._fingerprint:
+                self._current["as_of"] = checked_at
+                return self._current
+            return self._refresh_locked()
+
+    @staticmethod
+    def describe(snapshot: Dict) -> Dict:
+        """Yanıtlara eklenecek snapshot bilgisi"""
+        return {key: snapshot[key] for key in ('version', 'taken_at', 'as_of')}
+
+    def start(self):
+        """Arka planda periyodik yenilemeyi başlat (ilk versiyon hemen alınır; refresh_seconds 0 ise kapalı)"""
+        if self.refresh_seconds <= 0 or (self._thread and self._thread.is_alive()):
+            return
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._refresh_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Periyodik yenilemeyi durdur"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def _refresh_loop(self):
+        """refresh_seconds aralıklarla, canlı dosya değiştiyse yeni snapshot al"""
+        while not self._stop_event.is_set():
+            try:
+                self.refresh_if_changed()
+            except Exception as e:
+                # Yenileme başarısızsa önceki versiyon kullanılmaya devam eder
+                pass
+            self._stop_event.wait(self.refresh_seconds)
+
+    def _cleanup_old_versions(self):
+        """En yeni keep_versions dışındaki snapshot dosyalarını sil"""
+        snapshots = sorted(glob.glob(os.path.join(self.snapshot_dir, 'snapshot_*.db')))
+        for path in snapshots[:-self.keep_versions]:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
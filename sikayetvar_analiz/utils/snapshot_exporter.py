@@ -0,0 +1,131 @@
+import os
+import uuid
+from typing import Dict
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+
+class SnapshotExporter:
+    """
+    Kolon bazlı snapshot export (Parquet / Arrow IPC)
+    - Analiz edilmiş şikayetleri ay bazlı partition'lara yazar (month=YYYY-MM/)
+    - Watermark ile sadece son snapshot'tan sonra analiz edilen satırları ekler
+    - Satırları parça parça okuyup yazar, bellek kullanımı sabit kalır
+    """
+
+    FORMATS = {'parquet': '.parquet', 'arrow': '.arrow'}
+
+    def __init__(self, db_manager, output_dir: str, export_format: str = 'parquet', chunk_size: int = 5000):
+        if pa is None:
+            raise ImportError("Snapshot export için pyarrow kurulmalı (pip install pyarrow)")
+        if export_format not in self.FORMATS:
+            raise ValueError(f"Bilinmeyen export formatı: {export_format}")
+
+        self.db_manager = db_manager
+        self.output_dir = output_dir
+        self.export_format = export_format
+        self.chunk_size = chunk_size
+        self.watermark_name = f"snapshot_{export_format}"
+        self.schema = pa.schema([
+            ('Analysis_ID', pa.int64()),
+            ('Complaint_ID', pa.int64()),
+            ('ref_url', pa.string()),
+            ('title', pa.string()),
+            ('full_comment', pa.string()),
+            ('date', pa.string()),
+            ('Category', pa.string()),
+            ('Reason', pa.string()),
+            ('analyzed_at', pa.string()),
+        ])
+
+    def export_incremental(self) -> Dict:
+        """Watermark'tan sonraki satırları yeni partition dosyalarına ekle"""
+        last_id = self.db_manager.get_export_watermark(self.watermark_name)
+        run_id = uuid.uuid4().hex[:12]
+
+        writers = {}
+        row_count = 0
+        max_id = last_id
+
+        try:
+            for rows in self.db_manager.iter_analyzed_complaints_since(last_id, self.chunk_size):
+                # Parçayı ay partition'larına böl
+                partitions = {}
+                for row in rows:
+                    month = (row['date'] or '')[:7] or 'unknown'
+                    partitions.setdefault(month, []).append(row)
+
+                for month, partition_rows in partitions.items():
+                    if month not in writers:
+                        writers[month] = self._open_writer(month, run_id)
+                    writers[month][0].write_table(pa.Table.from_pylist(partition_rows, schema=self.schema))
+
+                row_count += len(rows)
+                max_id = rows[-1]['Analysis_ID']
+
+            # Önce dosyaları kapat ve yayınla, sonra watermark'ı ilerlet
+            for writer, tmp_path, final_path in writers.values():
+                writer.close()
+                os.replace(tmp_path, final_path)
+
+            if max_id > last_id:
+                self.db_manager.set_export_watermark(self.watermark_name, max_id)
+
+            return {
+                "success": True,
+                "exported_rows": row_count,
+                "partitions": sorted(writers.keys()),
+                "watermark": max_id
+            }
+
+        except Exception as e:
+            # Yarım kalan dosyaları temizle, watermark değişmez (bir sonraki çalıştırma tekrar dener)
+            for writer, tmp_path, final_path in writers.values():
+                try:
+                    writer.close()
+                except Exception:
+                    pass
+                if os.path.exists(tmp_path):
+                    os.unlink(tmp_path)
+            return {
+                "success": False,
+                "error": str(e),
+                "exported_rows": 0
+            }
+
+    def _open_writer(self, month: str, run_id: str):
+        """Partition için yeni bir dosya aç (okuyucular yarım dosyayı görmesin diye geçici isimle)"""
+        partition_dir = os.path.join(self.output_dir, f"month={month}")
+        os.makedirs(partition_dir, exist_ok=True)
+
+        final_path = os.path.join(partition_dir, f"part-{run_id}{self.FORMATS[self.export_format]}")
+        tmp_path = final_path + '.tmp'
+
+        if self.export_format == 'parquet':
+            writer = pq.ParquetWriter(tmp_path, self.schema, compression='zstd')
+        else:
+            writer = pa_ipc.new_file(tmp_path, self.schema)
+
+        return writer, tmp_path, final_path
+
+
+if __name__ == '__main__':
+    import argparse
+    import sys
+
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from database_manager import DatabaseManager
+
+    parser = argparse.ArgumentParser(description="Şikayet + analiz verisini kolon bazlı snapshot olarak dışa aktar")
+    parser.add_argument('output_dir')
+    parser.add_argument('--format', choices=list(SnapshotExporter.FORMATS), default='parquet')
+    parser.add_argument('--chunk-size', type=int, default=5000)
+    args = parser.parse_args()
+
+    exporter = SnapshotExporter(DatabaseManager(), args.output_dir, args.format, args.chunk_size)
+    print(exporter.export_incremental())
@@ -0,0 +1,68 @@
+import csv
+import io
+import json
+import zlib
+from typing import Iterable, Iterator, List
+
+
+class StreamExporter:
+    """
+    Akış halinde dışa aktarma (CSV / JSONL)
+    - Veritabanından gelen satır parçalarını byte parçalarına çevirir, tüm sonucu bellekte tutmaz
+    - Opsiyonel gzip sıkıştırma da parça parça yapılır
+    """
+
+    FORMATS = {
+        'csv': ('text/csv', '.csv'),
+        'jsonl': ('application/x-ndjson', '.jsonl'),
+    }
+
+    def __init__(self, columns: List[str], export_format: str = 'csv', compress: bool = False):
+        if export_format not in self.FORMATS:
+            raise ValueError(f"Bilinmeyen export formatı: {export_format}")
+
+        self.columns = columns
+        self.export_format = export_format
+        self.compress = compress
+
+    @property
+    def mimetype(self) -> str:
+        return 'application/gzip' if self.compress else self.FORMATS[self.export_format][0]
+
+    def filename(self, base_name: str) -> str:
+        name = base_name + self.FORMATS[self.export_format][1]
+        return name + '.gz' if self.compress else name
+
+    def stream(self, chunks: Iterable[List[tuple]]) -> Iterator[bytes]:
+        """Satır parçalarından yanıt gövdesi parçaları üret"""
+        encoded = self._csv(chunks) if self.export_format == 'csv' else self._jsonl(chunks)
+        return self._gzip(encoded) if self.compress else encoded
+
+    def _csv(self, chunks: Iterable[List[tuple]]) -> Iterator[bytes]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+
+        # Başlık sorgu beklemeden gider, istemci ilk byte'ı hemen alır
+        writer.writerow(self.columns)
+        yield buffer.getvalue().encode('utf-8')
+
+        for rows in chunks:
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerows(rows)
+            yield buffer.getvalue().encode('utf-8')
+
+    def _jsonl(self, chunks: Iterable[List[tuple]]) -> Iterator[bytes]:
+        for rows in chunks:
+            lines = [json.dumps(dict(zip(self.columns, row)), ensure_ascii=False) for row in rows]
+            yield ('\n'.join(lines) + '\n').encode('utf-8')
+
+    @staticmethod
+    def _gzip(parts: Iterable[bytes]) -> Iterator[bytes]:
+        # wbits=31: gzip başlığı ile; her parçada sync flush ki veri beklemeden aksın
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+        for part in parts:
+            data = compressor.compress(part) + compressor.flush(zlib.Z_SYNC_FLUSH)
+            if data:
+                yield data
+        yield compressor.flush()
@@ -0,0 +1,28 @@
+import re
+import unicodedata
+from typing import List
+
+# Türkçe büyük/küçük harf eşleşmeleri - str.lower() 'I' -> 'i', 'İ' -> 'i̇' yapıyor
+_TURKISH_CASE_MAP = str.maketrans({'İ': 'i', 'I': 'i', 'ı': 'i'})
+_TOKEN_PATTERN = re.compile(r'\w+')
+
+
+def normalize_turkish(text: str) -> str:
+    """Metni küçük harfe çevir ve Türkçe aksanları katla (ç->c, ğ->g, ı->i, ö->o, ş->s, ü->u)"""
+    if not text:
+        return ""
+
+    text = text.translate(_TURKISH_CASE_MAP).lower()
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def tokenize_turkish(text: str) -> List[str]:
+    """Normalize edilmiş metni kelimelere ayır"""
+    return _TOKEN_PATTERN.findall(normalize_turkish(text))
+
+
+def build_fts_query(text: str) -> str:
+    """Kullanıcı aramasını güvenli bir FTS5 sorgusuna çevir (her kelime prefix eşleşmeli, AND)"""
+    # Türkçe ekler için prefix arama: "arıza" -> "arızası", "arızalı" da eşleşsin
+    return ' '.join(f'"{token}"*' for token in tokenize_turkish(text))